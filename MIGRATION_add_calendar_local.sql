@@ -0,0 +1,61 @@
+-- Migration: Add calendar_local dimension table
+-- Date: 2026-10-17
+-- Purpose: One precomputed row per day with weekday flag, Friday-Thursday week,
+--          month and cumulative day counters. Sending days for any range are a
+--          difference of two prefix counts instead of a generate_series per row.
+--          The ingest pipeline extends the table forward on every run.
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Calendar table
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS calendar_local (
+    day DATE PRIMARY KEY,
+    is_weekday BOOLEAN NOT NULL,
+    week_id INTEGER NOT NULL,
+    week_start DATE NOT NULL,
+    week_end DATE NOT NULL,
+    month_id INTEGER NOT NULL,
+    day_seq INTEGER NOT NULL,
+    weekday_seq INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_calendar_local_week_id ON calendar_local(week_id);
+
+COMMENT ON TABLE calendar_local IS 'Day dimension for sending-day counts and Friday-Thursday week boundaries';
+COMMENT ON COLUMN calendar_local.is_weekday IS 'TRUE for Monday-Friday';
+COMMENT ON COLUMN calendar_local.week_id IS 'Friday-Thursday week index counted from 2020-01-03 (a Friday)';
+COMMENT ON COLUMN calendar_local.month_id IS 'year * 12 + month - 1';
+COMMENT ON COLUMN calendar_local.day_seq IS 'Cumulative count of days up to and including this day';
+COMMENT ON COLUMN calendar_local.weekday_seq IS 'Cumulative count of weekdays up to and including this day';
+
+-- ============================================================================
+-- STEP 2: Populate (same formulas as refresh_calendar in ingest_main.py)
+-- ============================================================================
+
+INSERT INTO calendar_local (
+    day, is_weekday, week_id, week_start, week_end, month_id, day_seq, weekday_seq
+)
+SELECT
+    t.day,
+    EXTRACT(ISODOW FROM t.day) < 6,
+    (t.day - DATE '2020-01-03') / 7,
+    DATE '2020-01-03' + ((t.day - DATE '2020-01-03') / 7) * 7,
+    DATE '2020-01-03' + ((t.day - DATE '2020-01-03') / 7) * 7 + 6,
+    EXTRACT(YEAR FROM t.day)::int * 12 + EXTRACT(MONTH FROM t.day)::int - 1,
+    (t.day - DATE '2020-01-03') + 1,
+    SUM(CASE WHEN EXTRACT(ISODOW FROM t.day) < 6 THEN 1 ELSE 0 END) OVER (ORDER BY t.day)
+FROM generate_series(DATE '2020-01-03', DATE '2030-12-31', INTERVAL '1 day') AS g(d)
+CROSS JOIN LATERAL (SELECT g.d::date AS day) t
+ON CONFLICT (day) DO NOTHING;
+
+-- ============================================================================
+-- STEP 3: Verify
+-- ============================================================================
+
+SELECT MIN(day) AS first_day, MAX(day) AS last_day, COUNT(*) AS days
+FROM calendar_local;
+
+COMMIT;
@@ -0,0 +1,61 @@
+-- Migration: Add client_daily_metrics aggregate table
+-- Date: 2026-10-17
+-- Purpose: Pre-aggregate campaign_reporting_local to one row per (client_id, day).
+--          Weekly rollups, historical weeks, MTD and the client trend chart sum
+--          a handful of daily rows instead of re-scanning raw campaign rows.
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Daily client-grain table
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS client_daily_metrics (
+    client_id BIGINT NOT NULL,
+    day DATE NOT NULL,
+    total_sent BIGINT,
+    new_leads_reached BIGINT,
+    replies_count BIGINT,
+    positive_reply BIGINT,
+    bounce_count BIGINT,
+    campaign_rows INTEGER DEFAULT 0,
+    computed_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (client_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_client_daily_metrics_day ON client_daily_metrics(day);
+
+COMMENT ON TABLE client_daily_metrics IS 'campaign_reporting_local summed per client_id and end_date (via client_name_map_local)';
+COMMENT ON COLUMN client_daily_metrics.campaign_rows IS 'Number of campaign reporting rows aggregated into this day';
+
+-- ============================================================================
+-- STEP 2: Backfill from existing campaign reporting rows
+-- ============================================================================
+
+INSERT INTO client_daily_metrics (
+    client_id, day,
+    total_sent, new_leads_reached, replies_count, positive_reply, bounce_count,
+    campaign_rows
+)
+SELECT
+    m.client_id,
+    cr.end_date,
+    SUM(cr.total_sent),
+    SUM(cr.new_leads_reached),
+    SUM(cr.replies_count),
+    SUM(cr.positive_reply),
+    SUM(cr.bounce_count),
+    COUNT(*)
+FROM client_name_map_local m
+INNER JOIN campaign_reporting_local cr ON cr.client_name_norm = m.client_name_norm
+GROUP BY m.client_id, cr.end_date
+ON CONFLICT (client_id, day) DO NOTHING;
+
+-- ============================================================================
+-- STEP 3: Verify
+-- ============================================================================
+
+SELECT COUNT(*) AS daily_rows, MIN(day) AS first_day, MAX(day) AS last_day
+FROM client_daily_metrics;
+
+COMMIT;
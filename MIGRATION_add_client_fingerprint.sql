@@ -0,0 +1,20 @@
+-- Migration: Add row_fingerprint to clients_local
+-- Date: 2026-10-17
+-- Purpose: Change-detected client sync. ingest_clients hashes each incoming
+--          client row and only rewrites rows whose fingerprint changed.
+-- Backward compatible: YES (NULL fingerprint = row is rewritten once on next sync)
+
+ALTER TABLE clients_local
+ADD COLUMN IF NOT EXISTS row_fingerprint TEXT;
+
+COMMENT ON COLUMN clients_local.row_fingerprint IS
+'MD5 of the processed source row written by ingest_clients; unchanged rows are skipped';
+
+-- Verify the column was added
+SELECT
+    column_name,
+    data_type,
+    is_nullable
+FROM information_schema.columns
+WHERE table_name = 'clients_local'
+AND column_name = 'row_fingerprint';
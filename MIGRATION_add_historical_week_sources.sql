@@ -0,0 +1,35 @@
+-- Migration: Add historical_week_sources table
+-- Date: 2026-10-17
+-- Purpose: Remember which client_daily_metrics rows each historical week was
+--          computed from (row count and a hash of its client_ids). A week whose
+--          daily rows were deleted or backfilled since then is recomputed even
+--          though no newer computed_at points at it. Weeks without a row here
+--          are recomputed once on the next run.
+-- Requires: MIGRATION_historical_append_only.sql
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: One row per computed historical week
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS historical_week_sources (
+    period_start_date DATE PRIMARY KEY,
+    daily_rows INTEGER NOT NULL DEFAULT 0,
+    clients_md5 TEXT NOT NULL,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE historical_week_sources IS 'client_daily_metrics rows and clients each historical week was last computed from';
+COMMENT ON COLUMN historical_week_sources.clients_md5 IS 'md5 of the sorted, comma-separated client_ids with daily rows in the week';
+
+-- ============================================================================
+-- STEP 2: Verify
+-- ============================================================================
+
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'historical_week_sources'
+ORDER BY ordinal_position;
+
+COMMIT;
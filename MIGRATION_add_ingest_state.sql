@@ -0,0 +1,48 @@
+-- Migration: Add ingest_state table and unique campaign_date_key
+-- Date: 2026-10-17
+-- Purpose: Support watermark-based incremental extraction of campaign_reporting.
+--          ingest_state remembers the source high-water mark per ingested source,
+--          and campaign_reporting_local becomes upsertable by campaign_date_key.
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Ingest state (one row per incrementally ingested source)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS ingest_state (
+    source_name TEXT PRIMARY KEY,
+    high_water_mark TIMESTAMPTZ,
+    last_sync_mode TEXT,
+    last_rows_synced INTEGER DEFAULT 0,
+    last_run_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+COMMENT ON TABLE ingest_state IS 'Per-source high-water marks for incremental ingestion';
+COMMENT ON COLUMN ingest_state.high_water_mark IS 'Largest source COALESCE(updated_at, inserted_at) seen by the last successful sync';
+COMMENT ON COLUMN ingest_state.last_sync_mode IS 'full or incremental';
+
+-- ============================================================================
+-- STEP 2: Make campaign_reporting_local upsertable by campaign_date_key
+-- ============================================================================
+
+-- Remove duplicate keys left by earlier delete-and-reinsert runs (keep newest row)
+DELETE FROM campaign_reporting_local a
+USING campaign_reporting_local b
+WHERE a.campaign_date_key = b.campaign_date_key
+  AND a.id < b.id;
+
+DROP INDEX IF EXISTS idx_campaign_local_date_key;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_campaign_local_date_key_unique
+ON campaign_reporting_local(campaign_date_key);
+
+-- ============================================================================
+-- STEP 3: Verify
+-- ============================================================================
+
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'campaign_reporting_local'
+  AND indexname = 'idx_campaign_local_date_key_unique';
+
+COMMIT;
@@ -0,0 +1,50 @@
+-- Migration: Add smartlead_campaign_counts table
+-- Date: 2026-10-17
+-- Purpose: Persist per-campaign SmartLead lead-status counts between runs.
+--          Nightly ingestion only recounts campaigns whose /campaigns metadata
+--          changed, that reached new leads, or whose counts passed the TTL
+--          (SMARTLEAD_COUNTS_TTL_HOURS). The client detail page reads
+--          per-campaign not-contacted counts from here.
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Per-campaign counts (one row per active SmartLead campaign)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS smartlead_campaign_counts (
+    campaign_id BIGINT PRIMARY KEY,
+    campaign_name TEXT,
+    campaign_status TEXT,
+    campaign_updated_at TEXT,
+    smartlead_client_id BIGINT,
+    smartlead_client_name TEXT,
+    client_id BIGINT,
+    total_leads INTEGER DEFAULT 0,
+    started INTEGER DEFAULT 0,
+    inprogress INTEGER DEFAULT 0,
+    completed INTEGER DEFAULT 0,
+    paused INTEGER DEFAULT 0,
+    stopped INTEGER DEFAULT 0,
+    blocked INTEGER DEFAULT 0,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_smartlead_campaign_counts_client ON smartlead_campaign_counts(client_id);
+
+COMMENT ON TABLE smartlead_campaign_counts IS 'Lead-status counts per active SmartLead campaign, reused across runs until stale';
+COMMENT ON COLUMN smartlead_campaign_counts.campaign_updated_at IS 'updated_at from SmartLead /campaigns, stored verbatim for change detection';
+COMMENT ON COLUMN smartlead_campaign_counts.client_id IS 'clients_local.client_id matched by client name/code (NULL if unmatched)';
+COMMENT ON COLUMN smartlead_campaign_counts.started IS 'Leads with STARTED status (not yet contacted)';
+COMMENT ON COLUMN smartlead_campaign_counts.fetched_at IS 'When the counts were taken from SmartLead';
+
+-- ============================================================================
+-- STEP 2: Verify
+-- ============================================================================
+
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'smartlead_campaign_counts'
+ORDER BY ordinal_position;
+
+COMMIT;
@@ -0,0 +1,58 @@
+-- Migration: Append-only historical weeks with derived week_number
+-- Date: 2026-10-17
+-- Purpose: client_7d_rollup_historical and client_health_dashboard_historical are
+--          now kept append-only, keyed by (client_id, period_start_date). Only new
+--          or changed weeks are recomputed, so a stored week_number would go stale;
+--          it is derived at read time by the *_historical_v views instead.
+-- Requires: MIGRATION_add_calendar_local.sql
+--           (client_id foreign keys lost by shadow swaps are restored by
+--           MIGRATION_restore_shadow_table_foreign_keys.sql)
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: week_number is no longer stored
+-- ============================================================================
+
+ALTER TABLE client_7d_rollup_historical DROP COLUMN IF EXISTS week_number;
+ALTER TABLE client_health_dashboard_historical DROP COLUMN IF EXISTS week_number;
+
+-- ============================================================================
+-- STEP 2: Views with week_number derived from calendar_local
+-- (1 = most recent completed Friday-Thursday week, 2 = the week before, ...)
+-- ============================================================================
+
+CREATE OR REPLACE VIEW client_7d_rollup_historical_v AS
+SELECT
+    h.*,
+    cur.week_id - cal.week_id AS week_number
+FROM client_7d_rollup_historical h
+INNER JOIN calendar_local cal ON cal.day = h.period_start_date
+CROSS JOIN (
+    SELECT week_id FROM calendar_local WHERE day = CURRENT_DATE - 1
+) cur;
+
+CREATE OR REPLACE VIEW client_health_dashboard_historical_v AS
+SELECT
+    h.*,
+    cur.week_id - cal.week_id AS week_number
+FROM client_health_dashboard_historical h
+INNER JOIN calendar_local cal ON cal.day = h.period_start_date
+CROSS JOIN (
+    SELECT week_id FROM calendar_local WHERE day = CURRENT_DATE - 1
+) cur;
+
+COMMENT ON TABLE client_7d_rollup_historical IS 'Completed Friday-Thursday weeks of rollup data (append-only, depth = HISTORICAL_WEEKS_DEPTH)';
+COMMENT ON TABLE client_health_dashboard_historical IS 'Completed weeks with RAG status (append-only, depth = HISTORICAL_WEEKS_DEPTH)';
+COMMENT ON VIEW client_health_dashboard_historical_v IS 'Historical dashboard rows with week_number derived from period_start_date';
+
+-- ============================================================================
+-- STEP 3: Verify
+-- ============================================================================
+
+SELECT week_number, period_start_date, period_end_date, COUNT(*) AS clients
+FROM client_health_dashboard_historical_v
+GROUP BY week_number, period_start_date, period_end_date
+ORDER BY week_number;
+
+COMMIT;
@@ -0,0 +1,68 @@
+-- Migration: Restore client_id foreign keys lost by shadow-table swaps
+-- Date: 2026-10-17
+-- Purpose: Shadow tables were created with CREATE TABLE ... (LIKE ...), which
+--          does not copy foreign keys or grants, so the first publish of each
+--          rebuilt table dropped the FOREIGN KEY (client_id) REFERENCES
+--          clients_local ON DELETE CASCADE declared in db/schema.sql. Deleting a
+--          client then left orphaned rollup/dashboard rows. publish_shadow_table
+--          now carries foreign keys and grants over from the live table; this
+--          restores them on every table that was swapped before that fix.
+--          Safe to re-run.
+
+BEGIN;
+
+-- ============================================================================
+-- STEP 1: Drop rows orphaned while the keys were missing
+-- ============================================================================
+
+DELETE FROM client_7d_rollup_v1_local t
+WHERE NOT EXISTS (SELECT 1 FROM clients_local c WHERE c.client_id = t.client_id);
+DELETE FROM client_health_dashboard_v1_local t
+WHERE NOT EXISTS (SELECT 1 FROM clients_local c WHERE c.client_id = t.client_id);
+DELETE FROM client_7d_rollup_historical t
+WHERE NOT EXISTS (SELECT 1 FROM clients_local c WHERE c.client_id = t.client_id);
+DELETE FROM client_health_dashboard_historical t
+WHERE NOT EXISTS (SELECT 1 FROM clients_local c WHERE c.client_id = t.client_id);
+
+-- ============================================================================
+-- STEP 2: Re-create the foreign keys
+-- ============================================================================
+
+ALTER TABLE client_7d_rollup_v1_local
+    DROP CONSTRAINT IF EXISTS client_7d_rollup_v1_local_client_id_fkey;
+ALTER TABLE client_7d_rollup_v1_local
+    ADD CONSTRAINT client_7d_rollup_v1_local_client_id_fkey
+    FOREIGN KEY (client_id) REFERENCES clients_local(client_id) ON DELETE CASCADE;
+
+ALTER TABLE client_health_dashboard_v1_local
+    DROP CONSTRAINT IF EXISTS client_health_dashboard_v1_local_client_id_fkey;
+ALTER TABLE client_health_dashboard_v1_local
+    ADD CONSTRAINT client_health_dashboard_v1_local_client_id_fkey
+    FOREIGN KEY (client_id) REFERENCES clients_local(client_id) ON DELETE CASCADE;
+
+ALTER TABLE client_7d_rollup_historical
+    DROP CONSTRAINT IF EXISTS client_7d_rollup_historical_client_id_fkey;
+ALTER TABLE client_7d_rollup_historical
+    ADD CONSTRAINT client_7d_rollup_historical_client_id_fkey
+    FOREIGN KEY (client_id) REFERENCES clients_local(client_id) ON DELETE CASCADE;
+
+ALTER TABLE client_health_dashboard_historical
+    DROP CONSTRAINT IF EXISTS client_health_dashboard_historical_client_id_fkey;
+ALTER TABLE client_health_dashboard_historical
+    ADD CONSTRAINT client_health_dashboard_historical_client_id_fkey
+    FOREIGN KEY (client_id) REFERENCES clients_local(client_id) ON DELETE CASCADE;
+
+-- ============================================================================
+-- STEP 3: Verify
+-- ============================================================================
+
+SELECT conrelid::regclass AS table_name, conname, pg_get_constraintdef(oid)
+FROM pg_constraint
+WHERE contype = 'f'
+  AND conrelid::regclass::text IN (
+      'client_7d_rollup_v1_local', 'client_health_dashboard_v1_local',
+      'client_7d_rollup_historical', 'client_health_dashboard_historical'
+  )
+ORDER BY 1;
+
+COMMIT;
@@ -47,7 +47,7 @@ export async function GET(
     // Fetch 14-day trend data
     const trendQuery = `
       SELECT
-        end_date,
+        day as end_date,
         SUM(total_sent) as contacted,
         SUM(replies_count) as replies,
         SUM(positive_reply) as positives,
@@ -62,21 +62,22 @@ export async function GET(
             ROUND(SUM(positive_reply)::numeric / SUM(total_sent), 4)
           ELSE NULL
         END as positive_reply_rate
-      FROM campaign_reporting_local
-      WHERE client_name_norm IN (
-        SELECT DISTINCT client_name_norm
+      FROM client_daily_metrics
+      WHERE client_id IN (
+        SELECT DISTINCT client_id
         FROM client_name_map_local
         WHERE client_code = $1
       )
-      AND end_date >= CURRENT_DATE - INTERVAL '14 days'
-      GROUP BY end_date
-      ORDER BY end_date DESC
+      AND day >= CURRENT_DATE - INTERVAL '14 days'
+      GROUP BY day
+      ORDER BY day DESC
     `;
 
     const trendData = await query<TrendDataPoint>(trendQuery, [client_code]);
 
     // Fetch 7-day campaign breakdown with enhanced metrics - AGGREGATED BY CAMPAIGN
     // Status is taken from the most recent end_date for each campaign
+    // Not-contacted counts come from the last SmartLead count stored by ingestion
     const campaignQuery = `
       WITH latest_status AS (
         SELECT DISTINCT ON (campaign_id)
@@ -118,16 +119,19 @@ export async function GET(
           ELSE NULL
         END as bounce_pct_7d,
         NULL::int as weekly_target_int,
-        NULL::numeric as volume_attainment
+        NULL::numeric as volume_attainment,
+        sc.started as not_contacted_leads,
+        sc.fetched_at as lead_counts_fetched_at
       FROM campaign_reporting_local c
       JOIN latest_status ls ON c.campaign_id = ls.campaign_id
+      LEFT JOIN smartlead_campaign_counts sc ON sc.campaign_id::text = c.campaign_id
       WHERE c.client_name_norm IN (
         SELECT DISTINCT client_name_norm
         FROM client_name_map_local
         WHERE client_code = $1
       )
       AND c.end_date >= CURRENT_DATE - INTERVAL '7 days'
-      GROUP BY c.campaign_id, c.campaign_name, ls.status
+      GROUP BY c.campaign_id, c.campaign_name, ls.status, sc.started, sc.fetched_at
       ORDER BY new_leads_reached_7d DESC, total_sent DESC
     `;
 
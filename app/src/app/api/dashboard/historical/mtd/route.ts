@@ -52,8 +52,8 @@ function getMTDRange(): { start_date: string; end_date: string } {
 }
 
 /**
- * Count calendar days in range (for prorated target: weekend_sending=true uses 1/7 per day)
- * For weekend_sending=false we need weekdays only - done in SQL with date filtering.
+ * Count calendar days in range (reported as aggregation_days).
+ * Sending days for the prorated target come from calendar_local in SQL.
  */
 function daysInRange(start: string, end: string): number {
   const s = new Date(start);
@@ -74,9 +74,9 @@ export async function GET(request: NextRequest) {
     if (sp.get('client_code_search')) filters.client_code_search = sp.get('client_code_search')!;
     if (sp.get('rag_status')) filters.rag_status = sp.get('rag_status')! as 'Red' | 'Yellow' | 'Green';
 
-    const { conditions: filterConditions, params: filterParams } = buildMTDFilterConditions(filters, 4);
+    const { conditions: filterConditions, params: filterParams } = buildMTDFilterConditions(filters, 3);
     const rollupAnd = filterConditions ? ` AND ${filterConditions}` : '';
-    const ragFilterParamIndex = 4 + filterParams.length;
+    const ragFilterParamIndex = 3 + filterParams.length;
     const ragWhere = filters.rag_status ? ` WHERE t.rag_status = $${ragFilterParamIndex}` : '';
 
     // Active clients: same as ingest
@@ -84,6 +84,15 @@ export async function GET(request: NextRequest) {
       WITH date_range AS (
         SELECT $1::date AS start_date, $2::date AS end_date
       ),
+      period_days AS (
+        -- Sending days from calendar_local prefix counters (same as ingest)
+        SELECT
+          GREATEST(ce.day_seq - cs.day_seq + 1, 0) AS all_days,
+          GREATEST(ce.weekday_seq - cs.weekday_seq + CASE WHEN cs.is_weekday THEN 1 ELSE 0 END, 0) AS weekdays
+        FROM calendar_local cs
+        INNER JOIN calendar_local ce ON ce.day = (SELECT end_date FROM date_range)
+        WHERE cs.day = (SELECT start_date FROM date_range)
+      ),
       bookings AS (
         SELECT
           c.client_code,
@@ -113,27 +122,27 @@ export async function GET(request: NextRequest) {
           c.bonus_pool_monthly,
           c.weekend_sending_effective,
           c.monthly_booking_goal,
-          COALESCE(SUM(cr.total_sent), 0)::integer AS contacted_7d,
-          COALESCE(SUM(cr.replies_count), 0)::integer AS replies_7d,
-          COALESCE(SUM(cr.positive_reply), 0)::integer AS positives_7d,
-          COALESCE(SUM(cr.bounce_count), 0)::integer AS bounces_7d,
-          COALESCE(SUM(cr.new_leads_reached), 0)::integer AS new_leads_reached_7d,
-          CASE WHEN SUM(cr.new_leads_reached) > 0
-            THEN ROUND(SUM(cr.replies_count)::numeric / SUM(cr.new_leads_reached), 4)
+          COALESCE(SUM(d.total_sent), 0)::integer AS contacted_7d,
+          COALESCE(SUM(d.replies_count), 0)::integer AS replies_7d,
+          COALESCE(SUM(d.positive_reply), 0)::integer AS positives_7d,
+          COALESCE(SUM(d.bounce_count), 0)::integer AS bounces_7d,
+          COALESCE(SUM(d.new_leads_reached), 0)::integer AS new_leads_reached_7d,
+          CASE WHEN SUM(d.new_leads_reached) > 0
+            THEN ROUND(SUM(d.replies_count)::numeric / SUM(d.new_leads_reached), 4)
             ELSE NULL END AS reply_rate_7d,
-          CASE WHEN SUM(cr.replies_count) > 0
-            THEN ROUND(SUM(cr.positive_reply)::numeric / SUM(cr.replies_count), 4)
+          CASE WHEN SUM(d.replies_count) > 0
+            THEN ROUND(SUM(d.positive_reply)::numeric / SUM(d.replies_count), 4)
             ELSE NULL END AS positive_reply_rate_7d,
-          CASE WHEN SUM(cr.total_sent) > 0
-            THEN ROUND(SUM(cr.bounce_count)::numeric / SUM(cr.total_sent), 4)
+          CASE WHEN SUM(d.total_sent) > 0
+            THEN ROUND(SUM(d.bounce_count)::numeric / SUM(d.total_sent), 4)
             ELSE NULL END AS bounce_pct_7d,
-          MAX(cr.end_date) AS most_recent_reporting_end_date
+          MAX(d.day) AS most_recent_reporting_end_date
         FROM client_name_map_local m
         INNER JOIN clients_local c ON c.client_id = m.client_id
-        LEFT JOIN campaign_reporting_local cr
-          ON m.client_name_norm = cr.client_name_norm
-          AND cr.end_date >= (SELECT start_date FROM date_range)
-          AND cr.end_date <= (SELECT end_date FROM date_range)
+        LEFT JOIN client_daily_metrics d
+          ON d.client_id = m.client_id
+          AND d.day >= (SELECT start_date FROM date_range)
+          AND d.day <= (SELECT end_date FROM date_range)
         WHERE (
           UPPER(TRIM(c.relationship_status)) IN ('ACTIVE', 'LIVE', 'ONGOING')
           OR (c.exit_date IS NULL AND c.relationship_status IS NOT NULL)
@@ -150,7 +159,11 @@ export async function GET(request: NextRequest) {
           CASE
             WHEN r.weekly_target_int IS NOT NULL AND r.weekly_target_int > 0 THEN
               ROUND(
-                (r.weekly_target_int::numeric / 7.0) * $3::integer,
+                r.weekly_target_int::numeric *
+                CASE
+                  WHEN COALESCE(r.weekend_sending_effective, FALSE) THEN (SELECT all_days FROM period_days) / 7.0
+                  ELSE (SELECT weekdays FROM period_days) / 5.0
+                END,
                 2
               )
             ELSE NULL
@@ -230,7 +243,7 @@ export async function GET(request: NextRequest) {
       ORDER BY t.new_leads_reached_7d DESC NULLS LAST
     `;
 
-    const mtdParams = [range.start_date, range.end_date, daysCount, ...filterParams];
+    const mtdParams = [range.start_date, range.end_date, ...filterParams];
     if (filters.rag_status) mtdParams.push(filters.rag_status);
     const rows = await query<any>(queryText, mtdParams);
 
@@ -40,7 +40,7 @@ interface HistoricalDataResponse {
 /**
  * Validates and parses week numbers from query param
  * @param weeksParam - Comma-separated week numbers (e.g., "1,2,3")
- * @returns Array of valid week numbers (1-4)
+ * @returns Array of valid week numbers (1 = most recent completed week)
  * @throws Error if invalid week numbers provided
  */
 function parseAndValidateWeeks(weeksParam: string | null): number[] {
@@ -55,10 +55,10 @@ function parseAndValidateWeeks(weeksParam: string | null): number[] {
     .map(w => {
       const num = parseInt(w, 10);
       if (isNaN(num)) {
-        throw new Error(`Invalid week number: "${w}". Week numbers must be integers 1-4.`);
+        throw new Error(`Invalid week number: "${w}". Week numbers must be positive integers.`);
       }
-      if (num < 1 || num > 4) {
-        throw new Error(`Week number out of range: ${num}. Only weeks 1-4 are supported.`);
+      if (num < 1) {
+        throw new Error(`Week number out of range: ${num}. Week numbers start at 1.`);
       }
       return num;
     });
@@ -94,7 +94,7 @@ function buildSingleWeekQuery(weekNumber: number): string {
       bonus_pool_monthly, weekend_sending_effective, monthly_booking_goal,
       qualified_7d, showed_7d, total_booked_7d,
       period_start_date, period_end_date, week_number
-    FROM client_health_dashboard_historical
+    FROM client_health_dashboard_historical_v
     WHERE week_number = $1
     ORDER BY new_leads_reached_7d DESC NULLS LAST
   `;
@@ -164,7 +164,7 @@ function buildMultiWeekQuery(weekNumbers: number[]): string {
       MIN(period_start_date) as period_start_date,
       MAX(period_end_date) as period_end_date
 
-    FROM client_health_dashboard_historical
+    FROM client_health_dashboard_historical_v
     WHERE week_number IN (${placeholders})
     GROUP BY client_id, client_code
     ORDER BY SUM(new_leads_reached_7d) DESC NULLS LAST
@@ -186,7 +186,7 @@ async function fetchWeekMetadata(weekNumbers: number[]): Promise<Array<{
       week_number,
       period_start_date as start_date,
       period_end_date as end_date
-    FROM client_health_dashboard_historical
+    FROM client_health_dashboard_historical_v
     WHERE week_number IN (${placeholders})
     GROUP BY week_number, period_start_date, period_end_date
     ORDER BY week_number
@@ -1,7 +1,8 @@
 /**
  * API route for fetching available historical weeks
  *
- * Returns a list of available historical weeks (last 4 completed Friday-Thursday weeks)
+ * Returns a list of available historical weeks (completed Friday-Thursday weeks kept
+ * by the ingest, HISTORICAL_WEEKS_DEPTH deep)
  * with metadata for the frontend week selector dropdown.
  */
 
@@ -35,7 +36,7 @@ export async function GET() {
         period_start_date as start_date,
         period_end_date as end_date,
         COUNT(*) as record_count
-      FROM client_health_dashboard_historical
+      FROM client_health_dashboard_historical_v
       GROUP BY week_number, period_start_date, period_end_date
       ORDER BY week_number
     `;
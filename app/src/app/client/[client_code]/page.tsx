@@ -14,7 +14,7 @@ import type { ClientDetail, CampaignRow } from '@/lib/types';
 // TYPES
 // ============================================================================
 
-type CampaignSortField = 'campaign_name' | 'total_sent' | 'new_leads_reached_7d' | 'replies_count' | 'reply_rate' | 'bounce_pct_7d' | 'positive_reply' | 'positive_reply_rate';
+type CampaignSortField = 'campaign_name' | 'total_sent' | 'new_leads_reached_7d' | 'not_contacted_leads' | 'replies_count' | 'reply_rate' | 'bounce_pct_7d' | 'positive_reply' | 'positive_reply_rate';
 type CampaignSortOrder = 'asc' | 'desc' | null;
 
 // ============================================================================
@@ -560,6 +560,14 @@ export default function ClientDetailPage() {
                     onSort={handleCampaignSort}
                     align="right"
                   />
+                  <CampaignSortableHeader
+                    field="not_contacted_leads"
+                    label="Not Contacted"
+                    sortField={campaignSortField}
+                    sortOrder={campaignSortOrder}
+                    onSort={handleCampaignSort}
+                    align="right"
+                  />
                   <CampaignSortableHeader
                     field="replies_count"
                     label="Replies"
@@ -605,7 +613,7 @@ export default function ClientDetailPage() {
               <tbody className="divide-y divide-slate-200">
                 {sortedCampaigns.length === 0 ? (
                   <tr>
-                    <td colSpan={9} className="px-4 py-8 text-center text-slate-600">No campaigns in last 7 days</td>
+                    <td colSpan={10} className="px-4 py-8 text-center text-slate-600">No campaigns in last 7 days</td>
                   </tr>
                 ) : (
                   sortedCampaigns.map((campaign, index) => (
@@ -619,6 +627,12 @@ export default function ClientDetailPage() {
                       </td>
                       <td className="px-4 py-3 text-right text-slate-900 tabular-nums">{formatNumber(campaign.total_sent)}</td>
                       <td className="px-4 py-3 text-right text-slate-900 tabular-nums">{formatNumber(campaign.new_leads_reached_7d)}</td>
+                      <td
+                        className="px-4 py-3 text-right text-slate-900 tabular-nums"
+                        title={campaign.lead_counts_fetched_at ? `Counted ${new Date(campaign.lead_counts_fetched_at).toLocaleString()}` : undefined}
+                      >
+                        {campaign.not_contacted_leads === null ? 'N/A' : formatNumber(campaign.not_contacted_leads)}
+                      </td>
                       <td className="px-4 py-3 text-right text-slate-900 tabular-nums">{formatNumber(campaign.replies_count)}</td>
                       <td className="px-4 py-3 text-right">
                         <ReplyRateBadge
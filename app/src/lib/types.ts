@@ -75,6 +75,8 @@ export interface CampaignRow {
   bounce_pct_7d: number | null;
   weekly_target_int: number | null;
   volume_attainment: number | null;
+  not_contacted_leads: number | null; // STARTED leads from smartlead_campaign_counts
+  lead_counts_fetched_at: string | null;
 }
 
 export interface UnmatchedMapping {
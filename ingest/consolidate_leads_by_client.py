@@ -16,10 +16,17 @@ Date: February 5, 2026
 import os
 import sys
 import time
-from datetime import datetime
-from typing import List, Dict, Optional
+import asyncio
+import threading
+import contextvars
+from array import array
+from collections import deque
+from itertools import islice
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Callable, Iterable, Iterator, AsyncIterator, Optional, Set, Tuple
 from dataclasses import dataclass, field
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 try:
     import requests
@@ -30,6 +37,15 @@ except ImportError:
     print("Install it with: pip install requests")
     sys.exit(1)
 
+try:
+    import aiohttp
+except ImportError:
+    # Optional: without aiohttp the thread-pool engine is used
+    aiohttp = None
+
+# Record/replay transport (SMARTLEAD_CASSETTE); inactive unless configured
+from smartlead_cassette import CassetteAdapter, CassetteAsyncSession, get_cassette
+
 
 # ============================================================================
 # CONFIGURATION
@@ -37,7 +53,7 @@ except ImportError:
 
 # SmartLead API Configuration
 API_KEY = os.environ.get('SMARTLEAD_API_KEY', '2fbf4f7d-44af-4ff1-8e25-5655f5483fd0_94zyakr')
-BASE_URL = "https://server.smartlead.ai/api/v1"
+BASE_URL = os.environ.get('SMARTLEAD_BASE_URL', "https://server.smartlead.ai/api/v1")
 
 # Performance settings
 MAX_WORKERS = int(os.environ.get('MAX_WORKERS', '10'))
@@ -46,6 +62,64 @@ REQUEST_TIMEOUT = int(os.environ.get('REQUEST_TIMEOUT', '30'))
 MAX_RETRIES = 3
 RETRY_BACKOFF = 1.0
 
+# Lead counting strategy:
+#   count    - one limit=1 request per (campaign, status), totals read from
+#              the response's total_leads (falls back to paginate when the
+#              totals look inconsistent)
+#   paginate - download every lead and count statuses locally
+COUNT_STRATEGY = os.environ.get('SMARTLEAD_COUNT_STRATEGY', 'count')
+
+# Lead statuses counted per campaign (LeadCounts fields)
+LEAD_STATUSES = ('STARTED', 'INPROGRESS', 'COMPLETED', 'PAUSED', 'STOPPED', 'BLOCKED')
+
+# Fetch engine:
+#   async   - asyncio + aiohttp, one shared keep-alive pool
+#   threads - ThreadPoolExecutor(MAX_WORKERS) with requests sessions
+# Both engines share the process-wide token bucket below.
+SMARTLEAD_ENGINE = os.environ.get('SMARTLEAD_ENGINE', 'async')
+
+# Account API quota for the token bucket (requests per second, burst size)
+RATE_LIMIT_PER_SEC = float(os.environ.get('SMARTLEAD_RATE_LIMIT', '5'))
+RATE_LIMIT_BURST = int(os.environ.get('SMARTLEAD_RATE_BURST', '10'))
+
+# Maximum in-flight requests on the shared async connection pool
+ASYNC_CONCURRENCY = int(os.environ.get('SMARTLEAD_CONCURRENCY', '20'))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Adaptive (AIMD) concurrency: in-flight requests start at
+# SMARTLEAD_INITIAL_CONCURRENCY, grow by one per window of healthy responses
+# and halve on 429/5xx/timeouts or when latency exceeds
+# SMARTLEAD_LATENCY_SPIKE x the running baseline. The ceiling is MAX_WORKERS
+# (thread engine) or SMARTLEAD_CONCURRENCY (async engine).
+ADAPTIVE_CONCURRENCY = os.environ.get('SMARTLEAD_ADAPTIVE', 'true').lower() in ('1', 'true', 'yes')
+MIN_CONCURRENCY = int(os.environ.get('SMARTLEAD_MIN_CONCURRENCY', '2'))
+INITIAL_CONCURRENCY = int(os.environ.get('SMARTLEAD_INITIAL_CONCURRENCY', '4'))
+LATENCY_SPIKE_FACTOR = float(os.environ.get('SMARTLEAD_LATENCY_SPIKE', '3.0'))
+AIMD_DECREASE_FACTOR = 0.5
+
+# Deadlines (seconds):
+#   SMARTLEAD_REQUEST_DEADLINE  - one logical request, retries and backoff included
+#   SMARTLEAD_CAMPAIGN_DEADLINE - counting one campaign
+#   SMARTLEAD_STAGE_BUDGET      - the whole fetch; campaigns not finished in
+#                                 time are returned stale (0 disables)
+REQUEST_DEADLINE = float(os.environ.get('SMARTLEAD_REQUEST_DEADLINE', '90'))
+CAMPAIGN_DEADLINE = float(os.environ.get('SMARTLEAD_CAMPAIGN_DEADLINE', '600'))
+STAGE_BUDGET = float(os.environ.get('SMARTLEAD_STAGE_BUDGET', '2700'))
+
+# Hedged requests: a lead page still pending after the observed p95 latency
+# gets a duplicate request, and whichever answers first is used
+HEDGE_REQUESTS = os.environ.get('SMARTLEAD_HEDGE', 'true').lower() in ('1', 'true', 'yes')
+HEDGE_MIN_SAMPLES = 20
+
+# Full scans of a campaign are retried this many times when the lead list
+# shifts mid-scan (total changed, failed page or de-duplicated count short)
+SCAN_ATTEMPTS = 2
+
+# Cached per-campaign counts are reused until the campaign's /campaigns
+# metadata changes or they are older than this many hours
+COUNTS_TTL_HOURS = float(os.environ.get('SMARTLEAD_COUNTS_TTL_HOURS', '72'))
+
 
 # ============================================================================
 # DATA MODELS
@@ -58,6 +132,8 @@ class ClientSummary:
     total_leads: int = 0
     not_contacted: int = 0
     campaign_count: int = 0
+    stale_campaigns: int = 0  # Not recounted this run (last known counts used)
+    missing_campaigns: int = 0  # Not recounted and no earlier counts - totals incomplete
 
 
 @dataclass
@@ -85,6 +161,263 @@ class CampaignData:
     client_name: str
     lead_counts: LeadCounts
     error: Optional[str] = None
+    client_id: Optional[int] = None  # SmartLead client id
+    campaign_status: Optional[str] = None
+    campaign_updated_at: Optional[str] = None  # /campaigns updated_at, verbatim
+    fetched_at: Optional[datetime] = None  # When lead_counts were counted
+    from_cache: bool = False
+    stale: bool = False  # Counting failed or ran out of time this run
+
+
+class DeadlineExceeded(Exception):
+    """The campaign deadline or stage budget ran out"""
+
+
+# Absolute time.monotonic() deadline for the current campaign / stage.
+# Context-local, so asyncio tasks and copied thread contexts each see their own.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('smartlead_deadline', default=None)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline (None if unbounded)"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def tighten_deadline(seconds: float) -> contextvars.Token:
+    """Set the current deadline to min(existing, now + seconds); reset with the token"""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    return _deadline.set(deadline if current is None else min(current, deadline))
+
+
+# ============================================================================
+# RATE LIMITING AND ADAPTIVE CONCURRENCY
+# ============================================================================
+
+class ConcurrencyController:
+    """
+    AIMD limit on in-flight SmartLead requests, shared by both engines
+
+    Every healthy response adds 1/limit (so +1 per full window), while a
+    429, 5xx, timeout or latency spike multiplies the limit by
+    AIMD_DECREASE_FACTOR - at most once per baseline latency, so one burst
+    of failures from the same window counts as a single congestion signal.
+    """
+
+    def __init__(self, max_limit: int):
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self.reset(max_limit)
+
+    def reset(self, max_limit: int) -> None:
+        """Start a new run with the given ceiling"""
+        with self._lock:
+            self.max_limit = max(1, max_limit)
+            self.min_limit = max(1, min(MIN_CONCURRENCY, self.max_limit))
+            if ADAPTIVE_CONCURRENCY:
+                self.limit = float(min(max(INITIAL_CONCURRENCY, self.min_limit), self.max_limit))
+            else:
+                self.limit = float(self.max_limit)
+            self.peak_limit = self.limit
+            self.in_flight = 0
+            self._async_waiters = deque()
+            self.baseline = None
+            self.latencies = deque(maxlen=10000)
+            self.requests = 0
+            self.throttled = 0
+            self.server_errors = 0
+            self.latency_spikes = 0
+            self.decreases = 0
+            self.hedges = 0
+            self._last_decrease = 0.0
+            self._p95 = None
+            self._p95_at = 0
+
+    def _try_acquire(self) -> bool:
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        """Block until a request slot is free (thread engine)"""
+        with self._cond:
+            while not self._try_acquire():
+                self._cond.wait(0.5)
+
+    async def acquire_async(self) -> None:
+        """
+        Wait until a request slot is free (async engine)
+
+        Waiters are queued in arrival order and handed a slot as one frees
+        up, so campaigns start in the order they were submitted.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._async_waiters and self._try_acquire():
+                return
+            waiter = loop.create_future()
+            self._async_waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._cond:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Slot was handed over just before the cancellation
+                    self._free_slot()
+            raise
+
+    def _free_slot(self) -> None:
+        """Give a slot back (lock held); the oldest async waiter gets it first"""
+        self.in_flight -= 1
+        self._wake_async_waiters()
+        self._cond.notify_all()
+
+    def _wake_async_waiters(self) -> None:
+        """Reserve free slots for queued async waiters in FIFO order (lock held)"""
+        while self._async_waiters and self._try_acquire():
+            waiter = self._async_waiters.popleft()
+            waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+
+    def _grant(self, waiter: "asyncio.Future") -> None:
+        """Hand a reserved slot to its waiter (runs on the waiter's loop)"""
+        if waiter.cancelled():
+            with self._cond:
+                self._free_slot()
+        else:
+            waiter.set_result(None)
+
+    def release(self, latency: float, status: Optional[int]) -> None:
+        """
+        Free the slot and feed the response into the AIMD controller
+
+        Args:
+            latency: Seconds from send to response
+            status: HTTP status, or None for timeouts/connection errors
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self.requests += 1
+
+            if status == 429:
+                self.throttled += 1
+                self._decrease()
+            elif status is None or status >= 500:
+                self.server_errors += 1
+                self._decrease()
+            else:
+                self.latencies.append(latency)
+                if self.baseline is not None and latency > LATENCY_SPIKE_FACTOR * self.baseline:
+                    self.latency_spikes += 1
+                    self._decrease()
+                elif ADAPTIVE_CONCURRENCY:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                    self.peak_limit = max(self.peak_limit, self.limit)
+
+                # Slow EWMA so a sustained slowdown becomes the new normal
+                self.baseline = latency if self.baseline is None else 0.9 * self.baseline + 0.1 * latency
+
+            self._wake_async_waiters()
+            self._cond.notify_all()
+
+    def discard(self) -> None:
+        """Free the slot of a cancelled request (e.g. a losing hedge) without feeding the controller"""
+        with self._cond:
+            self._free_slot()
+
+    def _decrease(self) -> None:
+        if not ADAPTIVE_CONCURRENCY:
+            return
+
+        now = time.monotonic()
+        if now - self._last_decrease < max(self.baseline or 0.0, 0.5):
+            return
+
+        self.limit = max(self.min_limit, self.limit * AIMD_DECREASE_FACTOR)
+        self.decreases += 1
+        self._last_decrease = now
+
+    def hedge_delay(self) -> Optional[float]:
+        """Observed p95 latency after which a request is hedged (None until enough samples)"""
+        if not HEDGE_REQUESTS:
+            return None
+
+        with self._lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            # Re-sort at most every 50 responses
+            if self._p95 is None or self.requests - self._p95_at >= 50:
+                ordered = sorted(self.latencies)
+                self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                self._p95_at = self.requests
+            return self._p95
+
+    def record_hedge(self) -> None:
+        with self._lock:
+            self.hedges += 1
+
+    def percentile(self, pct: float) -> float:
+        """Latency percentile (seconds) over successful responses"""
+        with self._lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def summary(self) -> str:
+        """One-line state for the run log"""
+        return (f"concurrency {int(self.limit)}/{self.max_limit} (peak {int(self.peak_limit)}) | "
+                f"latency p50 {self.percentile(50):.2f}s p95 {self.percentile(95):.2f}s "
+                f"p99 {self.percentile(99):.2f}s | "
+                f"429s {self.throttled}, 5xx/timeouts {self.server_errors}, "
+                f"latency spikes {self.latency_spikes}, decreases {self.decreases}, "
+                f"hedged {self.hedges}")
+
+
+CONCURRENCY = ConcurrencyController(MAX_WORKERS)
+
+
+class TokenBucket:
+    """
+    Process-wide token bucket: `rate` requests per second with bursts of up
+    to `capacity`. Callers reserve a token and sleep off any deficit, so
+    concurrency stays high right up to the quota instead of hitting 429s.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token (possibly on credit) and return the seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self) -> None:
+        """Wait until a request may be sent (thread engine)"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+RATE_LIMITER = TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
 
 
 # ============================================================================
@@ -92,17 +425,29 @@ class CampaignData:
 # ============================================================================
 
 def create_session() -> requests.Session:
-    """Create a requests session with retry logic"""
+    """
+    Create a requests session with retry logic
+
+    With SMARTLEAD_CASSETTE set, requests go through the cassette transport
+    (recorded as they are sent, or replayed offline).
+    """
     session = requests.Session()
 
+    # Connection-level retries only: 429/5xx are retried in make_api_request
+    # so the concurrency controller sees every throttle, and read timeouts
+    # surface at once so request deadlines hold
     retry_strategy = Retry(
         total=MAX_RETRIES,
+        read=False,
         backoff_factor=RETRY_BACKOFF,
-        status_forcelist=[429, 500, 502, 503, 504],
         allowed_methods=["GET", "POST"]
     )
 
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    cassette = get_cassette()
+    if cassette is not None:
+        adapter = CassetteAdapter(cassette, max_retries=retry_strategy)
+    else:
+        adapter = HTTPAdapter(max_retries=retry_strategy)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
 
@@ -117,19 +462,32 @@ def make_api_request(
     session: requests.Session,
     endpoint: str,
     params: Optional[Dict] = None,
-    method: str = "GET"
+    method: str = "GET",
+    sent: Optional[List[float]] = None,
+    cancelled: Optional[threading.Event] = None
 ) -> Optional[Dict]:
     """
     Make an API request with error handling
 
+    Each attempt's timeout is capped by REQUEST_DEADLINE (whole request,
+    retries included) and the current campaign/stage deadline.
+
     Args:
         session: Requests session
         endpoint: API endpoint (without base URL)
         params: Query parameters
         method: HTTP method
+        sent: If given, the monotonic send time of each attempt is appended
+            (after slot and rate-limit waits), for hedging decisions
+        cancelled: Set when the answer is no longer wanted (a losing hedge).
+            A running attempt then frees its slot without feeding the
+            AIMD controller, and no further attempts are made.
 
     Returns:
         Response JSON or None if error
+
+    Raises:
+        DeadlineExceeded: The campaign deadline or stage budget ran out
     """
     url = f"{BASE_URL}{endpoint}"
 
@@ -137,27 +495,95 @@ def make_api_request(
         params = {}
 
     params['api_key'] = API_KEY
+    request_deadline = time.monotonic() + REQUEST_DEADLINE
+
+    for attempt in range(MAX_RETRIES + 1):
+        timeout = attempt_timeout(endpoint, request_deadline)
+        if timeout is None or (cancelled is not None and cancelled.is_set()):
+            return None
+
+        CONCURRENCY.acquire()
+        RATE_LIMITER.acquire_blocking()
+        status = None
+        sent_at = time.monotonic()
+        if sent is not None:
+            sent.append(sent_at)
+
+        try:
+            response = session.request(
+                method=method,
+                url=url,
+                params=params,
+                timeout=timeout
+            )
+            status = response.status_code
+
+            if status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                delay = retry_delay(response.headers.get('Retry-After', ''), attempt)
+            else:
+                response.raise_for_status()
+                return response.json()
+
+        except requests.exceptions.HTTPError as e:
+            print(f"⚠ HTTP error for {endpoint}: {e}")
+            return None
+        except requests.exceptions.Timeout:
+            check_deadline(endpoint)
+            print(f"⚠ Timeout for {endpoint}")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"⚠ Request error for {endpoint}: {e}")
+            return None
+        finally:
+            if cancelled is not None and cancelled.is_set():
+                CONCURRENCY.discard()
+            else:
+                CONCURRENCY.release(time.monotonic() - sent_at, status)
+
+        if cancelled is not None and cancelled.is_set():
+            return None
+
+        # Back off without holding a concurrency slot
+        time.sleep(min(delay, max(0.0, request_deadline - time.monotonic())))
+
+    return None
+
+
+def retry_delay(retry_after: str, attempt: int) -> float:
+    """Seconds to wait before retrying a 429/5xx (Retry-After wins over backoff)"""
+    if retry_after.isdigit():
+        return float(retry_after)
+    return RETRY_BACKOFF * (2 ** attempt)
+
+
+def check_deadline(endpoint: str) -> None:
+    """Raise DeadlineExceeded if the campaign deadline or stage budget has passed"""
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded for {endpoint}")
+
+
+def attempt_timeout(endpoint: str, request_deadline: float) -> Optional[float]:
+    """
+    Timeout for the next attempt: REQUEST_TIMEOUT capped by the request
+    deadline and the campaign/stage deadline
 
-    try:
-        response = session.request(
-            method=method,
-            url=url,
-            params=params,
-            timeout=REQUEST_TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
+    Returns:
+        Seconds, or None if the request deadline has passed
 
-    except requests.exceptions.HTTPError as e:
-        print(f"⚠ HTTP error for {endpoint}: {e}")
-        return None
-    except requests.exceptions.Timeout:
-        print(f"⚠ Timeout for {endpoint}")
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"⚠ Request error for {endpoint}: {e}")
+    Raises:
+        DeadlineExceeded: The campaign deadline or stage budget has passed
+    """
+    check_deadline(endpoint)
+
+    request_remaining = request_deadline - time.monotonic()
+    if request_remaining <= 0:
+        print(f"⚠ Request deadline exceeded for {endpoint}")
         return None
 
+    remaining = remaining_time()
+    return min(REQUEST_TIMEOUT, request_remaining, remaining if remaining is not None else REQUEST_TIMEOUT)
+
 
 def fetch_active_campaigns(session: requests.Session) -> List[Dict]:
     """Fetch all active campaigns"""
@@ -165,6 +591,11 @@ def fetch_active_campaigns(session: requests.Session) -> List[Dict]:
 
     campaigns = make_api_request(session, "/campaigns", params={"include_tags": "true"})
 
+    return parse_active_campaigns(campaigns)
+
+
+def parse_active_campaigns(campaigns) -> List[Dict]:
+    """Extract ACTIVE campaigns from a /campaigns response"""
     if campaigns is None:
         print("✗ Failed to fetch campaigns")
         return []
@@ -191,6 +622,11 @@ def fetch_all_clients(session: requests.Session) -> Dict[int, Dict]:
 
     clients = make_api_request(session, "/client/")
 
+    return parse_client_map(clients)
+
+
+def parse_client_map(clients) -> Dict[int, Dict]:
+    """Build the client_id -> client info map from a /client/ response"""
     if clients is None:
         print("⚠ Failed to fetch clients, will use campaign data only")
         return {}
@@ -217,23 +653,26 @@ def fetch_all_clients(session: requests.Session) -> Dict[int, Dict]:
     return client_map
 
 
-def fetch_campaign_leads_paginated(
+def iter_campaign_lead_pages(
     session: requests.Session,
     campaign_id: int,
     status_filter: Optional[str] = None
-) -> List[Dict]:
+) -> Iterator[List[Dict]]:
     """
-    Fetch all leads for a campaign with pagination
+    Yield a campaign's leads one page at a time
+
+    Only the current page is held in memory; callers that count should
+    consume pages as they arrive instead of collecting them.
 
     Args:
         session: Requests session
         campaign_id: Campaign ID
         status_filter: Optional status filter (STARTED, INPROGRESS, etc.)
 
-    Returns:
-        List of all leads
+    Yields:
+        Lists of up to BATCH_SIZE lead dicts
     """
-    all_leads = []
+    fetched = 0
     offset = 0
 
     params = {
@@ -263,44 +702,124 @@ def fetch_campaign_leads_paginated(
         if not leads:
             break
 
-        all_leads.extend(leads)
+        fetched += len(leads)
+        yield leads
 
         # Check if we've fetched all leads
-        if len(all_leads) >= total_leads or len(leads) < BATCH_SIZE:
+        if fetched >= total_leads or len(leads) < BATCH_SIZE:
             break
 
         offset += BATCH_SIZE
 
-        # Small delay to avoid rate limiting
-        time.sleep(0.1)
 
-    return all_leads
+def fetch_campaign_leads_paginated(
+    session: requests.Session,
+    campaign_id: int,
+    status_filter: Optional[str] = None
+) -> List[Dict]:
+    """
+    Fetch all leads for a campaign with pagination
+
+    Holds every lead in memory - counting uses iter_campaign_lead_pages.
 
+    Args:
+        session: Requests session
+        campaign_id: Campaign ID
+        status_filter: Optional status filter (STARTED, INPROGRESS, etc.)
 
-def count_leads_by_status(
+    Returns:
+        List of all leads
+    """
+    return [
+        lead
+        for page in iter_campaign_lead_pages(session, campaign_id, status_filter)
+        for lead in page
+    ]
+
+
+def fetch_lead_total(
+    session: requests.Session,
+    campaign_id: int,
+    status_filter: Optional[str] = None
+) -> Optional[int]:
+    """
+    Read a campaign's lead total from a single limit=1 page
+
+    Args:
+        session: Requests session
+        campaign_id: Campaign ID
+        status_filter: Optional status filter (STARTED, INPROGRESS, etc.)
+
+    Returns:
+        total_leads reported by the API, or None if the request failed
+        or the response carries no total
+    """
+    params = {'limit': 1, 'offset': 0}
+
+    if status_filter:
+        params['status'] = status_filter
+
+    response = make_api_request(
+        session,
+        f"/campaigns/{campaign_id}/leads",
+        params=params
+    )
+
+    if not isinstance(response, dict) or response.get('total_leads') is None:
+        return None
+
+    try:
+        return int(response['total_leads'])
+    except (TypeError, ValueError):
+        return None
+
+
+def count_leads_by_status_fast(
     session: requests.Session,
     campaign_id: int
-) -> LeadCounts:
+) -> Optional[LeadCounts]:
     """
-    Count leads by status for a campaign
+    Count leads by status from status-filtered first pages
 
-    Strategy: Fetch all leads once and count by status locally
+    Strategy: One limit=1 request for the campaign total plus one per status,
+    reading total_leads from each response. Request count is constant per
+    campaign regardless of lead volume.
 
     Args:
         session: Requests session
         campaign_id: Campaign ID
 
     Returns:
-        LeadCounts object with all counts
+        LeadCounts object, or None if any total is missing or the status
+        totals exceed the campaign total (e.g. the filter was ignored)
     """
-    # Fetch all leads for this campaign
-    all_leads = fetch_campaign_leads_paginated(session, campaign_id)
+    total = fetch_lead_total(session, campaign_id)
+    if total is None:
+        return None
+
+    counts = LeadCounts(total_leads=total)
+
+    for status in LEAD_STATUSES:
+        status_total = fetch_lead_total(session, campaign_id, status_filter=status)
+        if status_total is None:
+            return None
+        setattr(counts, status.lower(), status_total)
 
-    counts = LeadCounts(total_leads=len(all_leads))
+    return counts if status_totals_consistent(counts) else None
 
-    # Count by status
-    for lead in all_leads:
-        status = lead.get('status', '').upper()
+
+def status_totals_consistent(counts: LeadCounts) -> bool:
+    """Status totals must not add up to more than the campaign total"""
+    status_sum = sum(getattr(counts, status.lower()) for status in LEAD_STATUSES)
+    return status_sum <= counts.total_leads
+
+
+def add_page_counts(counts: LeadCounts, leads: List[Dict]) -> None:
+    """Add one page of leads to running status counts (reads only 'status')"""
+    counts.total_leads += len(leads)
+
+    for lead in leads:
+        status = (lead.get('status') or '').upper()
 
         if status == 'STARTED':
             counts.started += 1
@@ -315,9 +834,327 @@ def count_leads_by_status(
         elif status == 'BLOCKED':
             counts.blocked += 1
 
+
+def count_statuses(pages: Iterable[List[Dict]]) -> LeadCounts:
+    """Count leads by status page by page, never holding more than one page"""
+    counts = LeadCounts()
+
+    for page in pages:
+        add_page_counts(counts, page)
+
+    return counts
+
+
+def count_leads_by_status_paginated(
+    session: requests.Session,
+    campaign_id: int
+) -> LeadCounts:
+    """
+    Count leads by status for a campaign
+
+    Strategy: The first page reveals total_leads; the remaining offsets are
+    fetched concurrently on the shared page pool (bounded by CONCURRENCY) and
+    merged with exact de-duplication by LeadPageMerger. If the list shifted
+    during the scan the campaign is rescanned, up to SCAN_ATTEMPTS times.
+
+    Args:
+        session: Requests session
+        campaign_id: Campaign ID
+
+    Returns:
+        LeadCounts object with all counts
+
+    Raises:
+        RuntimeError: Pages could not be fetched (the campaign is left stale)
+    """
+    first_page = fetch_leads_page(session, campaign_id, 0)
+    if first_page is None:
+        raise RuntimeError(f"Could not fetch leads for campaign {campaign_id}")
+
+    leads = first_page.get('data') or []
+    total = reported_total(first_page)
+
+    # Single-page campaigns need no fan-out
+    if len(leads) < BATCH_SIZE or total <= len(leads):
+        return count_statuses([leads])
+
+    for attempt in range(SCAN_ATTEMPTS):
+        merger = LeadPageMerger()
+        if attempt == 0:
+            merger.add_page(0, first_page)
+
+        offsets = range(BATCH_SIZE if attempt == 0 else 0, total, BATCH_SIZE)
+        with closing(fan_out_lead_pages(campaign_id, offsets)) as pages:
+            for offset, response in pages:
+                merger.add_page(offset, response)
+
+        counts = merger.counts()
+        if merger.consistent(counts):
+            break
+
+        total = max(merger.latest_total, total)
+        if attempt + 1 < SCAN_ATTEMPTS:
+            print(f"⚠ Lead list for campaign {campaign_id} shifted during scan, rescanning")
+        elif merger.failed_pages:
+            raise RuntimeError(f"{merger.failed_pages} lead pages failed for campaign {campaign_id}")
+        else:
+            print(f"⚠ Lead list for campaign {campaign_id} still shifting, using last scan "
+                  f"({counts.total_leads} of {merger.latest_total} leads)")
+
     return counts
 
 
+# ============================================================================
+# LEAD PAGE FAN-OUT
+# ============================================================================
+
+STATUS_CODES = {status: code for code, status in enumerate(LEAD_STATUSES, start=1)}
+
+
+class LeadPageMerger:
+    """
+    Merges concurrently fetched lead pages into exact status counts
+
+    Offset pagination over a changing list can return a lead on two pages
+    (or skip one), so pages are de-duplicated by offset and leads by id.
+    Ids and status codes are kept in 64 hash buckets of compact arrays
+    (9 bytes per lead) and de-duplicated one bucket at a time, so memory
+    stays far below holding the lead dicts.
+    """
+
+    BUCKETS = 64
+
+    def __init__(self):
+        self._ids = [array('q') for _ in range(self.BUCKETS)]
+        self._statuses = [bytearray() for _ in range(self.BUCKETS)]
+        self._anonymous = 0
+        self.pages = set()
+        self.failed_pages = 0
+        self.reported_totals = set()
+        self.latest_total = 0
+
+    def add_page(self, offset: int, response: Optional[Dict]) -> None:
+        """Record one page response (repeated offsets are ignored)"""
+        if offset in self.pages:
+            return
+        if response is None:
+            self.failed_pages += 1
+            return
+
+        self.pages.add(offset)
+        self.latest_total = reported_total(response)
+        self.reported_totals.add(self.latest_total)
+
+        for lead in response.get('data') or []:
+            lead_id = self._lead_id(lead)
+            bucket = lead_id % self.BUCKETS
+            self._ids[bucket].append(lead_id)
+            self._statuses[bucket].append(STATUS_CODES.get((lead.get('status') or '').upper(), 0))
+
+    def _lead_id(self, lead: Dict) -> int:
+        key = lead.get('campaign_lead_map_id') or (lead.get('lead') or {}).get('id') or lead.get('id')
+        if key is None:
+            # No identity to de-duplicate on: count the lead once
+            self._anonymous -= 1
+            return self._anonymous
+        try:
+            return int(key)
+        except (TypeError, ValueError):
+            return hash(str(key)) & 0x7FFFFFFFFFFFFFFF
+
+    def counts(self) -> LeadCounts:
+        """De-duplicated counts; a lead seen twice keeps its last recorded status"""
+        counts = LeadCounts()
+        tally = [0] * (len(LEAD_STATUSES) + 1)
+
+        for ids, statuses in zip(self._ids, self._statuses):
+            latest = dict(zip(ids, statuses))
+            counts.total_leads += len(latest)
+            for code in latest.values():
+                tally[code] += 1
+
+        for status, code in STATUS_CODES.items():
+            setattr(counts, status.lower(), tally[code])
+
+        return counts
+
+    def consistent(self, counts: LeadCounts) -> bool:
+        """True when no page failed, the total held still and every lead was seen"""
+        return (
+            self.failed_pages == 0
+            and len(self.reported_totals) == 1
+            and counts.total_leads == self.latest_total
+        )
+
+
+def reported_total(response: Dict) -> int:
+    """total_leads from a leads page (0 if missing)"""
+    try:
+        return int(response.get('total_leads') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def fetch_leads_page(
+    session: requests.Session,
+    campaign_id: int,
+    offset: int,
+    sent: Optional[List[float]] = None,
+    cancelled: Optional[threading.Event] = None
+) -> Optional[Dict]:
+    """Fetch one BATCH_SIZE page of a campaign's leads"""
+    return make_api_request(
+        session,
+        f"/campaigns/{campaign_id}/leads",
+        params={'limit': BATCH_SIZE, 'offset': offset},
+        sent=sent,
+        cancelled=cancelled
+    )
+
+
+_page_pool: Optional[ThreadPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+_thread_sessions = threading.local()
+
+
+def thread_session() -> requests.Session:
+    """This thread's session (campaign workers and page fetchers each keep one for the whole run)"""
+    session = getattr(_thread_sessions, 'session', None)
+    if session is None:
+        session = _thread_sessions.session = create_session()
+    return session
+
+
+def get_page_pool() -> ThreadPoolExecutor:
+    """Shared pool for page fan-out (separate from the campaign workers, so waiting never deadlocks)"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='smartlead-page')
+        return _page_pool
+
+
+def _fetch_leads_page_pooled(
+    campaign_id: int,
+    offset: int,
+    sent: List[float],
+    cancelled: threading.Event
+) -> Tuple[int, Optional[Dict]]:
+    return offset, fetch_leads_page(thread_session(), campaign_id, offset, sent, cancelled)
+
+
+def fan_out_lead_pages(campaign_id: int, offsets: Iterable[int]) -> Iterator[Tuple[int, Optional[Dict]]]:
+    """
+    Fetch offsets concurrently, yielding (offset, response) as pages complete
+
+    At most one window (the concurrency ceiling) of offsets is outstanding, so
+    completed pages are consumed and dropped before more are requested. A
+    page still unanswered the observed p95 latency after it was actually
+    sent (queueing for a slot does not count) is hedged with a duplicate
+    request; the first usable answer wins and its twin is dropped (an
+    already running twin is flagged so its slot is discarded rather than
+    fed to the AIMD controller). Page fetches run in a copy of the caller's
+    context, so they share its campaign deadline. When the caller stops
+    early (an exception, or close()), every outstanding page is dropped
+    the same way.
+    """
+    pool = get_page_pool()
+    offsets = iter(offsets)
+    in_flight = {}  # future -> offset
+    cancel_flags = {}  # future -> event set when its answer is no longer wanted
+    sent_times = {}  # offset -> send times of its requests (shared by twins)
+    hedged = set()
+
+    def submit(offset: int) -> None:
+        context = contextvars.copy_context()
+        sent = sent_times.setdefault(offset, [])
+        cancelled = threading.Event()
+        future = pool.submit(context.run, _fetch_leads_page_pooled, campaign_id, offset, sent, cancelled)
+        in_flight[future] = offset
+        cancel_flags[future] = cancelled
+
+    try:
+        for offset in islice(offsets, max(1, CONCURRENCY.max_limit)):
+            submit(offset)
+
+        while in_flight:
+            hedge_after = CONCURRENCY.hedge_delay()
+            timeout = None
+            if hedge_after is not None:
+                unhedged = [o for o in set(in_flight.values()) if o not in hedged]
+                sent = [sent_times[o][0] for o in unhedged if sent_times[o]]
+                if sent:
+                    timeout = max(0.0, min(sent) + hedge_after - time.monotonic())
+                elif unhedged:
+                    # Nothing on the wire yet; look again once a request could be due
+                    timeout = hedge_after
+
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                offset = in_flight.pop(future, None)
+                cancel_flags.pop(future, None)
+                if offset is None:
+                    continue
+
+                result = future.result()
+                twins = [f for f, o in in_flight.items() if o == offset]
+                if result[1] is None and twins:
+                    # Let the twin answer instead of recording a failed page
+                    continue
+
+                for twin in twins:
+                    cancel_flags.pop(twin).set()
+                    twin.cancel()
+                    del in_flight[twin]
+                del sent_times[offset]
+
+                yield result
+
+                offset = next(offsets, None)
+                if offset is not None:
+                    submit(offset)
+
+            if hedge_after is not None:
+                now = time.monotonic()
+                for offset in set(in_flight.values()):
+                    sent = sent_times[offset]
+                    if offset not in hedged and sent and now - sent[0] >= hedge_after:
+                        hedged.add(offset)
+                        CONCURRENCY.record_hedge()
+                        submit(offset)
+    finally:
+        for future in in_flight:
+            cancel_flags[future].set()
+            future.cancel()
+
+
+def count_leads_by_status(
+    session: requests.Session,
+    campaign_id: int
+) -> LeadCounts:
+    """
+    Count leads by status for a campaign using COUNT_STRATEGY
+
+    The count-only strategy is tried first; full pagination is kept as the
+    verification fallback when its totals are missing or inconsistent.
+
+    Args:
+        session: Requests session
+        campaign_id: Campaign ID
+
+    Returns:
+        LeadCounts object with all counts
+    """
+    if COUNT_STRATEGY == 'count':
+        counts = count_leads_by_status_fast(session, campaign_id)
+        if counts is not None:
+            return counts
+        print(f"⚠ Inconsistent lead totals for campaign {campaign_id}, falling back to full pagination")
+
+    return count_leads_by_status_paginated(session, campaign_id)
+
+
 def process_single_campaign(
     session: requests.Session,
     campaign: Dict,
@@ -334,33 +1171,170 @@ def process_single_campaign(
     Returns:
         CampaignData object
     """
-    campaign_id = campaign['id']
+    # Per-campaign deadline, never beyond the stage budget
+    token = tighten_deadline(CAMPAIGN_DEADLINE)
+    try:
+        # Count leads by status
+        lead_counts = count_leads_by_status(session, campaign['id'])
+        return build_campaign_data(campaign, client_map, lead_counts)
+
+    except Exception as e:
+        return build_campaign_data(campaign, client_map, LeadCounts(), error=str(e))
+    finally:
+        _deadline.reset(token)
+
+
+def _process_campaign_pooled(campaign: Dict, client_map: Dict[int, Dict]) -> CampaignData:
+    return process_single_campaign(thread_session(), campaign, client_map)
+
+
+def build_campaign_data(
+    campaign: Dict,
+    client_map: Dict[int, Dict],
+    lead_counts: LeadCounts,
+    error: Optional[str] = None,
+    fetched_at: Optional[datetime] = None,
+    from_cache: bool = False,
+    stale: Optional[bool] = None
+) -> CampaignData:
+    """
+    Attach lead counts to a /campaigns entry
+
+    Args:
+        campaign: Campaign dict
+        client_map: Client information map
+        lead_counts: Counts for the campaign
+        error: Error message if counting failed
+        fetched_at: When the counts were taken (defaults to now)
+        from_cache: True when the counts were reused from an earlier run
+        stale: True when the counts were not refreshed this run
+            (defaults to True when error is set)
+
+    Returns:
+        CampaignData object
+    """
     client_id = campaign.get('client_id')
 
     # Get client info
     client_info = client_map.get(client_id, {})
     client_name = campaign.get('client_name') or client_info.get('name', 'Unknown')
 
-    try:
-        # Count leads by status
-        lead_counts = count_leads_by_status(session, campaign_id)
+    return CampaignData(
+        campaign_id=campaign['id'],
+        campaign_name=campaign.get('name', 'Unknown'),
+        client_name=client_name,
+        lead_counts=lead_counts,
+        error=error,
+        client_id=client_id,
+        campaign_status=campaign.get('status'),
+        campaign_updated_at=campaign.get('updated_at'),
+        fetched_at=fetched_at or datetime.now(timezone.utc),
+        from_cache=from_cache,
+        stale=bool(error) if stale is None else stale
+    )
 
-        return CampaignData(
-            campaign_id=campaign_id,
-            campaign_name=campaign.get('name', 'Unknown'),
-            client_name=client_name,
-            lead_counts=lead_counts
-        )
 
-    except Exception as e:
-        return CampaignData(
-            campaign_id=campaign_id,
-            campaign_name=campaign.get('name', 'Unknown'),
-            client_name=client_name,
-            lead_counts=LeadCounts(),
-            error=str(e)
+def split_cached_campaigns(
+    campaigns: List[Dict],
+    client_map: Dict[int, Dict],
+    cached: Optional[Dict[int, CampaignData]] = None,
+    force_recount: Optional[Set[int]] = None,
+    resume_since: Optional[datetime] = None
+) -> Tuple[List[Dict], List[CampaignData]]:
+    """
+    Decide which campaigns need recounting
+
+    A cached entry is reused unless the campaign's status, client or
+    updated_at changed, the counts are older than COUNTS_TTL_HOURS, the
+    previous count failed, or the campaign is in force_recount.
+    Entries counted at or after resume_since (checkpointed by an
+    interrupted run) are reused even if in force_recount or expired.
+    Campaigns to count are ordered largest (by previous total) first.
+
+    Args:
+        campaigns: Active campaigns from /campaigns
+        client_map: Client information map
+        cached: Previous counts keyed by campaign_id
+        force_recount: Campaign ids to recount regardless of the cache
+        resume_since: Start of the run window being resumed, if any
+
+    Returns:
+        (campaigns to count, CampaignData reused from the cache)
+    """
+    if not cached:
+        return campaigns, []
+
+    force_recount = force_recount or set()
+    expires_before = datetime.now(timezone.utc) - timedelta(hours=COUNTS_TTL_HOURS)
+    to_count = []
+    reused = []
+
+    for campaign in campaigns:
+        entry = cached.get(campaign['id'])
+        resumed = (
+            resume_since is not None
+            and entry is not None
+            and entry.fetched_at is not None
+            and entry.fetched_at >= resume_since
         )
 
+        if (
+            entry is None
+            or entry.error
+            or (campaign['id'] in force_recount and not resumed)
+            or entry.fetched_at is None
+            or (entry.fetched_at < expires_before and not resumed)
+            or entry.campaign_status != campaign.get('status')
+            or entry.campaign_updated_at != campaign.get('updated_at')
+            or entry.client_id != campaign.get('client_id')
+        ):
+            to_count.append(campaign)
+        else:
+            reused.append(build_campaign_data(
+                campaign, client_map, entry.lead_counts,
+                fetched_at=entry.fetched_at, from_cache=True
+            ))
+
+    # Largest campaigns first so the long pole starts immediately; campaigns
+    # without a previous count could be any size and go ahead of them
+    def previous_total(campaign: Dict) -> float:
+        entry = cached.get(campaign['id'])
+        return entry.lead_counts.total_leads if entry is not None else float('inf')
+
+    to_count.sort(key=previous_total, reverse=True)
+
+    print(f"✓ Reusing cached counts for {len(reused)} campaigns, recounting {len(to_count)}")
+    return to_count, reused
+
+
+def apply_cached_fallback(
+    counted: List[CampaignData],
+    campaigns: List[Dict],
+    client_map: Dict[int, Dict],
+    cached: Optional[Dict[int, CampaignData]] = None
+) -> List[CampaignData]:
+    """
+    Replace stale results (failed or out of time) with the last known counts
+    where there are any; they stay marked stale, and the error is kept so
+    they are not saved as fresh counts
+    """
+    if not cached:
+        return counted
+
+    campaigns_by_id = {campaign['id']: campaign for campaign in campaigns}
+    results = []
+
+    for data in counted:
+        entry = cached.get(data.campaign_id)
+        if data.stale and entry is not None:
+            data = build_campaign_data(
+                campaigns_by_id[data.campaign_id], client_map, entry.lead_counts,
+                error=data.error, fetched_at=entry.fetched_at, from_cache=True, stale=True
+            )
+        results.append(data)
+
+    return results
+
 
 # ============================================================================
 # CONSOLIDATION
@@ -390,6 +1364,11 @@ def consolidate_by_client(campaign_data: List[CampaignData]) -> List[ClientSumma
         clients[client_name].not_contacted += data.lead_counts.not_yet_contacted
         clients[client_name].campaign_count += 1
 
+        if data.stale:
+            clients[client_name].stale_campaigns += 1
+            if not data.from_cache:
+                clients[client_name].missing_campaigns += 1
+
     # Convert to list and sort by client name
     return sorted(clients.values(), key=lambda x: x.client_name)
 
@@ -400,7 +1379,8 @@ def consolidate_by_client(campaign_data: List[CampaignData]) -> List[ClientSumma
 
 def process_all_campaigns(
     campaigns: List[Dict],
-    client_map: Dict[int, Dict]
+    client_map: Dict[int, Dict],
+    on_result: Optional[Callable[[CampaignData], None]] = None
 ) -> List[CampaignData]:
     """
     Process all campaigns in parallel to get lead counts
@@ -408,6 +1388,8 @@ def process_all_campaigns(
     Args:
         campaigns: List of campaign dicts
         client_map: Client information map
+        on_result: Called (on this thread) with each result as it completes,
+            e.g. to checkpoint counts before the stage finishes
 
     Returns:
         List of CampaignData objects
@@ -416,64 +1398,596 @@ def process_all_campaigns(
     total = len(campaigns)
     process_start_time = time.time()
 
-    print(f"\nProcessing {total} campaigns with {MAX_WORKERS} workers...")
-
-    # Create a session for each worker
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # Submit all campaigns for processing
-        future_to_campaign = {
-            executor.submit(
-                process_single_campaign,
-                create_session(),
-                campaign,
-                client_map
-            ): campaign['id']
-            for campaign in campaigns
-        }
-
-        # Process completed futures
-        completed = 0
-        last_progress_time = process_start_time
+    CONCURRENCY.reset(MAX_WORKERS)
+    print(f"\nProcessing {total} campaigns with up to {MAX_WORKERS} workers "
+          f"(adaptive concurrency {'on' if ADAPTIVE_CONCURRENCY else 'off'})...")
+
+    # Each worker thread reuses one session (and its connection pool) for
+    # all its campaigns; each campaign runs in a copy of this context so it
+    # inherits the stage budget
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    future_to_campaign = {
+        executor.submit(
+            contextvars.copy_context().run,
+            _process_campaign_pooled,
+            campaign,
+            client_map
+        ): campaign
+        for campaign in campaigns
+    }
+    pending = set(future_to_campaign)
 
-        for future in as_completed(future_to_campaign):
-            campaign_id = future_to_campaign[future]
+    completed = 0
+    last_progress_time = process_start_time
 
-            try:
-                # Use timeout to prevent hanging on stuck campaigns
-                result = future.result(timeout=600)  # 10 minute timeout
-                results.append(result)
+    try:
+        while pending:
+            # Workers stop at the stage deadline on their own; the grace
+            # period only guards against a request that ignores its timeout
+            remaining = remaining_time()
+            timeout = None if remaining is None else max(0.0, remaining) + REQUEST_TIMEOUT
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+
+            for future in done:
+                campaign = future_to_campaign[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"⚠ Error processing campaign {campaign['id']}: {e}")
+                    results.append(build_campaign_data(campaign, client_map, LeadCounts(), error=str(e)))
                 completed += 1
 
+                if on_result is not None:
+                    on_result(results[-1])
+
                 # Progress reporting
-                elapsed_time = time.time() - process_start_time
                 current_time = time.time()
+                elapsed_time = current_time - process_start_time
                 time_since_last_progress = current_time - last_progress_time
 
                 # Report every 10 campaigns, or every 30 seconds, or when complete
                 if (completed % 10 == 0) or (completed == total) or (time_since_last_progress >= 30):
                     avg_time = elapsed_time / completed if completed > 0 else 0
-                    remaining = total - completed
-                    est_remaining = avg_time * remaining
+                    remaining_campaigns = total - completed
+                    est_remaining = avg_time * remaining_campaigns
 
                     print(f"  Progress: {completed}/{total} campaigns processed "
                           f"({completed/total*100:.1f}%) | "
                           f"Est. remaining: {est_remaining/60:.1f}min")
+                    print(f"    {CONCURRENCY.summary()}")
 
                     last_progress_time = current_time
+    finally:
+        executor.shutdown(wait=not pending, cancel_futures=True)
 
-            except FutureTimeoutError:
-                print(f"⚠ Timeout processing campaign {campaign_id}")
-                completed += 1
-            except Exception as e:
-                print(f"⚠ Error processing campaign {campaign_id}: {e}")
-                completed += 1
+    if pending:
+        print(f"⚠ Time budget exhausted, {len(pending)} campaigns left stale")
+        for future in pending:
+            results.append(build_campaign_data(
+                future_to_campaign[future], client_map, LeadCounts(), error="time budget exhausted"
+            ))
 
     total_time = time.time() - process_start_time
     print(f"\n✓ Processed {len(results)} campaigns in {total_time:.1f} seconds ({total_time/60:.2f} minutes)")
+    print(f"  {CONCURRENCY.summary()}")
+    if get_cassette() is not None:
+        print(f"  {get_cassette().summary()}")
 
     return results
 
 
+# ============================================================================
+# ASYNC ENGINE (aiohttp)
+# ============================================================================
+
+def create_async_session() -> "aiohttp.ClientSession":
+    """
+    Create the shared keep-alive aiohttp session (must run inside the event loop)
+
+    With SMARTLEAD_CASSETTE set, the session is wrapped to record responses,
+    or replaced entirely when replaying.
+    """
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == 'replay':
+        return CassetteAsyncSession(cassette)
+
+    connector = aiohttp.TCPConnector(limit=ASYNC_CONCURRENCY, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return CassetteAsyncSession(cassette, session) if cassette is not None else session
+
+
+async def make_api_request_async(
+    session: "aiohttp.ClientSession",
+    endpoint: str,
+    params: Optional[Dict] = None,
+    method: str = "GET",
+    sent: Optional[List[float]] = None
+) -> Optional[Dict]:
+    """
+    Async counterpart of make_api_request, gated by CONCURRENCY and RATE_LIMITER
+
+    Retries RETRY_STATUSES with exponential backoff (honouring Retry-After).
+
+    Returns:
+        Response JSON or None if error
+    """
+    url = f"{BASE_URL}{endpoint}"
+
+    params = dict(params or {})
+    params['api_key'] = API_KEY
+    request_deadline = time.monotonic() + REQUEST_DEADLINE
+
+    for attempt in range(MAX_RETRIES + 1):
+        timeout = attempt_timeout(endpoint, request_deadline)
+        if timeout is None:
+            return None
+
+        await CONCURRENCY.acquire_async()
+        status = None
+        cancelled = False
+        sent_at = time.monotonic()
+
+        try:
+            await RATE_LIMITER.acquire()
+            sent_at = time.monotonic()
+            if sent is not None:
+                sent.append(sent_at)
+
+            async with session.request(
+                method, url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                status = response.status
+
+                if status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    delay = retry_delay(response.headers.get('Retry-After', ''), attempt)
+                else:
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+
+        except aiohttp.ClientResponseError as e:
+            print(f"⚠ HTTP error for {endpoint}: {e.status} {e.message}")
+            return None
+        except asyncio.TimeoutError:
+            check_deadline(endpoint)
+            print(f"⚠ Timeout for {endpoint}")
+            return None
+        except aiohttp.ClientError as e:
+            print(f"⚠ Request error for {endpoint}: {e}")
+            return None
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if cancelled:
+                CONCURRENCY.discard()
+            else:
+                CONCURRENCY.release(time.monotonic() - sent_at, status)
+
+        # Back off without holding a concurrency slot
+        await asyncio.sleep(min(delay, max(0.0, request_deadline - time.monotonic())))
+
+    return None
+
+
+async def fetch_active_campaigns_async(session: "aiohttp.ClientSession") -> List[Dict]:
+    """Fetch all active campaigns"""
+    print("Fetching campaigns...")
+
+    campaigns = await make_api_request_async(session, "/campaigns", params={"include_tags": "true"})
+
+    return parse_active_campaigns(campaigns)
+
+
+async def fetch_all_clients_async(session: "aiohttp.ClientSession") -> Dict[int, Dict]:
+    """Fetch all clients and return as a dictionary keyed by client_id"""
+    print("Fetching clients...")
+
+    clients = await make_api_request_async(session, "/client/")
+
+    return parse_client_map(clients)
+
+
+async def fetch_lead_total_async(
+    session: "aiohttp.ClientSession",
+    campaign_id: int,
+    status_filter: Optional[str] = None
+) -> Optional[int]:
+    """Read a campaign's lead total from a single limit=1 page"""
+    params = {'limit': 1, 'offset': 0}
+
+    if status_filter:
+        params['status'] = status_filter
+
+    response = await hedged_request_async(
+        session,
+        f"/campaigns/{campaign_id}/leads",
+        params=params
+    )
+
+    if not isinstance(response, dict) or response.get('total_leads') is None:
+        return None
+
+    try:
+        return int(response['total_leads'])
+    except (TypeError, ValueError):
+        return None
+
+
+async def iter_campaign_lead_pages_async(
+    session: "aiohttp.ClientSession",
+    campaign_id: int,
+    status_filter: Optional[str] = None
+) -> AsyncIterator[List[Dict]]:
+    """Async counterpart of iter_campaign_lead_pages (pacing comes from RATE_LIMITER)"""
+    fetched = 0
+    offset = 0
+
+    params = {
+        'limit': BATCH_SIZE,
+        'offset': offset
+    }
+
+    if status_filter:
+        params['status'] = status_filter
+
+    while True:
+        params['offset'] = offset
+
+        response = await make_api_request_async(
+            session,
+            f"/campaigns/{campaign_id}/leads",
+            params=params
+        )
+
+        if response is None:
+            break
+
+        leads = response.get('data', [])
+        total_leads = int(response.get('total_leads', 0)) if response.get('total_leads') else 0
+
+        if not leads:
+            break
+
+        fetched += len(leads)
+        yield leads
+
+        if fetched >= total_leads or len(leads) < BATCH_SIZE:
+            break
+
+        offset += BATCH_SIZE
+
+
+async def count_leads_by_status_async(
+    session: "aiohttp.ClientSession",
+    campaign_id: int
+) -> LeadCounts:
+    """Async counterpart of count_leads_by_status (status totals fetched concurrently)"""
+    if COUNT_STRATEGY == 'count':
+        totals = await asyncio.gather(
+            fetch_lead_total_async(session, campaign_id),
+            *(fetch_lead_total_async(session, campaign_id, status_filter=status) for status in LEAD_STATUSES)
+        )
+
+        if all(total is not None for total in totals):
+            counts = LeadCounts(total_leads=totals[0])
+            for status, status_total in zip(LEAD_STATUSES, totals[1:]):
+                setattr(counts, status.lower(), status_total)
+
+            if status_totals_consistent(counts):
+                return counts
+
+        print(f"⚠ Inconsistent lead totals for campaign {campaign_id}, falling back to full pagination")
+
+    return await count_leads_by_status_paginated_async(session, campaign_id)
+
+
+async def hedged_request_async(
+    session: "aiohttp.ClientSession",
+    endpoint: str,
+    params: Optional[Dict] = None
+) -> Optional[Dict]:
+    """
+    make_api_request_async with hedging: if no answer arrives within the
+    observed p95 latency of the request being sent (time spent waiting for
+    a slot or the rate limiter does not count), a duplicate is sent and the
+    first usable answer wins (the other request is cancelled)
+    """
+    sent = []
+    primary = asyncio.ensure_future(make_api_request_async(session, endpoint, params, sent=sent))
+    hedge_after = CONCURRENCY.hedge_delay()
+    if hedge_after is None:
+        return await primary
+
+    while True:
+        wait_for = hedge_after - (time.monotonic() - sent[-1]) if sent else hedge_after
+        if wait_for <= 0:
+            break
+        done, _ = await asyncio.wait({primary}, timeout=wait_for)
+        if done:
+            return primary.result()
+
+    CONCURRENCY.record_hedge()
+    pending = {primary, asyncio.ensure_future(make_api_request_async(session, endpoint, params))}
+    result = None
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result is not None:
+                    return result
+        return result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def fetch_leads_page_async(
+    session: "aiohttp.ClientSession",
+    campaign_id: int,
+    offset: int
+) -> Tuple[int, Optional[Dict]]:
+    """Fetch one BATCH_SIZE page of a campaign's leads (hedged)"""
+    response = await hedged_request_async(
+        session,
+        f"/campaigns/{campaign_id}/leads",
+        params={'limit': BATCH_SIZE, 'offset': offset}
+    )
+    return offset, response
+
+
+async def fan_out_lead_pages_async(
+    session: "aiohttp.ClientSession",
+    campaign_id: int,
+    offsets: Iterable[int]
+) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+    """Async counterpart of fan_out_lead_pages"""
+    offsets = iter(offsets)
+    pending = {
+        asyncio.ensure_future(fetch_leads_page_async(session, campaign_id, offset))
+        for offset in islice(offsets, max(1, CONCURRENCY.max_limit))
+    }
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.add(asyncio.ensure_future(fetch_leads_page_async(session, campaign_id, offset)))
+    finally:
+        # The caller stopped early: don't leave pages running for an abandoned campaign
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def count_leads_by_status_paginated_async(
+    session: "aiohttp.ClientSession",
+    campaign_id: int
+) -> LeadCounts:
+    """Async counterpart of count_leads_by_status_paginated"""
+    _, first_page = await fetch_leads_page_async(session, campaign_id, 0)
+    if first_page is None:
+        raise RuntimeError(f"Could not fetch leads for campaign {campaign_id}")
+
+    leads = first_page.get('data') or []
+    total = reported_total(first_page)
+
+    if len(leads) < BATCH_SIZE or total <= len(leads):
+        return count_statuses([leads])
+
+    for attempt in range(SCAN_ATTEMPTS):
+        merger = LeadPageMerger()
+        if attempt == 0:
+            merger.add_page(0, first_page)
+
+        offsets = range(BATCH_SIZE if attempt == 0 else 0, total, BATCH_SIZE)
+        pages = fan_out_lead_pages_async(session, campaign_id, offsets)
+        try:
+            async for offset, response in pages:
+                merger.add_page(offset, response)
+        finally:
+            await pages.aclose()
+
+        counts = merger.counts()
+        if merger.consistent(counts):
+            break
+
+        total = max(merger.latest_total, total)
+        if attempt + 1 < SCAN_ATTEMPTS:
+            print(f"⚠ Lead list for campaign {campaign_id} shifted during scan, rescanning")
+        elif merger.failed_pages:
+            raise RuntimeError(f"{merger.failed_pages} lead pages failed for campaign {campaign_id}")
+        else:
+            print(f"⚠ Lead list for campaign {campaign_id} still shifting, using last scan "
+                  f"({counts.total_leads} of {merger.latest_total} leads)")
+
+    return counts
+
+
+async def process_single_campaign_async(
+    session: "aiohttp.ClientSession",
+    campaign: Dict,
+    client_map: Dict[int, Dict]
+) -> CampaignData:
+    """Async counterpart of process_single_campaign"""
+    # Runs in its own task, so the tightened deadline stays local to it
+    tighten_deadline(CAMPAIGN_DEADLINE)
+    try:
+        lead_counts = await count_leads_by_status_async(session, campaign['id'])
+        return build_campaign_data(campaign, client_map, lead_counts)
+
+    except Exception as e:
+        return build_campaign_data(campaign, client_map, LeadCounts(), error=str(e))
+
+
+async def process_all_campaigns_async(
+    session: "aiohttp.ClientSession",
+    campaigns: List[Dict],
+    client_map: Dict[int, Dict],
+    on_result: Optional[Callable[[CampaignData], None]] = None
+) -> List[CampaignData]:
+    """
+    Process all campaigns concurrently on one shared session
+
+    In-flight requests are bounded by CONCURRENCY (adaptive, up to
+    ASYNC_CONCURRENCY) and request rate by RATE_LIMITER. on_result is
+    called on the event loop with each result as it completes.
+    """
+    results = []
+    total = len(campaigns)
+    process_start_time = time.time()
+
+    CONCURRENCY.reset(ASYNC_CONCURRENCY)
+    print(f"\nProcessing {total} campaigns (async, up to {ASYNC_CONCURRENCY} connections, "
+          f"{RATE_LIMIT_PER_SEC:g} req/s, adaptive concurrency {'on' if ADAPTIVE_CONCURRENCY else 'off'})...")
+
+    # Campaigns start in submission order (largest first from split_cached_campaigns),
+    # at most ASYNC_CONCURRENCY at a time; the next one starts as one finishes
+    queued = deque(campaigns)
+    task_to_campaign = {}
+    pending = set()
+
+    def start_queued():
+        while queued and len(pending) < ASYNC_CONCURRENCY:
+            campaign = queued.popleft()
+            task = asyncio.ensure_future(process_single_campaign_async(session, campaign, client_map))
+            task_to_campaign[task] = campaign
+            pending.add(task)
+
+    start_queued()
+    completed = 0
+    last_progress_time = process_start_time
+
+    while pending:
+        remaining = remaining_time()
+        timeout = None if remaining is None else max(0.0, remaining) + REQUEST_TIMEOUT
+        done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            break
+
+        for task in done:
+            results.append(task.result())
+            completed += 1
+
+            if on_result is not None:
+                on_result(results[-1])
+
+            current_time = time.time()
+            if (completed % 10 == 0) or (completed == total) or (current_time - last_progress_time >= 30):
+                elapsed_time = current_time - process_start_time
+                est_remaining = elapsed_time / completed * (total - completed)
+
+                print(f"  Progress: {completed}/{total} campaigns processed "
+                      f"({completed/total*100:.1f}%) | "
+                      f"Est. remaining: {est_remaining/60:.1f}min")
+                print(f"    {CONCURRENCY.summary()}")
+
+                last_progress_time = current_time
+
+        start_queued()
+
+    if pending or queued:
+        print(f"⚠ Time budget exhausted, {len(pending) + len(queued)} campaigns left stale")
+        for task in pending:
+            task.cancel()
+        for campaign in [task_to_campaign[task] for task in pending] + list(queued):
+            results.append(build_campaign_data(
+                campaign, client_map, LeadCounts(), error="time budget exhausted"
+            ))
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    total_time = time.time() - process_start_time
+    print(f"\n✓ Processed {len(results)} campaigns in {total_time:.1f} seconds ({total_time/60:.2f} minutes)")
+    print(f"  {CONCURRENCY.summary()}")
+    if get_cassette() is not None:
+        print(f"  {get_cassette().summary()}")
+
+    return results
+
+
+async def collect_campaign_data_async(
+    cached: Optional[Dict[int, CampaignData]] = None,
+    force_recount: Optional[Set[int]] = None,
+    resume_since: Optional[datetime] = None,
+    on_result: Optional[Callable[[CampaignData], None]] = None
+) -> List[CampaignData]:
+    """Fetch campaigns, clients and lead counts on one shared aiohttp session"""
+    if STAGE_BUDGET > 0:
+        tighten_deadline(STAGE_BUDGET)
+
+    async with create_async_session() as session:
+        campaigns = await fetch_active_campaigns_async(session)
+        if not campaigns:
+            return []
+
+        client_map = await fetch_all_clients_async(session)
+
+        to_count, reused = split_cached_campaigns(campaigns, client_map, cached, force_recount, resume_since)
+        counted = await process_all_campaigns_async(session, to_count, client_map, on_result) if to_count else []
+
+        return apply_cached_fallback(counted, to_count, client_map, cached) + reused
+
+
+def collect_campaign_data(
+    cached: Optional[Dict[int, CampaignData]] = None,
+    force_recount: Optional[Set[int]] = None,
+    resume_since: Optional[datetime] = None,
+    on_result: Optional[Callable[[CampaignData], None]] = None
+) -> List[CampaignData]:
+    """
+    Fetch lead counts for every active campaign with the configured engine
+
+    Uses the async engine when SMARTLEAD_ENGINE=async and aiohttp is
+    installed, otherwise the thread-pool engine. The whole fetch is bounded
+    by SMARTLEAD_STAGE_BUDGET: campaigns not counted in time (or whose count
+    failed) come back with stale=True, carrying their last known counts
+    when cached has them.
+
+    Args:
+        cached: Counts from an earlier run keyed by campaign_id; entries
+            still valid per split_cached_campaigns are reused, not recounted
+        force_recount: Campaign ids to recount even if cached
+        resume_since: Reuse cached entries counted at or after this time
+            (the window of an interrupted run being resumed)
+        on_result: Called with each counted campaign as it completes, so
+            results can be checkpointed before the stage finishes
+
+    Returns:
+        List of CampaignData objects (empty if no active campaigns)
+    """
+    if SMARTLEAD_ENGINE == 'async' and aiohttp is not None:
+        return asyncio.run(collect_campaign_data_async(cached, force_recount, resume_since, on_result))
+
+    if SMARTLEAD_ENGINE == 'async':
+        print("⚠ aiohttp not installed, using thread-pool engine")
+
+    token = tighten_deadline(STAGE_BUDGET) if STAGE_BUDGET > 0 else None
+    session = create_session()
+    try:
+        campaigns = fetch_active_campaigns(session)
+        if not campaigns:
+            return []
+
+        client_map = fetch_all_clients(session)
+
+        to_count, reused = split_cached_campaigns(campaigns, client_map, cached, force_recount, resume_since)
+        counted = process_all_campaigns(to_count, client_map, on_result) if to_count else []
+
+        return apply_cached_fallback(counted, to_count, client_map, cached) + reused
+    finally:
+        session.close()
+        if token is not None:
+            _deadline.reset(token)
+
+
 # ============================================================================
 # OUTPUT
 # ============================================================================
@@ -502,6 +2016,11 @@ def print_results(client_summaries: List[ClientSummary]) -> None:
     # Print summary footer
     print("\n" + "─"*80)
     print(f"Total Clients: {total_clients}")
+
+    stale_campaigns = sum(s.stale_campaigns for s in client_summaries)
+    if stale_campaigns:
+        incomplete = sum(1 for s in client_summaries if s.missing_campaigns)
+        print(f"Stale Campaigns: {stale_campaigns} ({incomplete} clients with incomplete totals)")
     print(f"Total Leads: {total_leads:,}")
 
     if total_leads > 0:
@@ -532,22 +2051,13 @@ def main():
         print("Set it with: export SMARTLEAD_API_KEY='your_key_here'")
         return 1
 
-    # Create session
-    session = create_session()
-
     try:
-        # Step 1: Fetch all campaigns
-        all_campaigns = fetch_active_campaigns(session)
-        if not all_campaigns:
+        # Steps 1-3: Fetch campaigns and clients, count leads per campaign
+        campaign_data = collect_campaign_data()
+        if not campaign_data:
             print("✗ No active campaigns found. Exiting.")
             return 0
 
-        # Step 2: Fetch all clients
-        client_map = fetch_all_clients(session)
-
-        # Step 3: Process all active campaigns in parallel
-        campaign_data = process_all_campaigns(all_campaigns, client_map)
-
         # Step 4: Consolidate by client
         client_summaries = consolidate_by_client(campaign_data)
 
@@ -568,8 +2078,6 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
-    finally:
-        session.close()
 
 
 if __name__ == "__main__":
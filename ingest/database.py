@@ -1,13 +1,417 @@
 """
 Database connection management for Client Health Dashboard v1
 """
+import os
+import re
+import time
+import atexit
+import hashlib
+import weakref
 import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import chain, count, islice
 import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from typing import List, Optional
+from psycopg2 import sql
+from psycopg2.extras import execute_batch, execute_values
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence
+from query_stats import InstrumentedCursor, query_label, record_query, statement_label
 
 logger = logging.getLogger(__name__)
 
+# Bulk loads with at least this many rows go through COPY + staging table,
+# smaller ones through multi-row INSERT ... VALUES pages
+BULK_COPY_THRESHOLD = int(os.getenv('BULK_COPY_THRESHOLD', '5000'))
+BULK_PAGE_SIZE = int(os.getenv('BULK_PAGE_SIZE', '1000'))
+
+# Rows fetched per round trip by execute_read_iter (server-side cursors)
+READ_ITERSIZE = int(os.getenv('READ_ITERSIZE', '2000'))
+
+# Statements per round trip in LocalDatabase.execute_pipelined
+PIPELINE_PAGE_SIZE = int(os.getenv('PIPELINE_PAGE_SIZE', '500'))
+
+# Connections kept per database (pool ceiling; callers beyond it wait)
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '4'))
+# Seconds to wait for a free pooled connection before giving up
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '60'))
+
+# Session settings applied once to every pooled connection ('' = server default)
+SOURCE_STATEMENT_TIMEOUT = os.getenv('SOURCE_DB_STATEMENT_TIMEOUT', '')
+LOCAL_STATEMENT_TIMEOUT = os.getenv('LOCAL_DB_STATEMENT_TIMEOUT', '')
+LOCAL_WORK_MEM = os.getenv('LOCAL_DB_WORK_MEM', '')
+
+# Bookings (interested_leads) live in a separate local database, peer auth
+BOOKINGS_DB_URL = os.getenv('BOOKINGS_DB_URL', 'dbname=hyperke_dashboard user=ubuntu host=/var/run/postgresql')
+
+
+@dataclass
+class BulkLoadResult:
+    """Outcome of a LocalDatabase bulk load"""
+    table: str
+    strategy: str
+    rows: int = 0
+    affected: int = 0
+    seconds: float = 0.0
+    returned: List[tuple] = field(default_factory=list)
+
+
+def _copy_text_value(value) -> str:
+    """Format a Python value as a COPY text-format field"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+class _CopyRowStream:
+    """File-like reader that renders rows as COPY text lazily, for copy_expert"""
+
+    def __init__(self, rows: Iterable[Sequence]):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self.row_count = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += '\t'.join(_copy_text_value(v) for v in row) + '\n'
+            self.row_count += 1
+
+        if size < 0:
+            chunk, self._buffer = self._buffer, ''
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+@dataclass
+class PoolStats:
+    """Usage counters of a ConnectionPool"""
+    created: int = 0
+    checkouts: int = 0
+    waits: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    in_use: int = 0
+    peak_in_use: int = 0
+
+
+# Server-side prepared statements live as long as the session, so the cache
+# of what has been prepared is kept per physical connection (pooled
+# connections outlive the LocalDatabase objects that check them out)
+_prepared_statements: "weakref.WeakKeyDictionary[psycopg2.extensions.connection, set]" = weakref.WeakKeyDictionary()
+
+_PLACEHOLDER = re.compile(r'%%|%s|%\(')
+
+
+def _prepare_sql(query: str):
+    """Translate a %s-style query to PREPARE syntax ($1, $2, ...); returns (statement name, SQL, param count)"""
+    count = 0
+
+    def number(match):
+        nonlocal count
+        if match.group() == '%%':
+            return '%'
+        if match.group() == '%(':
+            raise ValueError("Prepared statements take positional %s parameters only")
+        count += 1
+        return f"${count}"
+
+    body = _PLACEHOLDER.sub(number, query).strip().rstrip(';')
+    name = 'stmt_' + hashlib.sha1(body.encode()).hexdigest()[:16]
+    return name, body, count
+
+
+_cursor_ids = count(1)
+
+
+def _close_iterators(iterators: "weakref.WeakSet[Iterator]"):
+    """Finish execute_read_iter generators left part-way, while their connection is still checked out"""
+    for batches in list(iterators):
+        batches.close()
+
+
+def _iter_batches(conn: psycopg2.extensions.connection, query: str, params, itersize: int) -> Iterator[List[tuple]]:
+    """
+    Run a query through a server-side named cursor and yield its rows in batches
+
+    Only itersize rows are held client-side at a time (one FETCH per
+    batch). The cursor lives in the current transaction, so the caller
+    must not commit on this connection until iteration finishes.
+    """
+    label = statement_label(query)
+    seconds = 0.0
+    total = 0
+    try:
+        with conn.cursor(name=f"read_iter_{next(_cursor_ids)}") as cur:
+            cur.itersize = itersize
+            start = time.monotonic()
+            cur.execute(query, params or ())
+            while True:
+                rows = cur.fetchmany(itersize)
+                seconds += time.monotonic() - start
+                if not rows:
+                    break
+                total += len(rows)
+                yield rows
+                start = time.monotonic()
+    finally:
+        # Time spent in the database only, not in the caller between batches
+        record_query(label, seconds, total)
+
+
+class PoolExhaustedError(RuntimeError):
+    """No pooled connection became free within DB_POOL_TIMEOUT"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of connections to one database
+
+    Physical connections are opened lazily (up to max_connections) and
+    reused, so each TLS handshake and session setup happens once per run
+    instead of once per stage. Session settings (read-only mode,
+    statement_timeout, work_mem) are applied when a connection is opened
+    and survive reuse, so they are fixed when the pool is created. When
+    every connection is checked out, callers block until one is returned
+    (the wait is recorded in stats), and raise PoolExhaustedError after
+    timeout seconds instead of hanging. Cursors are
+    InstrumentedCursor, so every statement is timed (see query_stats).
+    """
+
+    def __init__(
+        self,
+        conn_url: str,
+        name: str,
+        read_only: bool = False,
+        settings: Optional[Dict[str, str]] = None,
+        max_connections: int = DB_POOL_MAX,
+        timeout: float = DB_POOL_TIMEOUT
+    ):
+        self.conn_url = conn_url
+        self.name = name
+        self.read_only = read_only
+        self.settings = _session_settings(settings)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.stats = PoolStats()
+        self._idle: List[psycopg2.extensions.connection] = []
+        self._closed = False
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+
+    def getconn(self) -> psycopg2.extensions.connection:
+        """Check out a connection, waiting for one if the pool is exhausted"""
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            if not self._slots.acquire(timeout=self.timeout):
+                raise PoolExhaustedError(
+                    f"{self.name}: all {self.max_connections} pooled connections stayed checked out "
+                    f"for {self.timeout:g}s. A caller is holding more connections to this database "
+                    f"at once than DB_POOL_MAX allows (or one was never closed)"
+                )
+            waited = time.monotonic() - start
+            with self._lock:
+                self.stats.waits += 1
+                self.stats.wait_seconds += waited
+                self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None or conn.closed:
+                conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.stats.checkouts += 1
+            self.stats.in_use += 1
+            self.stats.peak_in_use = max(self.stats.peak_in_use, self.stats.in_use)
+        return conn
+
+    def putconn(self, conn: psycopg2.extensions.connection):
+        """
+        Return a connection; one left mid-transaction is rolled back first,
+        and the pool's autocommit mode (on for read-only pools) is restored
+        in case a caller switched it (e.g. an abandoned execute_read_iter)
+        """
+        reusable = not conn.closed
+        if reusable:
+            status = conn.get_transaction_status()
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                # Server connection lost
+                reusable = False
+            else:
+                try:
+                    if status != TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    if conn.autocommit != self.read_only:
+                        conn.autocommit = self.read_only
+                except psycopg2.Error:
+                    reusable = False
+
+        with self._lock:
+            reusable = reusable and not self._closed
+            if reusable:
+                self._idle.append(conn)
+            self.stats.in_use -= 1
+        if not reusable and not conn.closed:
+            conn.close()
+        self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[psycopg2.extensions.connection]:
+        """Check out a connection for the duration of a with block"""
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def _connect(self) -> psycopg2.extensions.connection:
+        """Open a connection and apply the session settings once"""
+        conn = psycopg2.connect(self.conn_url, cursor_factory=InstrumentedCursor)
+        try:
+            if self.read_only:
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            # Session setup is not part of the statement timings
+            with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+                if self.read_only:
+                    cur.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY;")
+                    cur.execute("SET default_transaction_read_only = ON;")
+                for key, value in self.settings.items():
+                    cur.execute(sql.SQL('SET {} = %s').format(sql.Identifier(key)), (value,))
+            if not conn.autocommit:
+                conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        with self._lock:
+            self.stats.created += 1
+        return conn
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (
+            f"{self.name}: {stats.created} connections opened, {stats.checkouts} checkouts, "
+            f"peak {stats.peak_in_use} in use, {stats.waits} waits "
+            f"({stats.wait_seconds:.2f}s total, {stats.max_wait_seconds:.2f}s max)"
+        )
+
+    def close(self):
+        """Close idle connections (checked-out ones close when returned after this)"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def _session_settings(settings: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Session settings without the unset ('' = server default) ones"""
+    return {key: value for key, value in (settings or {}).items() if value}
+
+
+_pools: Dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    conn_url: str,
+    name: str,
+    read_only: bool = False,
+    settings: Optional[Dict[str, str]] = None
+) -> ConnectionPool:
+    """
+    The process-wide pool for a database, created on first use
+
+    Pools are keyed by connection URL and access mode, so every
+    ReadOnlyConnection / LocalDatabase for the same database shares one.
+    Session settings are applied when connections are opened, so a later
+    caller asking for different settings gets a ValueError rather than
+    silently running with the first caller's.
+    """
+    key = (conn_url, read_only)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(conn_url, name, read_only=read_only, settings=settings)
+        elif pool.settings != _session_settings(settings):
+            raise ValueError(
+                f"{name}: pool already open with session settings {pool.settings}, "
+                f"requested {_session_settings(settings)}"
+            )
+        return pool
+
+
+def bookings_pool() -> ConnectionPool:
+    """Pool for the bookings database (interested_leads)"""
+    return get_pool(
+        BOOKINGS_DB_URL, "Bookings DB", read_only=True,
+        settings={'statement_timeout': SOURCE_STATEMENT_TIMEOUT}
+    )
+
+
+def log_pool_stats():
+    """Log usage of every pool opened in this process"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        logger.info(f"Connection pool {pool.summary()}")
+
+
+@atexit.register
+def close_pools():
+    """Close every pooled connection (runs at exit)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+_SQL_TOKEN = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*|/\*.*?\*/|[();]""", re.DOTALL)
+
+
+def _single_statement_problem(query: str) -> Optional[str]:
+    """
+    Why query is not one self-contained statement (None if it is)
+
+    Scans outside string literals, quoted identifiers and comments, on the
+    query text before parameters are bound (bound values are quoted by
+    psycopg2). A trailing ';' is allowed.
+    """
+    depth = 0
+    for match in _SQL_TOKEN.finditer(query.strip().rstrip(';')):
+        token = match.group()
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+            if depth < 0:
+                return "unbalanced ')'"
+        elif token == ';':
+            return "multiple statements"
+    if depth:
+        return "unbalanced '('"
+    return None
+
 
 class ReadOnlyConnection:
     """Wrapper that enforces read-only access to Supabase databases"""
@@ -16,17 +420,17 @@ class ReadOnlyConnection:
         self.conn_url = conn_url
         self.db_name = db_name
         self._conn: Optional[psycopg2.extensions.connection] = None
+        self._pool: Optional[ConnectionPool] = None
+        self._iterators: "weakref.WeakSet[Iterator]" = weakref.WeakSet()
 
     def connect(self):
-        """Establish connection with read-only safeguards"""
+        """Check out a pooled connection with read-only safeguards"""
         try:
-            self._conn = psycopg2.connect(self.conn_url)
-            self._conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-
-            # Set session to read-only mode
-            with self._conn.cursor() as cur:
-                cur.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY;")
-                cur.execute("SET default_transaction_read_only = ON;")
+            self._pool = get_pool(
+                self.conn_url, self.db_name, read_only=True,
+                settings={'statement_timeout': SOURCE_STATEMENT_TIMEOUT}
+            )
+            self._conn = self._pool.getconn()
 
             logger.info(f"Connected to {self.db_name} in READ-ONLY mode")
             return self._conn
@@ -34,15 +438,32 @@ class ReadOnlyConnection:
             logger.error(f"Failed to connect to {self.db_name}: {e}")
             raise
 
-    def execute_read(self, query: str, params=None) -> List[tuple]:
-        """Execute a SELECT query only"""
-        # Guard against write operations
+    def _check_read_only(self, query: str):
+        """
+        Guard against write operations
+
+        The query must be a single SELECT: besides the prefix, a ';' or an
+        unbalanced ')' outside quotes and comments is rejected, so nothing
+        can be appended to it (a second statement, or ') TO PROGRAM' when
+        copy_to wraps it in COPY). The pooled session is also read-only
+        (default_transaction_read_only), which blocks writes regardless.
+        """
         query_upper = query.upper().strip()
         if not query_upper.startswith('SELECT'):
             raise ValueError(
                 f"READ-ONLY VIOLATION: Only SELECT queries allowed on {self.db_name}. "
                 f"Attempted query: {query[:100]}"
             )
+        problem = _single_statement_problem(query)
+        if problem:
+            raise ValueError(
+                f"READ-ONLY VIOLATION: {problem} in query on {self.db_name}. "
+                f"Attempted query: {query[:100]}"
+            )
+
+    def execute_read(self, query: str, params=None) -> List[tuple]:
+        """Execute a SELECT query only"""
+        self._check_read_only(query)
 
         try:
             with self._conn.cursor() as cur:
@@ -52,28 +473,159 @@ class ReadOnlyConnection:
             logger.error(f"Query failed on {self.db_name}: {e}")
             raise
 
+    def execute_read_iter(self, query: str, params=None, itersize: int = READ_ITERSIZE) -> Iterator[List[tuple]]:
+        """
+        Execute a SELECT query and yield the result in batches of up to itersize rows.
+
+        Uses a server-side cursor, so memory is bounded by itersize rather
+        than the result size. Pooled source connections run in autocommit,
+        so the cursor gets its own read-only transaction, ended when
+        iteration finishes or the iterator is closed. An iterator abandoned
+        part-way is closed by close(), before the connection goes back to
+        the pool.
+        """
+        self._check_read_only(query)
+        batches = self._read_batches(self._conn, query, params, itersize)
+        self._iterators.add(batches)
+        return batches
+
+    def _read_batches(self, conn, query: str, params, itersize: int) -> Iterator[List[tuple]]:
+        autocommit = conn.autocommit
+        conn.autocommit = False
+        try:
+            yield from _iter_batches(conn, query, params, itersize)
+        except Exception as e:
+            logger.error(f"Query failed on {self.db_name}: {e}")
+            raise
+        finally:
+            conn.rollback()
+            conn.autocommit = autocommit
+
+    def copy_to(self, query: str, file: IO, params=None) -> int:
+        """
+        Stream the result of a SELECT query to a file-like object.
+
+        Runs COPY (<query>) TO STDOUT, so rows are written as COPY text
+        without ever being materialised in Python. Only single SELECT
+        statements are accepted (see _check_read_only); the COPY wrapper is
+        built here and is always TO STDOUT. The closing parenthesis goes on
+        its own line so a trailing -- comment cannot swallow it.
+        """
+        self._check_read_only(query)
+
+        try:
+            with self._conn.cursor() as cur:
+                bound_query = cur.mogrify(query, params or ()).decode()
+                cur.copy_expert(f"COPY ({bound_query.strip().rstrip(';')}\n) TO STDOUT", file)
+                return cur.rowcount
+        except Exception as e:
+            logger.error(f"COPY failed on {self.db_name}: {e}")
+            raise
+
     def close(self):
+        """Return the connection to the pool (it stays open for reuse)"""
         if self._conn:
-            self._conn.close()
-            logger.info(f"Closed connection to {self.db_name}")
+            _close_iterators(self._iterators)
+            self._pool.putconn(self._conn)
+            self._conn = None
+            logger.info(f"Released connection to {self.db_name}")
 
 
 class LocalDatabase:
-    """Manages local database operations"""
+    """
+    Manages local database operations
+
+    Write methods commit on their own unless called inside transaction(),
+    in which case the outermost transaction block commits (or rolls back)
+    everything at once.
+    """
 
     def __init__(self, conn_url: str):
         self.conn_url = conn_url
         self._conn: Optional[psycopg2.extensions.connection] = None
+        self._pool: Optional[ConnectionPool] = None
+        self._iterators: "weakref.WeakSet[Iterator]" = weakref.WeakSet()
+        self._tx_depth = 0
 
     def connect(self):
+        """Check out a pooled connection (several LocalDatabase objects can be open at once)"""
         try:
-            self._conn = psycopg2.connect(self.conn_url)
+            self._pool = get_pool(
+                self.conn_url, "Local DB",
+                settings={'statement_timeout': LOCAL_STATEMENT_TIMEOUT, 'work_mem': LOCAL_WORK_MEM}
+            )
+            self._conn = self._pool.getconn()
             logger.info("Connected to local database")
             return self._conn
         except Exception as e:
             logger.error(f"Failed to connect to local database: {e}")
             raise
 
+    @contextmanager
+    def transaction(self, name: str = 'transaction', synchronous_commit: bool = True):
+        """
+        Run a block of writes as one unit of work.
+
+        The outermost block commits once at the end, or rolls back
+        everything if the block raises. Nested blocks become savepoints: an
+        exception rolls back to the savepoint and propagates, so a caller
+        that catches it can carry on with the rest of the outer transaction.
+
+        Args:
+            name: Label used in logs (and for the savepoint when nested)
+            synchronous_commit: False to commit without waiting for the WAL
+                flush (SET LOCAL synchronous_commit = off). Only for stages
+                whose tables can be rebuilt from source: a crash may lose
+                the last commits, but never leaves them half-written.
+        """
+        start = time.monotonic()
+        savepoint = None
+
+        with self._conn.cursor() as cur:
+            if self._tx_depth == 0:
+                # Only reads can be pending outside a transaction block
+                if self._conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    self._conn.rollback()
+            else:
+                savepoint = sql.Identifier(f"sp_{self._tx_depth}")
+                cur.execute(sql.SQL('SAVEPOINT {}').format(savepoint))
+            if not synchronous_commit:
+                cur.execute("SET LOCAL synchronous_commit = off")
+
+        self._tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._tx_depth -= 1
+            try:
+                if savepoint is None:
+                    self._conn.rollback()
+                else:
+                    with self._conn.cursor() as cur:
+                        cur.execute(sql.SQL('ROLLBACK TO SAVEPOINT {}').format(savepoint))
+                        cur.execute(sql.SQL('RELEASE SAVEPOINT {}').format(savepoint))
+            finally:
+                logger.warning(f"Rolled back {name} after {time.monotonic() - start:.2f}s")
+            raise
+
+        self._tx_depth -= 1
+        if savepoint is None:
+            self._conn.commit()
+            logger.info(f"Committed {name} in {time.monotonic() - start:.2f}s")
+        else:
+            with self._conn.cursor() as cur:
+                cur.execute(sql.SQL('RELEASE SAVEPOINT {}').format(savepoint))
+
+    def _commit(self):
+        """Commit unless inside transaction(), which commits at its end"""
+        if self._tx_depth == 0:
+            self._conn.commit()
+
+    def _rollback(self):
+        """Roll back unless inside transaction(), which decides on the way out"""
+        if self._tx_depth == 0:
+            self._conn.rollback()
+
     def execute_write(self, query: str, params=None) -> int:
         """Execute a write query (INSERT, UPDATE, DELETE)"""
         try:
@@ -82,10 +634,23 @@ class LocalDatabase:
                     cur.execute(query, params)
                 else:
                     cur.execute(query)
-                self._conn.commit()
+                self._commit()
                 return cur.rowcount
         except Exception as e:
-            self._conn.rollback()
+            self._rollback()
+            logger.error(f"Write query failed: {e}")
+            raise
+
+    def execute_write_returning(self, query: str, params=None) -> List[tuple]:
+        """Execute a write query with a RETURNING clause and return its rows"""
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute(query, params or ())
+                rows = cur.fetchall()
+                self._commit()
+                return rows
+        except Exception as e:
+            self._rollback()
             logger.error(f"Write query failed: {e}")
             raise
 
@@ -94,13 +659,386 @@ class LocalDatabase:
         try:
             with self._conn.cursor() as cur:
                 cur.executemany(query, params_list)
-                self._conn.commit()
+                self._commit()
                 return cur.rowcount
         except Exception as e:
-            self._conn.rollback()
+            self._rollback()
             logger.error(f"Bulk write query failed: {e}")
             raise
 
+    def _prepared(self, cur, query: str) -> sql.Composable:
+        """
+        PREPARE a query once per connection and return its EXECUTE statement
+
+        The statement is parsed and planned on the server the first time;
+        after that each execution only ships the parameter values.
+        """
+        name, body, count = _prepare_sql(query)
+        prepared = _prepared_statements.setdefault(self._conn, set())
+        if name not in prepared:
+            cur.execute(sql.SQL('PREPARE {} AS ').format(sql.Identifier(name)) + sql.SQL(body))
+            # PREPARE is not transactional: the statement survives a later rollback
+            prepared.add(name)
+            logger.debug(f"Prepared {name} on local connection")
+
+        execute = sql.SQL('EXECUTE {}').format(sql.Identifier(name))
+        if count:
+            execute += sql.SQL(' ({})').format(sql.SQL(', ').join(sql.Placeholder() * count))
+        return execute
+
+    def execute_prepared(self, query: str, params: Sequence = ()) -> int:
+        """Execute a write query as a server-side prepared statement (for statements run many times)"""
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute(self._prepared(cur, query), params)
+                self._commit()
+                return cur.rowcount
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Prepared write query failed: {e}")
+            raise
+
+    def execute_pipelined(self, query: str, params_list: Iterable[Sequence], page_size: int = PIPELINE_PAGE_SIZE) -> int:
+        """
+        Execute one write query for many parameter sets without a round trip per row
+
+        The query is prepared once, then execute_batch sends its EXECUTEs
+        page_size at a time. psycopg2 has no pipeline mode (that is
+        psycopg 3), so each page is one multi-statement request over the
+        simple protocol: a failing statement aborts the whole page (and
+        the transaction), and per-statement row counts are lost. Returns
+        the number of statements sent. params_list is consumed one page at
+        a time, so it can be a generator over a stream of any length.
+        """
+        sent = 0
+
+        def counted():
+            nonlocal sent
+            for params in params_list:
+                sent += 1
+                yield params
+
+        try:
+            with self._conn.cursor() as cur:
+                execute = self._prepared(cur, query).as_string(self._conn)
+                execute_batch(cur, execute, counted(), page_size=page_size)
+                self._commit()
+                return sent
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Pipelined write query failed: {e}")
+            raise
+
+    def copy_from(self, copy_query: str, file: IO) -> int:
+        """Load COPY-formatted data from a file-like object (COPY ... FROM STDIN)"""
+        try:
+            with self._conn.cursor() as cur:
+                cur.copy_expert(copy_query, file)
+                self._commit()
+                return cur.rowcount
+        except Exception as e:
+            self._rollback()
+            logger.error(f"COPY into local database failed: {e}")
+            raise
+
+    def bulk_load(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence],
+        conflict_columns: Optional[Sequence[str]] = None,
+        update_columns: Optional[Sequence[str]] = None,
+        update_where: Optional[str] = None,
+        extra_updates: Optional[Dict[str, str]] = None,
+        returning: Optional[str] = None,
+        strategy: str = 'auto',
+        page_size: int = BULK_PAGE_SIZE
+    ) -> BulkLoadResult:
+        """
+        Load an iterable of rows into a table in one transaction.
+
+        Strategies:
+            'values' - multi-row INSERT ... VALUES pages (execute_values)
+            'copy'   - COPY into a temp staging table, then one INSERT ... SELECT
+            'auto'   - 'copy' from BULK_COPY_THRESHOLD rows upwards, else 'values'
+
+        COPY uses the text format: psycopg2 has no binary COPY encoder, and
+        text rows can be streamed from the iterable as they are produced.
+        The merge is INSERT ... ON CONFLICT rather than MERGE, which needs
+        PostgreSQL 15 (17 for RETURNING) and is not safe against concurrent
+        inserts of the same key.
+
+        Args:
+            table: Target table
+            columns: Target columns, in row order
+            rows: Iterable of row tuples (consumed once, never materialised for COPY)
+            conflict_columns: ON CONFLICT target; DO NOTHING unless update_columns given
+            update_columns: Columns set from EXCLUDED on conflict
+            update_where: Optional condition on the DO UPDATE (e.g. change detection)
+            extra_updates: Extra SET expressions on conflict, e.g. {'updated_at': 'NOW()'}
+            returning: Optional RETURNING list; rows are collected in the result
+            strategy: 'auto', 'values' or 'copy'
+            page_size: Rows per VALUES page
+
+        Returns:
+            BulkLoadResult with strategy, row counts and timing
+        """
+        start = time.monotonic()
+        rows = iter(rows)
+
+        if strategy == 'auto':
+            head = list(islice(rows, BULK_COPY_THRESHOLD))
+            strategy = 'copy' if len(head) >= BULK_COPY_THRESHOLD else 'values'
+            rows = chain(head, rows)
+
+        if strategy not in ('values', 'copy'):
+            raise ValueError(f"Unknown bulk load strategy: {strategy}")
+
+        conflict_clause = self._conflict_clause(conflict_columns, update_columns, update_where, extra_updates)
+        returning_clause = sql.SQL(' RETURNING {}').format(sql.SQL(returning)) if returning else sql.SQL('')
+        column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+        result = BulkLoadResult(table=table, strategy=strategy)
+
+        try:
+            with self._conn.cursor() as cur:
+                if strategy == 'values':
+                    insert = sql.SQL('INSERT INTO {} ({}) VALUES %s{}{}').format(
+                        sql.Identifier(table), column_list, conflict_clause, returning_clause
+                    ).as_string(cur)
+                    while True:
+                        page = list(islice(rows, page_size))
+                        if not page:
+                            break
+                        fetched = execute_values(cur, insert, page, page_size=len(page), fetch=bool(returning))
+                        result.rows += len(page)
+                        result.affected += cur.rowcount
+                        if returning:
+                            result.returned.extend(fetched)
+                else:
+                    staging = f"_stage_{table}"
+                    # Inside transaction() an earlier load's staging table is still there
+                    cur.execute(sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(staging)))
+                    cur.execute(sql.SQL(
+                        'CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA'
+                    ).format(sql.Identifier(staging), column_list, sql.Identifier(table)))
+
+                    stream = _CopyRowStream(rows)
+                    cur.copy_expert(
+                        sql.SQL('COPY {} ({}) FROM STDIN').format(sql.Identifier(staging), column_list).as_string(cur),
+                        stream
+                    )
+                    result.rows = stream.row_count
+
+                    cur.execute(self._merge_sql(staging, table, columns, None, conflict_clause, returning_clause))
+                    result.affected = cur.rowcount
+                    if returning:
+                        result.returned = cur.fetchall()
+
+                self._commit()
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Bulk load into {table} ({strategy}) failed: {e}")
+            raise
+
+        result.seconds = time.monotonic() - start
+        logger.info(
+            f"Bulk loaded {result.rows} rows into {table} via {strategy} "
+            f"in {result.seconds:.2f}s ({result.affected} affected)"
+        )
+        return result
+
+    def merge_staged(
+        self,
+        staging_table: str,
+        table: str,
+        columns: Sequence[str],
+        select_list: Optional[str] = None,
+        conflict_columns: Optional[Sequence[str]] = None,
+        update_columns: Optional[Sequence[str]] = None,
+        update_where: Optional[str] = None,
+        extra_updates: Optional[Dict[str, str]] = None,
+        returning: Optional[str] = None
+    ) -> BulkLoadResult:
+        """
+        Merge an already-populated staging table into a target table with one
+        INSERT ... SELECT ... ON CONFLICT statement (the second half of the
+        'copy' bulk-load strategy, for callers that stage rows themselves).
+
+        Args:
+            select_list: Optional SELECT expressions over the staging table;
+                defaults to the target column names
+            (other args as in bulk_load)
+        """
+        start = time.monotonic()
+        conflict_clause = self._conflict_clause(conflict_columns, update_columns, update_where, extra_updates)
+        returning_clause = sql.SQL(' RETURNING {}').format(sql.SQL(returning)) if returning else sql.SQL('')
+        result = BulkLoadResult(table=table, strategy='staged')
+
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute(self._merge_sql(staging_table, table, columns, select_list, conflict_clause, returning_clause))
+                result.rows = result.affected = cur.rowcount
+                if returning:
+                    result.returned = cur.fetchall()
+                self._commit()
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Staged merge into {table} failed: {e}")
+            raise
+
+        result.seconds = time.monotonic() - start
+        logger.info(f"Merged {result.affected} rows from {staging_table} into {table} in {result.seconds:.2f}s")
+        return result
+
+    @staticmethod
+    def _conflict_clause(conflict_columns, update_columns, update_where, extra_updates) -> sql.Composable:
+        """Build the ON CONFLICT clause shared by bulk_load and merge_staged"""
+        if not conflict_columns:
+            return sql.SQL('')
+
+        target = sql.SQL(', ').join(map(sql.Identifier, conflict_columns))
+        assignments = [
+            sql.SQL('{} = EXCLUDED.{}').format(sql.Identifier(col), sql.Identifier(col))
+            for col in (update_columns or [])
+        ]
+        assignments += [
+            sql.SQL('{} = {}').format(sql.Identifier(col), sql.SQL(expr))
+            for col, expr in (extra_updates or {}).items()
+        ]
+
+        if not assignments:
+            return sql.SQL(' ON CONFLICT ({}) DO NOTHING').format(target)
+
+        clause = sql.SQL(' ON CONFLICT ({}) DO UPDATE SET {}').format(target, sql.SQL(', ').join(assignments))
+        if update_where:
+            clause += sql.SQL(' WHERE {}').format(sql.SQL(update_where))
+        return clause
+
+    @staticmethod
+    def _merge_sql(staging_table, table, columns, select_list, conflict_clause, returning_clause) -> sql.Composable:
+        column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+        return sql.SQL('INSERT INTO {} ({}) SELECT {} FROM {}{}{}').format(
+            sql.Identifier(table),
+            column_list,
+            sql.SQL(select_list) if select_list else column_list,
+            sql.Identifier(staging_table),
+            conflict_clause,
+            returning_clause
+        )
+
+    def create_shadow_table(self, table: str) -> str:
+        """
+        Create an empty shadow copy of a table (same columns, defaults,
+        constraints and indexes) to build a new snapshot into. Foreign keys
+        and grants are added by publish_shadow_table.
+
+        Returns:
+            Name of the shadow table
+        """
+        shadow = f"{table}_shadow"
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute(sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(shadow)))
+                cur.execute(sql.SQL(
+                    'CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+                    'INCLUDING INDEXES INCLUDING COMMENTS)'
+                ).format(sql.Identifier(shadow), sql.Identifier(table)))
+                self._commit()
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Failed to create shadow table for {table}: {e}")
+            raise
+
+        return shadow
+
+    def publish_shadow_table(self, table: str, lock_timeout: str = '10s'):
+        """
+        Atomically replace a table with its shadow copy.
+
+        The rename swap and drop happen in one transaction, so readers see
+        either the complete previous snapshot or the complete new one.
+        Sequences owned by the live table (SERIAL ids) are handed over to the
+        shadow first so dropping the old table does not take them along.
+        LIKE does not copy foreign keys or grants, so both are re-created on
+        the shadow from the live table, and the swap is aborted if the
+        published table ends up with different constraints than the one it
+        replaces.
+        """
+        shadow = f"{table}_shadow"
+        retired = f"{table}_retired"
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute("SET LOCAL lock_timeout = %s", (lock_timeout,))
+
+                # Foreign keys (validated against the rows just built)
+                cur.execute("""
+                    SELECT conname, pg_get_constraintdef(oid)
+                    FROM pg_constraint
+                    WHERE conrelid = %s::regclass AND contype = 'f'
+                """, (table,))
+                for name, definition in cur.fetchall():
+                    cur.execute(sql.SQL('ALTER TABLE {} ADD CONSTRAINT {} ').format(
+                        sql.Identifier(shadow), sql.Identifier(name)
+                    ) + sql.SQL(definition))
+
+                # Grants (grantee 0 is PUBLIC)
+                cur.execute("""
+                    SELECT a.privilege_type, a.is_grantable,
+                           CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(r.rolname) END
+                    FROM pg_class c
+                    CROSS JOIN LATERAL aclexplode(c.relacl) a
+                    LEFT JOIN pg_roles r ON r.oid = a.grantee
+                    WHERE c.oid = %s::regclass
+                """, (table,))
+                for privilege, grantable, grantee in cur.fetchall():
+                    cur.execute(sql.SQL('GRANT {} ON {} TO {}{}').format(
+                        sql.SQL(privilege), sql.Identifier(shadow), sql.SQL(grantee),
+                        sql.SQL(' WITH GRANT OPTION' if grantable else '')
+                    ))
+
+                cur.execute("""
+                    SELECT a.attname, pg_get_serial_sequence(%s, a.attname)
+                    FROM pg_attribute a
+                    WHERE a.attrelid = %s::regclass
+                      AND a.attnum > 0
+                      AND NOT a.attisdropped
+                      AND pg_get_serial_sequence(%s, a.attname) IS NOT NULL
+                """, (table, table, table))
+                for column, sequence in cur.fetchall():
+                    cur.execute(sql.SQL('ALTER SEQUENCE {} OWNED BY {}.{}').format(
+                        sql.SQL(sequence), sql.Identifier(shadow), sql.Identifier(column)
+                    ))
+
+                cur.execute(sql.SQL('ALTER TABLE {} RENAME TO {}').format(sql.Identifier(table), sql.Identifier(retired)))
+                cur.execute(sql.SQL('ALTER TABLE {} RENAME TO {}').format(sql.Identifier(shadow), sql.Identifier(table)))
+
+                # Constraint drift check (names differ after LIKE, definitions must not)
+                constraints_query = """
+                    SELECT contype, pg_get_constraintdef(oid)
+                    FROM pg_constraint
+                    WHERE conrelid = %s::regclass
+                    ORDER BY 1, 2
+                """
+                cur.execute(constraints_query, (retired,))
+                expected = cur.fetchall()
+                cur.execute(constraints_query, (table,))
+                published = cur.fetchall()
+                if published != expected:
+                    raise RuntimeError(
+                        f"Shadow copy of {table} does not match the live table's constraints: "
+                        f"missing {sorted(set(expected) - set(published))}, "
+                        f"unexpected {sorted(set(published) - set(expected))}"
+                    )
+
+                cur.execute(sql.SQL('DROP TABLE {}').format(sql.Identifier(retired)))
+                self._commit()
+        except Exception as e:
+            self._rollback()
+            logger.error(f"Failed to publish shadow table for {table}: {e}")
+            raise
+
+        logger.info(f"Published new snapshot of {table}")
+
     def execute_read(self, query: str, params=None) -> List[tuple]:
         """Execute a SELECT query"""
         try:
@@ -108,10 +1046,90 @@ class LocalDatabase:
                 cur.execute(query, params or ())
                 return cur.fetchall()
         except Exception as e:
+            self._rollback()
+            logger.error(f"Read query failed: {e}")
+            raise
+
+    def execute_read_iter(self, query: str, params=None, itersize: int = READ_ITERSIZE) -> Iterator[List[tuple]]:
+        """
+        Execute a SELECT query and yield the result in batches of up to itersize rows.
+
+        Uses a server-side cursor, so memory is bounded by itersize rather
+        than the result size. Batches can be handed straight to bulk_load
+        (e.g. chain.from_iterable(batches)) on another connection. On this
+        one, writes that commit (outside transaction()) close the cursor, so
+        finish iterating first or iterate inside a transaction block. An
+        iterator abandoned part-way is closed by close(), before the
+        connection goes back to the pool.
+        """
+        batches = self._read_batches(query, params, itersize)
+        self._iterators.add(batches)
+        return batches
+
+    def _read_batches(self, query: str, params, itersize: int) -> Iterator[List[tuple]]:
+        try:
+            yield from _iter_batches(self._conn, query, params, itersize)
+        except Exception as e:
+            self._rollback()
             logger.error(f"Read query failed: {e}")
             raise
 
     def close(self):
+        """Return the connection to the pool (it stays open for reuse)"""
         if self._conn:
-            self._conn.close()
-            logger.info("Closed local database connection")
+            _close_iterators(self._iterators)
+            self._pool.putconn(self._conn)
+            self._conn = None
+            logger.info("Released local database connection")
+
+
+def stream_copy(
+    source: ReadOnlyConnection,
+    select_query: str,
+    params,
+    target: LocalDatabase,
+    copy_from_query: str
+) -> int:
+    """
+    Pipe a read-only SELECT straight into a local COPY ... FROM STDIN.
+
+    The source COPY runs in a background thread writing into an OS pipe that
+    the local COPY reads from, so memory stays flat regardless of row count.
+
+    Returns:
+        Number of rows loaded into the target
+    """
+    read_fd, write_fd = os.pipe()
+    reader = os.fdopen(read_fd, 'rb')
+    writer = os.fdopen(write_fd, 'wb')
+    errors = []
+    # The producer thread starts with an empty context, so pass the label along
+    label = statement_label(select_query)
+
+    def produce():
+        try:
+            with query_label(label):
+                source.copy_to(select_query, writer, params)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            try:
+                writer.close()
+            except OSError:
+                # Reader side already gone (target COPY failed)
+                pass
+
+    producer = threading.Thread(target=produce, name='copy-producer', daemon=True)
+    producer.start()
+
+    try:
+        rowcount = target.copy_from(copy_from_query, reader)
+    finally:
+        # Closing the read end unblocks the producer if the target failed
+        reader.close()
+        producer.join()
+
+    if errors:
+        raise errors[0]
+
+    return rowcount
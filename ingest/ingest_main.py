@@ -7,24 +7,30 @@ This script orchestrates the entire data ingestion pipeline.
 Usage:
     python ingest_main.py              # Full ingestion (includes SmartLead API)
     python ingest_main.py --skip-smartlead  # Quick refresh (skips SmartLead API)
+    python ingest_main.py --full-resync     # Ignore watermarks and re-pull the full window
+    python ingest_main.py --resume          # Skip SmartLead campaigns already counted this run window
 """
 import os
 import re
+import time
+import hashlib
 import logging
 import argparse
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set
 from dotenv import load_dotenv
-from database import ReadOnlyConnection, LocalDatabase
+from database import ReadOnlyConnection, LocalDatabase, bookings_pool, log_pool_stats, stream_copy
+from query_stats import log_query_stats
 
 # Import SmartLead API functions for not_contacted leads
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ingest'))
 from consolidate_leads_by_client import (
-    create_session,
-    fetch_active_campaigns,
-    fetch_all_clients,
-    process_all_campaigns,
+    CampaignData,
+    LeadCounts,
+    collect_campaign_data,
     consolidate_by_client
 )
 
@@ -38,6 +44,16 @@ parser.add_argument(
     action='store_true',
     help='Skip SmartLead API call for not_contacted_leads (use for quick manual refresh)'
 )
+parser.add_argument(
+    '--full-resync',
+    action='store_true',
+    help='Ignore stored high-water marks and re-pull the full campaign reporting window'
+)
+parser.add_argument(
+    '--resume',
+    action='store_true',
+    help='Reuse SmartLead counts checkpointed since the last run started instead of recounting them'
+)
 args = parser.parse_args()
 
 # Configure logging
@@ -53,46 +69,84 @@ logger = logging.getLogger(__name__)
 # DATE RANGE CALCULATIONS
 # ============================================================================
 
-def get_friday_to_yesterday_range():
+# calendar_local week ids count Friday-Thursday weeks from this Friday
+CALENDAR_EPOCH = date(2020, 1, 3)
+CALENDAR_HORIZON_DAYS = 400
+
+# Completed weeks kept in the historical tables (52+ for a year of history)
+HISTORICAL_WEEKS_DEPTH = int(os.getenv('HISTORICAL_WEEKS_DEPTH', '4'))
+
+
+def refresh_calendar(local_db: LocalDatabase, through: date | None = None):
+    """
+    Extend calendar_local so it covers every day up to `through`
+    (default: today + CALENDAR_HORIZON_DAYS).
+
+    Each day carries its weekday flag, Friday-Thursday week, month and
+    cumulative day/weekday counters; new days continue the counters from
+    the last stored day.
+    """
+    if through is None:
+        through = datetime.utcnow().date() + timedelta(days=CALENDAR_HORIZON_DAYS)
+
+    rows = local_db.execute_read("""
+        SELECT day, weekday_seq FROM calendar_local ORDER BY day DESC LIMIT 1
+    """)
+    last_day, last_weekday_seq = rows[0] if rows else (None, 0)
+
+    first_day = last_day + timedelta(days=1) if last_day else CALENDAR_EPOCH
+    if first_day > through:
+        return
+
+    rowcount = local_db.execute_write("""
+        INSERT INTO calendar_local (
+            day, is_weekday, week_id, week_start, week_end, month_id, day_seq, weekday_seq
+        )
+        SELECT
+            t.day,
+            EXTRACT(ISODOW FROM t.day) < 6,
+            (t.day - %(epoch)s::date) / 7,
+            %(epoch)s::date + ((t.day - %(epoch)s::date) / 7) * 7,
+            %(epoch)s::date + ((t.day - %(epoch)s::date) / 7) * 7 + 6,
+            EXTRACT(YEAR FROM t.day)::int * 12 + EXTRACT(MONTH FROM t.day)::int - 1,
+            (t.day - %(epoch)s::date) + 1,
+            %(weekday_base)s + SUM(CASE WHEN EXTRACT(ISODOW FROM t.day) < 6 THEN 1 ELSE 0 END) OVER (ORDER BY t.day)
+        FROM generate_series(%(first_day)s::date, %(through)s::date, INTERVAL '1 day') AS g(d)
+        CROSS JOIN LATERAL (SELECT g.d::date AS day) t
+        ON CONFLICT (day) DO NOTHING
+    """, {
+        'epoch': CALENDAR_EPOCH,
+        'weekday_base': last_weekday_seq,
+        'first_day': first_day,
+        'through': through
+    })
+    logger.info(f"Extended calendar_local by {rowcount} days through {through}")
+
+
+def get_friday_to_yesterday_range(local_db: LocalDatabase):
     """
     Calculate date range from previous Friday to yesterday (inclusive).
-    Always shows from previous Friday, even on Fridays.
+    Always shows from previous Friday, even on Fridays: the window is the
+    calendar_local Friday-Thursday week containing yesterday, cut at yesterday.
 
     Returns:
         tuple: (start_date, end_date) as date objects
     """
-    from datetime import datetime, timedelta
-
-    today = datetime.utcnow().date()
-    current_day = today.weekday()  # 0=Monday, 1=Tuesday, ..., 4=Friday, 5=Saturday, 6=Sunday
-
-    # End date: Always yesterday
-    end_date = today - timedelta(days=1)
-
-    # Start date: Always go back to previous Friday (no special case for Fridays)
-    # Calculate days to go back:
-    # Sunday (6): go back 3 days (Sun->Sat->Fri) = 3 days
-    # Monday (0): go back 4 days (Mon->Sun->Sat->Fri) = 4 days
-    # Tuesday (1): go back 5 days = 5 days
-    # Wednesday (2): go back 6 days = 6 days
-    # Thursday (3): go back 7 days = 7 days
-    # Friday (4): go back 7 days to previous Friday = 7 days
-    # Saturday (5): go back 1 day (Sat->Fri) = 1 day
-    if current_day == 6:  # Sunday
-        days_to_subtract = 3
-    elif current_day == 5:  # Saturday
-        days_to_subtract = 1
-    else:  # Monday through Friday
-        days_to_subtract = current_day + 3
-
-    start_date = today - timedelta(days=days_to_subtract)
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+
+    rows = local_db.execute_read("""
+        SELECT week_start, day FROM calendar_local WHERE day = %s
+    """, (yesterday,))
+    if not rows:
+        raise RuntimeError(f"calendar_local does not cover {yesterday}; run refresh_calendar first")
 
+    start_date, end_date = rows[0]
     return start_date, end_date
 
 
-def get_historical_weeks(num_weeks: int = 4) -> List[Dict[str, Any]]:
+def get_historical_weeks(local_db: LocalDatabase, num_weeks: int = 4) -> List[Dict[str, Any]]:
     """
-    Calculate last N completed Friday-Thursday weeks.
+    Calculate last N completed Friday-Thursday weeks from calendar_local.
 
     A "completed week" is a full Friday-Thursday period that ended before yesterday.
     Week 1 = most recent completed week (last Friday to last Thursday)
@@ -106,59 +160,38 @@ def get_historical_weeks(num_weeks: int = 4) -> List[Dict[str, Any]]:
     """
     # Input validation
     if num_weeks <= 0:
-        logger = logging.getLogger(__name__)
         logger.warning(f"Requested {num_weeks} weeks, must be positive. Returning 4 weeks.")
-        return get_historical_weeks(4)  # Recursive call with default
-
-    today = datetime.utcnow().date()
-
-    # Find yesterday (the end of current incomplete week)
-    yesterday = today - timedelta(days=1)
-
-    # Start from yesterday and go back to find completed weeks
-    # Each completed week ends on Thursday, starts on Friday (7 days earlier)
-    weeks = []
-
-    # Start searching from yesterday
-    search_date = yesterday
+        num_weeks = 4
 
-    for week_num in range(1, num_weeks + 1):
-        # Find the most recent Thursday on or before search_date
-        # Thursday = weekday 3
-        days_since_thursday = (search_date.weekday() - 3) % 7
-        most_recent_thursday = search_date - timedelta(days=days_since_thursday)
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
 
-        # Week starts on Friday (6 days before Thursday)
-        week_start = most_recent_thursday - timedelta(days=6)
-        week_end = most_recent_thursday
+    rows = local_db.execute_read("""
+        SELECT week_id, week_start, week_end
+        FROM calendar_local
+        WHERE day = week_start
+          AND week_end < %s
+        ORDER BY week_id DESC
+        LIMIT %s
+    """, (yesterday, num_weeks))
 
-        # If this week is the current incomplete week (contains yesterday but not full), skip it
-        if week_end >= yesterday:
-            # Move search_date to before this week and try again
-            search_date = week_start - timedelta(days=1)
-            continue
-
-        weeks.append({
-            'week_number': week_num,
-            'start_date': week_start,
-            'end_date': week_end
-        })
-
-        # Move search_date to before this week for next iteration
-        search_date = week_start - timedelta(days=1)
+    weeks = [
+        {'week_number': week_num, 'start_date': week_start, 'end_date': week_end}
+        for week_num, (_, week_start, week_end) in enumerate(rows, start=1)
+    ]
 
     # Warning for missing weeks
     if len(weeks) < num_weeks:
-        logger = logging.getLogger(__name__)
         logger.warning(f"Only found {len(weeks)} completed weeks, requested {num_weeks}")
 
     return weeks
 
 
-def count_sending_days(start_date: date, end_date: date, weekend_sending: bool) -> int:
+def count_sending_days(local_db: LocalDatabase, start_date: date, end_date: date, weekend_sending: bool) -> int:
     """
     Count the actual number of sending days in a date range.
 
+    Uses the calendar_local prefix counters, so any range costs two lookups.
+
     Args:
         start_date: Start date of the period (inclusive)
         end_date: End date of the period (inclusive)
@@ -172,20 +205,20 @@ def count_sending_days(start_date: date, end_date: date, weekend_sending: bool)
         Friday to Sunday, weekend_sending=TRUE: 3 days (Fri, Sat, Sun)
         Monday to Friday, weekend_sending=FALSE: 5 days (all weekdays)
     """
-    sending_days = 0
-    current = start_date
+    rows = local_db.execute_read("""
+        SELECT
+            ce.day_seq - cs.day_seq + 1,
+            ce.weekday_seq - cs.weekday_seq + CASE WHEN cs.is_weekday THEN 1 ELSE 0 END
+        FROM calendar_local cs
+        INNER JOIN calendar_local ce ON ce.day = %s
+        WHERE cs.day = %s
+    """, (end_date, start_date))
 
-    while current <= end_date:
-        if weekend_sending:
-            # Count all days
-            sending_days += 1
-        else:
-            # Count only weekdays (Monday=0 through Friday=4)
-            if current.weekday() < 5:  # 0=Mon, 1=Tue, 2=Wed, 3=Thu, 4=Fri
-                sending_days += 1
-        current += timedelta(days=1)
+    if not rows or end_date < start_date:
+        return 0
 
-    return sending_days
+    all_days, weekdays = rows[0]
+    return all_days if weekend_sending else weekdays
 
 
 # ============================================================================
@@ -227,129 +260,509 @@ def normalize_client_name(name: str | None) -> str:
 # SMARTLEAD NOT CONTACTED LEADS INTEGRATION
 # ============================================================================
 
-def fetch_not_contacted_leads_from_smartlead():
+SMARTLEAD_COUNT_COLUMNS = [
+    'campaign_id', 'campaign_name', 'campaign_status', 'campaign_updated_at',
+    'smartlead_client_id', 'smartlead_client_name', 'client_id',
+    'total_leads', 'started', 'inprogress', 'completed', 'paused', 'stopped', 'blocked',
+    'fetched_at'
+]
+
+
+def load_campaign_counts(local_db: LocalDatabase) -> Dict[int, CampaignData]:
+    """Load per-campaign counts stored by earlier runs, keyed by campaign_id"""
+    rows = local_db.execute_read("""
+        SELECT campaign_id, campaign_name, campaign_status, campaign_updated_at,
+               smartlead_client_id, smartlead_client_name,
+               total_leads, started, inprogress, completed, paused, stopped, blocked,
+               fetched_at
+        FROM smartlead_campaign_counts
+    """)
+
+    return {
+        row[0]: CampaignData(
+            campaign_id=row[0],
+            campaign_name=row[1],
+            client_name=row[5],
+            lead_counts=LeadCounts(*row[6:13]),
+            campaign_status=row[2],
+            campaign_updated_at=row[3],
+            client_id=row[4],
+            fetched_at=row[13]
+        )
+        for row in rows
+    }
+
+
+def get_recently_reached_campaigns(local_db: LocalDatabase) -> Set[int]:
+    """
+    Campaigns whose reporting shows new leads reached on or after the day
+    their counts were taken - their STARTED count has moved, so the cache
+    is stale regardless of the TTL.
+    """
+    rows = local_db.execute_read("""
+        SELECT DISTINCT c.campaign_id
+        FROM smartlead_campaign_counts c
+        INNER JOIN campaign_reporting_local cr ON cr.campaign_id = c.campaign_id::text
+        WHERE cr.new_leads_reached > 0
+          AND cr.end_date >= c.fetched_at::date
+    """)
+    return {row[0] for row in rows}
+
+
+def load_client_ids(local_db: LocalDatabase) -> tuple[Dict[str, int], Dict[str, int]]:
+    """clients_local ids keyed by normalized client name and by normalized client code"""
+    by_name = {}
+    by_code = {}
+    for client_id, client_code, client_name in local_db.execute_read(
+        "SELECT client_id, client_code, client_name FROM clients_local"
+    ):
+        by_name.setdefault(normalize_client_name(client_name), client_id)
+        by_code.setdefault(normalize_client_name(client_code), client_id)
+    return by_name, by_code
+
+
+def upsert_campaign_counts(
+    local_db: LocalDatabase,
+    campaign_data: List[CampaignData],
+    client_ids: tuple[Dict[str, int], Dict[str, int]]
+):
+    """
+    Upsert per-campaign counts into smartlead_campaign_counts.
+
+    Campaigns whose count failed keep their previous row. SmartLead client
+    names are matched to clients_local by name first, then client code
+    (same precedence as update_not_contacted_leads).
+    """
+    by_name, by_code = client_ids
+    rows = []
+    for data in campaign_data:
+        if data.error:
+            continue
+        normalized = normalize_client_name(data.client_name)
+        counts = data.lead_counts
+        rows.append((
+            data.campaign_id, data.campaign_name, data.campaign_status, data.campaign_updated_at,
+            data.client_id, data.client_name, by_name.get(normalized) or by_code.get(normalized),
+            counts.total_leads, counts.started, counts.inprogress, counts.completed,
+            counts.paused, counts.stopped, counts.blocked,
+            data.fetched_at
+        ))
+
+    local_db.bulk_load(
+        'smartlead_campaign_counts',
+        SMARTLEAD_COUNT_COLUMNS,
+        rows,
+        conflict_columns=['campaign_id'],
+        update_columns=SMARTLEAD_COUNT_COLUMNS[1:],
+        update_where=(
+            "(smartlead_campaign_counts.smartlead_client_name, smartlead_campaign_counts.client_id, "
+            "smartlead_campaign_counts.fetched_at) IS DISTINCT FROM "
+            "(EXCLUDED.smartlead_client_name, EXCLUDED.client_id, EXCLUDED.fetched_at)"
+        ),
+        strategy='values'
+    )
+
+
+def save_campaign_counts(local_db: LocalDatabase, campaign_data: List[CampaignData]):
+    """
+    Upsert this run's per-campaign counts into smartlead_campaign_counts and
+    drop campaigns that are no longer active.
+    """
+    upsert_campaign_counts(local_db, campaign_data, load_client_ids(local_db))
+
+    removed = local_db.execute_write(
+        "DELETE FROM smartlead_campaign_counts WHERE NOT (campaign_id = ANY(%s))",
+        ([data.campaign_id for data in campaign_data],)
+    )
+    if removed:
+        logger.info(f"Removed {removed} inactive campaigns from smartlead_campaign_counts")
+
+
+# ingest_state row tracking the SmartLead counting run window
+SMARTLEAD_STATE_SOURCE = 'smartlead_campaign_counts'
+
+# Counted campaigns are checkpointed every N campaigns or N seconds, whichever comes first
+SMARTLEAD_CHECKPOINT_BATCH = int(os.getenv('SMARTLEAD_CHECKPOINT_BATCH', '25'))
+SMARTLEAD_CHECKPOINT_SECONDS = float(os.getenv('SMARTLEAD_CHECKPOINT_SECONDS', '30'))
+
+# A run window older than this is never resumed (its counts fall back to the TTL rules)
+SMARTLEAD_RESUME_WINDOW_HOURS = int(os.getenv('SMARTLEAD_RESUME_WINDOW_HOURS', '24'))
+
+
+class CampaignCountCheckpoint:
+    """
+    Collects campaigns as they are counted and upserts them into
+    smartlead_campaign_counts in small batches, so a crashed run loses at
+    most the in-flight campaigns and the last unflushed batch.
+
+    Passed to collect_campaign_data as on_result; it is always called from
+    the coordinating thread (or event loop), never from workers.
+    """
+
+    def __init__(self, local_db: LocalDatabase):
+        self.local_db = local_db
+        self.client_ids = load_client_ids(local_db)
+        self.pending: List[CampaignData] = []
+        self.saved = 0
+        self.last_flush = time.monotonic()
+
+    def __call__(self, data: CampaignData):
+        # Failed counts keep their previous row; cached ones are already stored
+        if data.error or data.from_cache:
+            return
+        self.pending.append(data)
+        if (
+            len(self.pending) >= SMARTLEAD_CHECKPOINT_BATCH
+            or time.monotonic() - self.last_flush >= SMARTLEAD_CHECKPOINT_SECONDS
+        ):
+            self.flush()
+
+    def flush(self):
+        """Write buffered counts"""
+        if self.pending:
+            upsert_campaign_counts(self.local_db, self.pending, self.client_ids)
+            self.saved += len(self.pending)
+            logger.info(f"Checkpointed {self.saved} SmartLead campaign counts")
+            self.pending = []
+        self.last_flush = time.monotonic()
+
+
+def start_smartlead_run(local_db: LocalDatabase, resume: bool, auto_resume: bool = True) -> datetime | None:
+    """
+    Open (or reopen) the SmartLead run window in ingest_state.
+
+    The window's start is stored as the high-water mark with mode 'running'
+    until the stage finishes. When resuming - explicitly, or (auto_resume)
+    because the previous run never finished - the previous window is kept
+    and its start is returned, so campaigns checkpointed since then are not
+    recounted. Windows older than SMARTLEAD_RESUME_WINDOW_HOURS are not
+    resumed.
+
+    Returns:
+        Start of the resumed window, or None for a fresh run
+    """
+    rows = local_db.execute_read("""
+        SELECT high_water_mark, last_sync_mode,
+               high_water_mark >= NOW() - make_interval(hours => %s)
+        FROM ingest_state
+        WHERE source_name = %s
+    """, (SMARTLEAD_RESUME_WINDOW_HOURS, SMARTLEAD_STATE_SOURCE))
+
+    window_start, last_mode, recent = rows[0] if rows else (None, None, False)
+    if window_start is not None and recent and (resume or (auto_resume and last_mode == 'running')):
+        reason = "requested" if resume else "previous run did not finish"
+        logger.info(f"Resuming SmartLead run window started {window_start} ({reason})")
+        set_ingest_watermark(local_db, SMARTLEAD_STATE_SOURCE, window_start, 'running', 0)
+        return window_start
+
+    window_start = local_db.execute_read("SELECT NOW()")[0][0]
+    set_ingest_watermark(local_db, SMARTLEAD_STATE_SOURCE, window_start, 'running', 0)
+    return None
+
+
+def fetch_not_contacted_leads_from_smartlead(
+    local_db: LocalDatabase | None = None,
+    use_cache: bool = True,
+    resume: bool = False
+):
     """
     Fetch not contacted lead counts from SmartLead API.
 
+    With a local_db, per-campaign counts are persisted in
+    smartlead_campaign_counts and reused on later runs: only campaigns whose
+    metadata changed, that reached new leads since their last count, or whose
+    counts are older than SMARTLEAD_COUNTS_TTL_HOURS are recounted.
+
+    Counts are checkpointed as campaigns complete. If a run dies part way,
+    the next run (or one started with resume=True, e.g. a backfill) reuses
+    everything counted since the interrupted run started and only counts
+    the rest.
+
+    Args:
+        local_db: Local database connection (optional)
+        use_cache: False to recount every campaign (e.g. --full-resync)
+        resume: Reuse counts checkpointed in the current run window even if
+            the previous run finished, or use_cache is False
+
     Returns:
         dict: Maps normalized client_name to not_contacted count
               {client_name: not_contacted_count}
     """
     logger.info("Fetching not contacted leads from SmartLead API...")
 
-    try:
-        # Create API session
-        session = create_session()
+    checkpoint = None
 
-        # Fetch campaigns and process
-        campaigns = fetch_active_campaigns(session)
-        if not campaigns:
+    try:
+        cached = None
+        force_recount = None
+        resume_since = None
+        if local_db is not None:
+            # A full resync only resumes when asked to
+            resume_since = start_smartlead_run(local_db, resume, auto_resume=use_cache)
+            checkpoint = CampaignCountCheckpoint(local_db)
+
+            if use_cache or resume_since is not None:
+                cached = load_campaign_counts(local_db)
+                if use_cache:
+                    force_recount = get_recently_reached_campaigns(local_db)
+                    logger.info(
+                        f"Loaded cached counts for {len(cached)} campaigns "
+                        f"({len(force_recount)} reached new leads since their last count)"
+                    )
+                else:
+                    # Full resync: recount everything not already counted in the resumed window
+                    force_recount = set(cached)
+
+        # Fetch campaigns, clients and lead counts (async engine when available,
+        # count-only requests with per-campaign pagination fallback)
+        campaign_data = collect_campaign_data(cached, force_recount, resume_since, checkpoint)
+        if not campaign_data:
             logger.warning("No active campaigns found in SmartLead API")
             return {}
 
-        client_map = fetch_all_clients(session)
-
-        # Process campaigns (this may take 10-15 minutes)
-        logger.info(f"Processing {len(campaigns)} campaigns for not contacted leads...")
-        campaign_data = process_all_campaigns(campaigns, client_map)
+        if local_db is not None:
+            checkpoint.flush()
+            save_campaign_counts(local_db, campaign_data)
+            counted = sum(1 for data in campaign_data if not data.from_cache and not data.error)
+            set_ingest_watermark(
+                local_db, SMARTLEAD_STATE_SOURCE, None,
+                'incremental' if use_cache else 'full', counted
+            )
 
         # Consolidate by client
         client_summaries = consolidate_by_client(campaign_data)
 
-        # Convert to dict: normalized client_name -> not_contacted count
+        # Convert to dict: normalized client_name -> not_contacted count.
+        # Clients with a campaign that has no counts at all this run (failed
+        # or out of time, nothing cached) are left out so their previous
+        # value is preserved.
         not_contacted_map = {}
+        incomplete = []
         for summary in client_summaries:
+            if summary.missing_campaigns:
+                incomplete.append(summary.client_name)
+                continue
             normalized_name = normalize_client_name(summary.client_name)
             not_contacted_map[normalized_name] = summary.not_contacted
 
-        session.close()
+        stale = sum(1 for data in campaign_data if data.stale)
+        if stale:
+            logger.warning(
+                f"{stale} campaigns were not recounted this run; keeping previous values "
+                f"for {len(incomplete)} clients with incomplete totals: {incomplete[:10]}"
+            )
 
         logger.info(f"Fetched not contacted data for {len(not_contacted_map)} clients")
         return not_contacted_map
 
     except Exception as e:
         logger.error(f"Failed to fetch not contacted leads from SmartLead: {e}", exc_info=True)
-        # Return empty dict on failure - dashboard will show 0 for all clients
+        # Keep what was counted; the run window stays open, so the next run resumes it
+        if checkpoint is not None:
+            try:
+                checkpoint.flush()
+            except Exception as flush_error:
+                logger.error(f"Failed to checkpoint SmartLead counts: {flush_error}")
+        # Return empty dict on failure - existing not_contacted_leads values are preserved
         return {}
 
 
-def update_not_contacted_leads(local_db: LocalDatabase, not_contacted_map: dict):
+# SQL equivalent of normalize_client_name (Python str.strip() also trims tabs/newlines)
+NORMALIZED_SQL = "LOWER(BTRIM(COALESCE({}, ''), E' \\t\\n\\r\\f\\x0b'))"
+
+
+@dataclass
+class NotContactedUpdateResult:
+    """Outcome of update_not_contacted_leads"""
+    matched: int = 0  # dashboard clients updated
+    matched_by_code: int = 0  # of which matched on client_code (name had no entry)
+    ambiguous: int = 0  # updated clients whose SmartLead entry also matched another client
+    preserved: int = 0  # dashboard clients with no entry, existing value kept
+    unmatched: List[str] = field(default_factory=list)  # SmartLead names matching no client
+
+
+def update_not_contacted_leads(local_db: LocalDatabase, not_contacted_map: dict) -> NotContactedUpdateResult:
     """
     Update not_contacted_leads column in dashboard table.
 
     Only updates clients that have data in not_contacted_map.
     Preserves existing values for clients not in the map to prevent data loss.
 
+    The map is bulk-loaded into the session temp table
+    smartlead_not_contacted_stage and applied with one UPDATE ... FROM,
+    matching the normalized client_name (client_code when the name is
+    empty) first, then the normalized client_code.
+
     Args:
         local_db: Local database connection
         not_contacted_map: Dict of {normalized_client_name: not_contacted_count}
+
+    Returns:
+        NotContactedUpdateResult with matched, ambiguous, preserved and
+        unmatched counts
     """
     logger.info("Updating not_contacted_leads in dashboard...")
+    result = NotContactedUpdateResult()
 
     if not not_contacted_map:
         logger.warning("not_contacted_map is empty, preserving all existing values")
-        return
+        return result
 
     try:
         # Log not_contacted_map contents for debugging
         logger.info(f"not_contacted_map has {len(not_contacted_map)} entries")
         logger.info(f"Sample entries: {dict(list(not_contacted_map.items())[:5])}")
 
-        # Get all clients from dashboard
-        query = """
-            SELECT client_id, client_code, client_name
-            FROM client_health_dashboard_v1_local
-        """
-        clients = local_db.execute_read(query)
-
-        updated_count = 0
-        preserved_count = 0
-        for client in clients:
-            client_id = client[0]  # client_id (tuple index 0)
-            client_code = client[1]  # client_code (tuple index 1)
-            client_name = client[2] or client_code  # client_name (tuple index 2)
-
-            # Try both normalized client_name and client_code for matching
-            normalized_name = normalize_client_name(client_name)
-            normalized_code = normalize_client_name(client_code)
-
-            # Find not_contacted count (try client_name first, then client_code)
-            not_contacted = not_contacted_map.get(normalized_name)
-            if not_contacted is None:
-                not_contacted = not_contacted_map.get(normalized_code)
-
-            # Only update if we found data for this client
-            # Otherwise preserve existing value (don't overwrite with 0)
-            if not_contacted is not None:
-                # Update this client with new data
-                update_query = """
-                    UPDATE client_health_dashboard_v1_local
-                    SET not_contacted_leads = %s
-                    WHERE client_id = %s
-                """
-                local_db.execute_write(update_query, (not_contacted, client_id))
-                updated_count += 1
-
-                # Log first 10 updates for debugging
-                if updated_count <= 10:
-                    logger.info(f"Updating client_id={client_id}, code={client_code}, name={client_name}: not_contacted_leads={not_contacted}")
-            else:
-                # Preserve existing value for this client
-                preserved_count += 1
+        local_db.execute_write("""
+            CREATE TEMP TABLE IF NOT EXISTS smartlead_not_contacted_stage (
+                client_key TEXT PRIMARY KEY,
+                not_contacted INTEGER
+            )
+        """)
+        local_db.execute_write("TRUNCATE smartlead_not_contacted_stage")
+        local_db.bulk_load(
+            'smartlead_not_contacted_stage',
+            ('client_key', 'not_contacted'),
+            not_contacted_map.items()
+        )
 
-        logger.info(f"Updated not_contacted_leads for {updated_count} clients, preserved existing values for {preserved_count} clients")
+        name_key = NORMALIZED_SQL.format("COALESCE(NULLIF(d.client_name, ''), d.client_code)")
+        code_key = NORMALIZED_SQL.format("d.client_code")
+        updated = local_db.execute_write_returning(f"""
+            WITH matches AS (
+                SELECT d.client_id,
+                       COALESCE(by_name.client_key, by_code.client_key) AS client_key,
+                       COALESCE(by_name.not_contacted, by_code.not_contacted) AS not_contacted,
+                       by_name.client_key IS NULL AS matched_by_code
+                FROM client_health_dashboard_v1_local d
+                LEFT JOIN smartlead_not_contacted_stage by_name ON by_name.client_key = {name_key}
+                LEFT JOIN smartlead_not_contacted_stage by_code ON by_code.client_key = {code_key}
+                WHERE by_name.client_key IS NOT NULL OR by_code.client_key IS NOT NULL
+            ),
+            shared AS (
+                SELECT m.*, COUNT(*) OVER (PARTITION BY m.client_key) AS clients_per_key
+                FROM matches m
+            )
+            UPDATE client_health_dashboard_v1_local d
+            SET not_contacted_leads = s.not_contacted
+            FROM shared s
+            WHERE d.client_id = s.client_id
+            RETURNING d.client_id, d.client_code, d.client_name, s.client_key,
+                      s.not_contacted, s.matched_by_code, s.clients_per_key
+        """)
+
+        matched_keys = set()
+        for client_id, client_code, client_name, client_key, not_contacted, by_code, per_key in updated:
+            result.matched += 1
+            result.matched_by_code += int(by_code)
+            result.ambiguous += int(per_key > 1)
+            matched_keys.add(client_key)
+
+            # Log first 10 updates for debugging
+            if result.matched <= 10:
+                logger.info(f"Updating client_id={client_id}, code={client_code}, name={client_name}: not_contacted_leads={not_contacted}")
+
+        result.preserved = local_db.execute_read(
+            "SELECT COUNT(*) FROM client_health_dashboard_v1_local"
+        )[0][0] - result.matched
+        result.unmatched = sorted(key for key in not_contacted_map if key not in matched_keys)
+
+        logger.info(
+            f"Updated not_contacted_leads for {result.matched} clients "
+            f"({result.matched_by_code} by client code, {result.ambiguous} sharing a SmartLead client), "
+            f"preserved existing values for {result.preserved} clients"
+        )
+        if result.unmatched:
+            logger.warning(
+                f"{len(result.unmatched)} SmartLead clients matched no dashboard client: {result.unmatched[:10]}"
+            )
+        return result
 
     except Exception as e:
         logger.error(f"Failed to update not_contacted_leads: {e}", exc_info=True)
         raise
 
 
+# ============================================================================
+# INGEST STATE (HIGH-WATER MARKS)
+# ============================================================================
+
+CAMPAIGN_REPORTING_SOURCE = 'campaign_reporting'
+
+# Re-read a few minutes before the stored mark so rows committed at the source
+# with an earlier timestamp than rows we already saw are not missed.
+# Upserts are idempotent, so the overlap only costs a handful of rows.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def get_ingest_watermark(local_db: LocalDatabase, source_name: str) -> datetime | None:
+    """Return the stored high-water mark for a source, or None if never synced"""
+    rows = local_db.execute_read(
+        "SELECT high_water_mark FROM ingest_state WHERE source_name = %s",
+        (source_name,)
+    )
+    if not rows:
+        return None
+    return rows[0][0]
+
+
+def set_ingest_watermark(
+    local_db: LocalDatabase,
+    source_name: str,
+    high_water_mark: datetime | None,
+    sync_mode: str,
+    rows_synced: int
+):
+    """Record the high-water mark reached by a successful sync"""
+    local_db.execute_write("""
+        INSERT INTO ingest_state (
+            source_name, high_water_mark, last_sync_mode, last_rows_synced, last_run_at
+        ) VALUES (%s, %s, %s, %s, NOW())
+        ON CONFLICT (source_name) DO UPDATE SET
+            high_water_mark = COALESCE(EXCLUDED.high_water_mark, ingest_state.high_water_mark),
+            last_sync_mode = EXCLUDED.last_sync_mode,
+            last_rows_synced = EXCLUDED.last_rows_synced,
+            last_run_at = NOW()
+    """, (source_name, high_water_mark, sync_mode, rows_synced))
+    logger.info(f"Ingest state for {source_name}: mode={sync_mode}, rows={rows_synced}, high_water_mark={high_water_mark}")
+
+
 # ============================================================================
 # DATA INGESTION FUNCTIONS
 # ============================================================================
 
-def ingest_clients(supabase_clients: ReadOnlyConnection, local_db: LocalDatabase):
-    """Pull clients from Supabase and upsert into local database"""
+# clients_local columns in the order ingest_clients builds its rows
+CLIENTS_LOCAL_COLUMNS = (
+    'client_id', 'client_code', 'client_name', 'client_company_name', 'client_email',
+    'client_website', 'relationship_status', 'relationship_type',
+    'assigned_account_manager_id', 'assigned_account_manager_name', 'assigned_account_manager_email',
+    'assigned_inbox_manager_id', 'assigned_inbox_manager_name', 'assigned_inbox_manager_email',
+    'assigned_sdr_id', 'assigned_sdr_name', 'assigned_sdr_email',
+    'weekly_target', 'closelix', 'onboarding_activated', 'onboarding_date', 'exit_date',
+    'weekly_target_int', 'weekly_target_missing', 'bonus_pool_monthly', 'weekend_sending_effective',
+    'monthly_booking_goal',
+)
+
+
+def client_row_fingerprint(row: tuple) -> str:
+    """Stable hash of a processed client row, used to skip unchanged upserts"""
+    return hashlib.md5('\x1f'.join(repr(value) for value in row).encode('utf-8')).hexdigest()
+
+
+def ingest_clients(
+    supabase_clients: ReadOnlyConnection,
+    local_db: LocalDatabase,
+    full_resync: bool = False
+) -> Dict[str, int]:
+    """
+    Pull clients from Supabase and upsert new or changed rows into local database.
+
+    Each processed row is fingerprinted and only written when the stored
+    row_fingerprint differs (or with full_resync, which rewrites every row).
+
+    Returns:
+        Dict with 'inserted', 'changed' and 'unchanged' counts
+    """
     logger.info("Starting clients ingestion...")
 
     query = """
@@ -380,55 +793,39 @@ def ingest_clients(supabase_clients: ReadOnlyConnection, local_db: LocalDatabase
             weekend_sending_effective = False
         # row[24] is monthly_booking_goal (NEW)
         monthly_booking_goal = row[24] if len(row) > 24 else None
-        processed_rows.append(row[:22] + (weekly_target_int, weekly_target_missing, bonus_pool_monthly, weekend_sending_effective, monthly_booking_goal))
-
-    # Upsert into local database
-    upsert_query = """
-        INSERT INTO clients_local (
-            client_id, client_code, client_name, client_company_name, client_email,
-            client_website, relationship_status, relationship_type,
-            assigned_account_manager_id, assigned_account_manager_name, assigned_account_manager_email,
-            assigned_inbox_manager_id, assigned_inbox_manager_name, assigned_inbox_manager_email,
-            assigned_sdr_id, assigned_sdr_name, assigned_sdr_email,
-            weekly_target, closelix, onboarding_activated, onboarding_date, exit_date,
-            weekly_target_int, weekly_target_missing, bonus_pool_monthly, weekend_sending_effective,
-            monthly_booking_goal
-        ) VALUES (
-            %s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s
-        )
-        ON CONFLICT (client_id) DO UPDATE SET
-            client_code = EXCLUDED.client_code,
-            client_name = EXCLUDED.client_name,
-            client_company_name = EXCLUDED.client_company_name,
-            client_email = EXCLUDED.client_email,
-            client_website = EXCLUDED.client_website,
-            relationship_status = EXCLUDED.relationship_status,
-            relationship_type = EXCLUDED.relationship_type,
-            assigned_account_manager_id = EXCLUDED.assigned_account_manager_id,
-            assigned_account_manager_name = EXCLUDED.assigned_account_manager_name,
-            assigned_account_manager_email = EXCLUDED.assigned_account_manager_email,
-            assigned_inbox_manager_id = EXCLUDED.assigned_inbox_manager_id,
-            assigned_inbox_manager_name = EXCLUDED.assigned_inbox_manager_name,
-            assigned_inbox_manager_email = EXCLUDED.assigned_inbox_manager_email,
-            assigned_sdr_id = EXCLUDED.assigned_sdr_id,
-            assigned_sdr_name = EXCLUDED.assigned_sdr_name,
-            assigned_sdr_email = EXCLUDED.assigned_sdr_email,
-            weekly_target = EXCLUDED.weekly_target,
-            closelix = EXCLUDED.closelix,
-            onboarding_activated = EXCLUDED.onboarding_activated,
-            onboarding_date = EXCLUDED.onboarding_date,
-            exit_date = EXCLUDED.exit_date,
-            weekly_target_int = EXCLUDED.weekly_target_int,
-            weekly_target_missing = EXCLUDED.weekly_target_missing,
-            bonus_pool_monthly = EXCLUDED.bonus_pool_monthly,
-            weekend_sending_effective = EXCLUDED.weekend_sending_effective,
-            monthly_booking_goal = EXCLUDED.monthly_booking_goal,
-            updated_at = NOW()
-    """
-
-    rowcount = local_db.execute_write_many(upsert_query, processed_rows)
-    logger.info(f"Upserted {rowcount} clients into local database")
+        processed_row = row[:22] + (weekly_target_int, weekly_target_missing, bonus_pool_monthly, weekend_sending_effective, monthly_booking_goal)
+        processed_rows.append(processed_row + (client_row_fingerprint(processed_row),))
+
+    # Upsert only new or changed rows (unchanged rows are not rewritten)
+    result = local_db.bulk_load(
+        'clients_local',
+        CLIENTS_LOCAL_COLUMNS + ('row_fingerprint',),
+        processed_rows,
+        conflict_columns=('client_id',),
+        update_columns=CLIENTS_LOCAL_COLUMNS[1:] + ('row_fingerprint',),
+        update_where=None if full_resync else 'clients_local.row_fingerprint IS DISTINCT FROM EXCLUDED.row_fingerprint',
+        extra_updates={'updated_at': 'NOW()'},
+        returning='client_id, (xmax = 0) AS inserted'
+    )
+
+    affected_ids = [client_id for client_id, _ in result.returned]
+    sync_counts = {
+        'inserted': sum(1 for _, inserted in result.returned if inserted),
+        'changed': sum(1 for _, inserted in result.returned if not inserted),
+        'unchanged': len(processed_rows) - len(result.returned),
+    }
+    logger.info(
+        f"Client sync: {sync_counts['inserted']} inserted, {sync_counts['changed']} changed, "
+        f"{sync_counts['unchanged']} unchanged"
+    )
+
+    if not affected_ids:
+        logger.info("No new or changed clients, skipping name repair")
+        return sync_counts
     
+    # Name repair is limited to managers of new or changed clients
+    # (unchanged rows were already repaired on an earlier run)
+
     # Fix missing SDR names by looking up from SDR IDs
     logger.info("Fixing missing SDR names from SDR IDs...")
     fix_sdr_names_query = """
@@ -443,8 +840,11 @@ def ingest_clients(supabase_clients: ReadOnlyConnection, local_db: LocalDatabase
         )
         WHERE c1.assigned_sdr_id IS NOT NULL
           AND (c1.assigned_sdr_name IS NULL OR c1.assigned_sdr_name = '')
+          AND c1.assigned_sdr_id IN (
+              SELECT assigned_sdr_id FROM clients_local WHERE client_id = ANY(%s)
+          )
     """
-    fixed_count = local_db.execute_write(fix_sdr_names_query)
+    fixed_count = local_db.execute_write(fix_sdr_names_query, (affected_ids,))
     if fixed_count > 0:
         logger.info(f"Fixed {fixed_count} missing SDR names")
     
@@ -462,8 +862,11 @@ def ingest_clients(supabase_clients: ReadOnlyConnection, local_db: LocalDatabase
         )
         WHERE c1.assigned_account_manager_id IS NOT NULL
           AND (c1.assigned_account_manager_name IS NULL OR c1.assigned_account_manager_name = '')
+          AND c1.assigned_account_manager_id IN (
+              SELECT assigned_account_manager_id FROM clients_local WHERE client_id = ANY(%s)
+          )
     """
-    fixed_am_count = local_db.execute_write(fix_am_names_query)
+    fixed_am_count = local_db.execute_write(fix_am_names_query, (affected_ids,))
     if fixed_am_count > 0:
         logger.info(f"Fixed {fixed_am_count} missing Account Manager names")
     
@@ -481,812 +884,1192 @@ def ingest_clients(supabase_clients: ReadOnlyConnection, local_db: LocalDatabase
         )
         WHERE c1.assigned_inbox_manager_id IS NOT NULL
           AND (c1.assigned_inbox_manager_name IS NULL OR c1.assigned_inbox_manager_name = '')
+          AND c1.assigned_inbox_manager_id IN (
+              SELECT assigned_inbox_manager_id FROM clients_local WHERE client_id = ANY(%s)
+          )
     """
-    fixed_im_count = local_db.execute_write(fix_im_names_query)
+    fixed_im_count = local_db.execute_write(fix_im_names_query, (affected_ids,))
     if fixed_im_count > 0:
         logger.info(f"Fixed {fixed_im_count} missing Inbox Manager names")
 
+    return sync_counts
+
+
+CAMPAIGN_REPORTING_COLUMNS = """
+    campaign_date_key, campaign_id, parent_campaign_id, campaign_name,
+    client_name, status, start_date, end_date,
+    total_sent, new_leads_reached, replies_count, positive_reply,
+    bounce_count, reply_rate, positive_reply_rate,
+    inserted_at, updated_at, smartlead_account_name
+"""
+
+CAMPAIGN_REPORTING_LOCAL_COLUMNS = (
+    'campaign_date_key', 'campaign_id', 'parent_campaign_id', 'campaign_name',
+    'client_name', 'client_name_norm', 'status', 'start_date', 'end_date',
+    'total_sent', 'new_leads_reached', 'replies_count', 'positive_reply',
+    'bounce_count', 'reply_rate', 'positive_reply_rate',
+    'inserted_at', 'updated_at', 'smartlead_account_name',
+)
+
 
 def ingest_campaign_reporting(
     supabase_reporting: ReadOnlyConnection,
     local_db: LocalDatabase,
-    days_back: int = 30
+    days_back: int = 30,
+    full_resync: bool = False
 ):
-    """Pull campaign reporting from Supabase and upsert into local database"""
-    logger.info(f"Starting campaign reporting ingestion (last {days_back} days)...")
+    """
+    Pull campaign reporting from Supabase and upsert into local database.
 
+    Incremental mode (default) only fetches rows whose source
+    COALESCE(updated_at, inserted_at) is newer than the stored high-water mark
+    and upserts them by campaign_date_key. Full mode (first run, or
+    --full-resync) re-pulls the whole window and replaces it locally, which is
+    also how rows deleted at the source get dropped.
+
+    Rows are streamed with COPY from the source into a local staging table,
+    then merged with a single INSERT ... SELECT that also computes
+    client_name_norm, so nothing is materialised in Python.
+    """
     cutoff_date = (date.today() - timedelta(days=days_back)).isoformat()
 
-    query = """
-        SELECT
-            campaign_date_key, campaign_id, parent_campaign_id, campaign_name,
-            client_name, status, start_date, end_date,
-            total_sent, new_leads_reached, replies_count, positive_reply,
-            bounce_count, reply_rate, positive_reply_rate,
-            inserted_at, updated_at, smartlead_account_name
+    watermark = None if full_resync else get_ingest_watermark(local_db, CAMPAIGN_REPORTING_SOURCE)
+    incremental = watermark is not None
+
+    if incremental:
+        since = watermark - WATERMARK_OVERLAP
+        logger.info(f"Starting incremental campaign reporting ingestion (changed since {since.isoformat()})...")
+    else:
+        logger.info(f"Starting full campaign reporting ingestion (last {days_back} days)...")
+
+    query = f"""
+        SELECT {CAMPAIGN_REPORTING_COLUMNS}
         FROM public.campaign_reporting
         WHERE end_date >= %s
     """
+    params = (cutoff_date,)
 
-    rows = supabase_reporting.execute_read(query, (cutoff_date,))
-    logger.info(f"Fetched {len(rows)} campaign reporting rows from Supabase")
+    if incremental:
+        query += "      AND COALESCE(updated_at, inserted_at) > %s"
+        params = (cutoff_date, since)
 
-    # Normalize client_name and prepare data
-    processed_rows = []
-    for row in rows:
-        client_name_norm = normalize_client_name(row[4])
-        # Reconstruct row with client_name_norm inserted after client_name
-        # Original row has 18 fields, we need to insert at position 5
-        processed_row = (
-            row[0],  # campaign_date_key
-            row[1],  # campaign_id
-            row[2],  # parent_campaign_id
-            row[3],  # campaign_name
-            row[4],  # client_name
-            client_name_norm,  # NEW: client_name_norm
-            row[5],  # status
-            row[6],  # start_date
-            row[7],  # end_date
-            row[8],  # total_sent
-            row[9],  # new_leads_reached
-            row[10], # replies_count
-            row[11], # positive_reply
-            row[12], # bounce_count
-            row[13], # reply_rate
-            row[14], # positive_reply_rate
-            row[15], # inserted_at
-            row[16], # updated_at
-            row[17]  # smartlead_account_name
+    # Session-local staging table mirroring the source columns
+    local_db.execute_write("""
+        CREATE TEMP TABLE IF NOT EXISTS campaign_reporting_stage (
+            campaign_date_key TEXT,
+            campaign_id TEXT,
+            parent_campaign_id TEXT,
+            campaign_name TEXT,
+            client_name TEXT,
+            status TEXT,
+            start_date DATE,
+            end_date DATE,
+            total_sent INTEGER,
+            new_leads_reached INTEGER,
+            replies_count INTEGER,
+            positive_reply INTEGER,
+            bounce_count INTEGER,
+            reply_rate NUMERIC(10, 4),
+            positive_reply_rate NUMERIC(10, 4),
+            inserted_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ,
+            smartlead_account_name VARCHAR(255)
         )
-        processed_rows.append(processed_row)
-
-    # Delete old data and insert new
-    delete_query = "DELETE FROM campaign_reporting_local WHERE end_date >= %s"
-    local_db.execute_write(delete_query, (cutoff_date,))
-
-    insert_query = """
-        INSERT INTO campaign_reporting_local (
+    """)
+    local_db.execute_write("TRUNCATE campaign_reporting_stage")
+
+    staged_count = stream_copy(
+        supabase_reporting,
+        query,
+        params,
+        local_db,
+        f"COPY campaign_reporting_stage ({CAMPAIGN_REPORTING_COLUMNS}) FROM STDIN"
+    )
+    logger.info(f"Streamed {staged_count} campaign reporting rows from Supabase into staging")
+
+    # Source-side high-water mark (source clock, not ours)
+    high_water_mark = local_db.execute_read("""
+        SELECT MAX(COALESCE(updated_at, inserted_at)) FROM campaign_reporting_stage
+    """)[0][0] or watermark
+
+    if not incremental:
+        # Full re-sync: replace the whole window
+        delete_query = "DELETE FROM campaign_reporting_local WHERE end_date >= %s"
+        local_db.execute_write(delete_query, (cutoff_date,))
+
+    # client_name_norm matches build_client_mapping's LOWER(TRIM(...)) normalisation
+    result = local_db.merge_staged(
+        'campaign_reporting_stage',
+        'campaign_reporting_local',
+        CAMPAIGN_REPORTING_LOCAL_COLUMNS,
+        select_list="""
             campaign_date_key, campaign_id, parent_campaign_id, campaign_name,
-            client_name, client_name_norm, status, start_date, end_date,
+            client_name, COALESCE(LOWER(TRIM(client_name)), ''), status, start_date, end_date,
             total_sent, new_leads_reached, replies_count, positive_reply,
             bounce_count, reply_rate, positive_reply_rate,
             inserted_at, updated_at, smartlead_account_name
-        ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-    """
+        """,
+        conflict_columns=('campaign_date_key',),
+        update_columns=CAMPAIGN_REPORTING_LOCAL_COLUMNS[1:],
+        extra_updates={'ingested_at': 'NOW()'}
+    )
+    rowcount = result.affected
+    logger.info(f"Upserted {rowcount} campaign reporting rows into local database")
 
-    rowcount = local_db.execute_write_many(insert_query, processed_rows)
-    logger.info(f"Inserted {rowcount} campaign reporting rows into local database")
+    local_db.execute_write("TRUNCATE campaign_reporting_stage")
+
+    set_ingest_watermark(
+        local_db,
+        CAMPAIGN_REPORTING_SOURCE,
+        high_water_mark,
+        'incremental' if incremental else 'full',
+        staged_count
+    )
 
 
 def build_client_mapping(local_db: LocalDatabase):
     """Build mapping between client_code and reporting client_name"""
     logger.info("Building client name mapping...")
 
-    # Get all client codes
-    client_codes = local_db.execute_read("""
+    # Client codes by normalised code (one row per client, small)
+    clients_by_code_norm = defaultdict(list)
+    for client_id, client_code, client_code_norm in local_db.execute_read("""
         SELECT DISTINCT client_id, client_code, LOWER(TRIM(client_code))
         FROM clients_local
-    """)
-
-    # Get all reporting client names
-    reporting_names = local_db.execute_read("""
-        SELECT DISTINCT LOWER(TRIM(client_name)), client_name
-        FROM campaign_reporting_local
-    """)
+    """):
+        clients_by_code_norm[client_code_norm].append((client_id, client_code))
 
-    # Build exact matches
+    # Stream reporting names in batches and keep only exact matches
     mapping_rows = []
-    matched_reporting_names = set()
+    unmatched_names = 0
 
-    for client_id, client_code, client_code_norm in client_codes:
-        # Find exact match in reporting names
-        for client_name_norm, client_name in reporting_names:
-            if client_code_norm == client_name_norm:
+    for batch in local_db.execute_read_iter("""
+        SELECT DISTINCT LOWER(TRIM(client_name))
+        FROM campaign_reporting_local
+    """):
+        for (client_name_norm,) in batch:
+            matches = clients_by_code_norm.pop(client_name_norm, None)
+            if matches is None:
+                unmatched_names += 1
+                continue
+            for client_id, client_code in matches:
                 mapping_rows.append((
-                    client_id, client_code, client_code_norm,
+                    client_id, client_code, client_name_norm,
                     client_name_norm, 'exact', True
                 ))
-                matched_reporting_names.add(client_name_norm)
-                break
 
     # Clear old mappings and insert fresh
     local_db.execute_write("DELETE FROM client_name_map_local")
 
-    insert_query = """
-        INSERT INTO client_name_map_local (
-            client_id, client_code, client_code_norm, client_name_norm,
-            match_confidence, is_matched
-        ) VALUES (%s,%s,%s,%s,%s,%s)
-    """
-
-    local_db.execute_write_many(insert_query, mapping_rows)
+    local_db.bulk_load(
+        'client_name_map_local',
+        ('client_id', 'client_code', 'client_code_norm', 'client_name_norm',
+         'match_confidence', 'is_matched'),
+        mapping_rows
+    )
     logger.info(f"Created {len(mapping_rows)} client mappings")
-    logger.warning(f"Unmatched reporting client_names: {len(reporting_names) - len(matched_reporting_names)}")
+    logger.warning(f"Unmatched reporting client_names: {unmatched_names}")
 
 
-def fetch_bookings_data(start_date: date, end_date: date) -> Dict[str, Dict[str, int]]:
+def refresh_client_daily_metrics(local_db: LocalDatabase, days_back: int = 30, full_rebuild: bool = False):
     """
-    Fetch bookings counts from hyperke_dashboard.interested_leads
+    Maintain client_daily_metrics: one row per (client_id, day) with summed
+    campaign reporting totals, mapped through client_name_map_local.
+
+    Every window computation (current week, historical weeks, MTD, trends)
+    reads from this table instead of re-aggregating raw campaign rows.
+    Only days inside the ingest window are refreshed unless full_rebuild is set.
+    Rows are upserted and only touched when their totals change, so
+    computed_at tells get_dirty_historical_weeks which weeks moved.
+    """
+    if full_rebuild:
+        logger.info("Rebuilding client daily metrics (all days)...")
+        cutoff_date = date.min.isoformat()
+    else:
+        cutoff_date = (date.today() - timedelta(days=days_back)).isoformat()
+        logger.info(f"Refreshing client daily metrics since {cutoff_date}...")
+
+    rowcount = local_db.execute_write("""
+        INSERT INTO client_daily_metrics (
+            client_id, day,
+            total_sent, new_leads_reached, replies_count, positive_reply, bounce_count,
+            campaign_rows
+        )
+        SELECT
+            m.client_id,
+            cr.end_date,
+            SUM(cr.total_sent),
+            SUM(cr.new_leads_reached),
+            SUM(cr.replies_count),
+            SUM(cr.positive_reply),
+            SUM(cr.bounce_count),
+            COUNT(*)
+        FROM client_name_map_local m
+        INNER JOIN campaign_reporting_local cr ON cr.client_name_norm = m.client_name_norm
+        WHERE cr.end_date >= %s
+        GROUP BY m.client_id, cr.end_date
+        ON CONFLICT (client_id, day) DO UPDATE SET
+            total_sent = EXCLUDED.total_sent,
+            new_leads_reached = EXCLUDED.new_leads_reached,
+            replies_count = EXCLUDED.replies_count,
+            positive_reply = EXCLUDED.positive_reply,
+            bounce_count = EXCLUDED.bounce_count,
+            campaign_rows = EXCLUDED.campaign_rows,
+            computed_at = NOW()
+        WHERE (
+            client_daily_metrics.total_sent, client_daily_metrics.new_leads_reached,
+            client_daily_metrics.replies_count, client_daily_metrics.positive_reply,
+            client_daily_metrics.bounce_count, client_daily_metrics.campaign_rows
+        ) IS DISTINCT FROM (
+            EXCLUDED.total_sent, EXCLUDED.new_leads_reached,
+            EXCLUDED.replies_count, EXCLUDED.positive_reply,
+            EXCLUDED.bounce_count, EXCLUDED.campaign_rows
+        )
+    """, (cutoff_date,))
+    logger.info(f"Stored {rowcount} new or changed client daily metric rows")
+
+    # Drop days no longer backed by any mapped campaign row (mapping changes, full re-syncs)
+    removed = local_db.execute_write("""
+        DELETE FROM client_daily_metrics d
+        WHERE d.day >= %s
+          AND NOT EXISTS (
+              SELECT 1
+              FROM client_name_map_local m
+              INNER JOIN campaign_reporting_local cr ON cr.client_name_norm = m.client_name_norm
+              WHERE m.client_id = d.client_id
+                AND cr.end_date = d.day
+          )
+    """, (cutoff_date,))
+    if removed:
+        logger.info(f"Removed {removed} client daily metric rows without campaign data")
+
+
+def fetch_bookings_data(windows: List[Dict[str, Any]]) -> List[tuple]:
+    """
+    Fetch bookings counts from hyperke_dashboard.interested_leads for every
+    rollup window, using one connection and one grouped query.
 
     Args:
-        start_date: Start of date range (inclusive)
-        end_date: End of date range (inclusive)
+        windows: Rollup windows from get_rollup_windows()
 
     Returns:
-        Dict mapping client_code to booking counts: {
-            'CLIENT_CODE': {
-                'qualified_7d': X,
-                'showed_7d': Y,
-                'total_booked_7d': Z
-            }
-        }
+        List of (week_number, period_start_date, client_code, qualified_7d,
+        showed_7d, total_booked_7d) tuples, one per (window, client_code)
+        with at least one booking
     """
-    logger.info(f"Fetching bookings data for {start_date} to {end_date}...")
+    logger.info(f"Fetching bookings data for {len(windows)} windows...")
 
-    # Connect directly to hyperke_dashboard database (READ-ONLY access already granted)
-    # Use peer authentication (no password needed for local connections as ubuntu user)
+    # hyperke_dashboard database (READ-ONLY access already granted, peer
+    # authentication); the pooled connection is reused across calls
     query = """
+        WITH windows AS (
+            SELECT *
+            FROM unnest(%s::int[], %s::date[], %s::date[])
+                AS w(week_number, start_date, end_date)
+        )
         SELECT
-            client_code,
-            COUNT(*) FILTER (WHERE call_feedback = 'QUALIFIED') as qualified_7d,
-            COUNT(*) FILTER (WHERE call_feedback IN ('QUALIFIED', 'UNQUALIFIED')) as showed_7d,
+            w.week_number,
+            w.start_date,
+            il.client_code,
+            COUNT(*) FILTER (WHERE il.call_feedback = 'QUALIFIED') as qualified_7d,
+            COUNT(*) FILTER (WHERE il.call_feedback IN ('QUALIFIED', 'UNQUALIFIED')) as showed_7d,
             COUNT(*) as total_booked_7d
-        FROM interested_leads
-        WHERE meeting_date >= %s
-          AND meeting_date < %s + INTERVAL '1 day'
-          AND deleted_at IS NULL
-          AND meeting_date IS NOT NULL
-        GROUP BY client_code
+        FROM interested_leads il
+        INNER JOIN windows w
+            ON il.meeting_date >= w.start_date
+            AND il.meeting_date < w.end_date + INTERVAL '1 day'
+        WHERE il.meeting_date >= %s
+          AND il.meeting_date < %s::date + INTERVAL '1 day'
+          AND il.deleted_at IS NULL
+          AND il.meeting_date IS NOT NULL
+        GROUP BY w.week_number, w.start_date, il.client_code
     """
 
     try:
-        import psycopg2
-        # Connect using peer authentication (no password)
-        conn = psycopg2.connect(
-            dbname="hyperke_dashboard",
-            user="ubuntu",
-            host="/var/run/postgresql"  # Unix socket for peer auth
-        )
-        cur = conn.cursor()
-        cur.execute(query, (start_date, end_date))
-        rows = cur.fetchall()
-        cur.close()
-        conn.close()
-
-        bookings_map = {}
-        for row in rows:
-            client_code = row[0]
-            bookings_map[client_code] = {
-                'qualified_7d': row[1] or 0,
-                'showed_7d': row[2] or 0,
-                'total_booked_7d': row[3] or 0
-            }
-
-        logger.info(f"Fetched bookings data for {len(bookings_map)} clients")
-        return bookings_map
+        with bookings_pool().connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, (
+                    [w['week_number'] for w in windows],
+                    [w['start_date'] for w in windows],
+                    [w['end_date'] for w in windows],
+                    min(w['start_date'] for w in windows),
+                    max(w['end_date'] for w in windows)
+                ))
+                rows = cur.fetchall()
+
+        bookings_rows = [
+            (week_number, start_date, client_code, qualified or 0, showed or 0, total or 0)
+            for week_number, start_date, client_code, qualified, showed, total in rows
+        ]
+
+        logger.info(f"Fetched {len(bookings_rows)} (window, client) bookings rows")
+        return bookings_rows
 
     except Exception as e:
         logger.error(f"Failed to fetch bookings data: {e}")
         logger.warning("Bookings data will be set to 0 for all clients")
-        return {}
+        return []
 
 
-def compute_7d_rollups(local_db: LocalDatabase):
-    """Compute rollups from Friday to yesterday"""
-    logger.info("Computing Friday-to-Yesterday rollups...")
+def stage_window_bookings(local_db: LocalDatabase, windows: List[Dict[str, Any]]) -> int:
+    """
+    Load bookings counts for every rollup window into the session-local temp
+    table client_window_bookings_stage, ready for one UPDATE ... FROM per
+    rollup table.
+
+    Returns:
+        Number of staged (window, client_code) rows
+    """
+    local_db.execute_write("""
+        CREATE TEMP TABLE IF NOT EXISTS client_window_bookings_stage (
+            week_number INTEGER,
+            period_start_date DATE,
+            client_code TEXT,
+            qualified_7d INTEGER,
+            showed_7d INTEGER,
+            total_booked_7d INTEGER
+        )
+    """)
+    local_db.execute_write("TRUNCATE client_window_bookings_stage")
+
+    bookings_rows = fetch_bookings_data(windows)
+    if not bookings_rows:
+        logger.warning("No bookings data available, all clients will show 0 for bookings")
+        return 0
+
+    local_db.bulk_load(
+        'client_window_bookings_stage',
+        ('week_number', 'period_start_date', 'client_code', 'qualified_7d', 'showed_7d', 'total_booked_7d'),
+        bookings_rows,
+        strategy='copy'
+    )
+    return len(bookings_rows)
+
+
+def get_rollup_windows(local_db: LocalDatabase, historical_weeks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Rollup windows for one ingest run.
+
+    Week 0 is the current Friday-to-yesterday window, followed by the given
+    completed Friday-Thursday weeks (from get_historical_weeks(), usually
+    narrowed down by get_dirty_historical_weeks()).
+
+    Returns:
+        List of dicts with keys: week_number, start_date, end_date (as date objects)
+    """
+    start_date, end_date = get_friday_to_yesterday_range(local_db)
+    windows = [{'week_number': 0, 'start_date': start_date, 'end_date': end_date}]
+    windows.extend(historical_weeks)
+    return windows
+
+
+def get_dirty_historical_weeks(local_db: LocalDatabase, historical_weeks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Select the completed weeks that need (re)computing.
+
+    A week is dirty when it has no rows in client_health_dashboard_historical
+    yet, when any of its client_daily_metrics rows changed after the week
+    was last computed, or when its daily rows or set of clients differ from
+    what the week was computed from (historical_week_sources). The last check
+    catches deleted daily rows and backfilled days, which leave no newer
+    computed_at behind. Settled weeks are left untouched.
+    """
+    if not historical_weeks:
+        return []
+
+    rows = local_db.execute_read("""
+        WITH weeks AS (
+            SELECT *
+            FROM unnest(%s::date[], %s::date[]) AS w(start_date, end_date)
+        )
+        SELECT w.start_date
+        FROM weeks w
+        LEFT JOIN LATERAL (
+            SELECT MIN(h.computed_at) as computed_at
+            FROM client_health_dashboard_historical h
+            WHERE h.period_start_date = w.start_date
+        ) h ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT
+                MAX(d.computed_at) as changed_at,
+                COUNT(*) as daily_rows,
+                md5(COALESCE(string_agg(DISTINCT d.client_id::text, ',' ORDER BY d.client_id::text), '')) as clients_md5
+            FROM client_daily_metrics d
+            WHERE d.day BETWEEN w.start_date AND w.end_date
+        ) d ON TRUE
+        LEFT JOIN historical_week_sources s ON s.period_start_date = w.start_date
+        WHERE h.computed_at IS NULL
+           OR d.changed_at > h.computed_at
+           OR s.period_start_date IS NULL
+           OR s.daily_rows <> d.daily_rows
+           OR s.clients_md5 <> d.clients_md5
+    """, (
+        [w['start_date'] for w in historical_weeks],
+        [w['end_date'] for w in historical_weeks]
+    ))
+
+    dirty_starts = {row[0] for row in rows}
+    dirty_weeks = [w for w in historical_weeks if w['start_date'] in dirty_starts]
+    logger.info(f"{len(dirty_weeks)} of {len(historical_weeks)} historical weeks need computing")
+    return dirty_weeks
+
+
+def record_historical_week_sources(local_db: LocalDatabase, weeks: List[Dict[str, Any]]):
+    """Remember the client_daily_metrics rows and clients each computed week was built from"""
+    if not weeks:
+        return
+
+    local_db.execute_write("""
+        INSERT INTO historical_week_sources (period_start_date, daily_rows, clients_md5, computed_at)
+        SELECT
+            w.start_date,
+            COUNT(d.client_id),
+            md5(COALESCE(string_agg(DISTINCT d.client_id::text, ',' ORDER BY d.client_id::text), '')),
+            NOW()
+        FROM unnest(%s::date[], %s::date[]) AS w(start_date, end_date)
+        LEFT JOIN client_daily_metrics d ON d.day BETWEEN w.start_date AND w.end_date
+        GROUP BY w.start_date
+        ON CONFLICT (period_start_date) DO UPDATE SET
+            daily_rows = EXCLUDED.daily_rows,
+            clients_md5 = EXCLUDED.clients_md5,
+            computed_at = EXCLUDED.computed_at
+    """, (
+        [w['start_date'] for w in weeks],
+        [w['end_date'] for w in weeks]
+    ))
+
+
+def warn_uncovered_historical_weeks(local_db: LocalDatabase, historical_weeks: List[Dict[str, Any]]):
+    """Warn when HISTORICAL_WEEKS_DEPTH reaches back past the first day in client_daily_metrics"""
+    if not historical_weeks:
+        return
+
+    first_day = local_db.execute_read("SELECT MIN(day) FROM client_daily_metrics")[0][0]
+    uncovered = [w for w in historical_weeks if first_day is None or w['end_date'] < first_day]
+    if uncovered:
+        logger.warning(
+            f"{len(uncovered)} of {len(historical_weeks)} historical weeks (HISTORICAL_WEEKS_DEPTH="
+            f"{HISTORICAL_WEEKS_DEPTH}) end before the first client daily metrics day ({first_day}); "
+            f"they will show no activity until metrics are backfilled (e.g. with --full-resync)"
+        )
+
+
+def compute_window_rollups(local_db: LocalDatabase, windows: List[Dict[str, Any]]):
+    """
+    Aggregate client_daily_metrics for every rollup window in a single scan.
+
+    Each daily row is bucketed into its window(s) and summed with one GROUP BY
+    over (client, window), so the cost grows with the number of daily rows
+    rather than with the number of windows. Results land in the session-local
+    temp table client_window_rollup_stage, which compute_7d_rollups (week 0)
+    and compute_historical_rollups (weeks 1..N) copy from.
+    """
+    logger.info(f"Computing rollups for {len(windows)} windows in one pass...")
+
+    local_db.execute_write("""
+        CREATE TEMP TABLE IF NOT EXISTS client_window_rollup_stage (
+            client_id BIGINT,
+            client_code TEXT,
+            week_number INTEGER,
+            period_start_date DATE,
+            period_end_date DATE,
+            contacted_7d BIGINT,
+            replies_7d BIGINT,
+            positives_7d BIGINT,
+            bounces_7d BIGINT,
+            reply_rate_7d NUMERIC(10, 4),
+            positive_reply_rate_7d NUMERIC(10, 4),
+            bounce_pct_7d NUMERIC(10, 4),
+            new_leads_reached_7d BIGINT,
+            most_recent_reporting_end_date DATE
+        )
+    """)
+    local_db.execute_write("TRUNCATE client_window_rollup_stage")
+
+    rollup_query = """
+        WITH windows AS (
+            SELECT *
+            FROM unnest(%s::int[], %s::date[], %s::date[])
+                AS w(week_number, start_date, end_date)
+        ),
+        bucketed AS (
+            -- One range scan over the union of all windows
+            SELECT w.week_number, d.*
+            FROM client_daily_metrics d
+            INNER JOIN windows w ON d.day BETWEEN w.start_date AND w.end_date
+            WHERE d.day BETWEEN (SELECT MIN(start_date) FROM windows)
+                            AND (SELECT MAX(end_date) FROM windows)
+        )
+        INSERT INTO client_window_rollup_stage
+        SELECT
+            m.client_id,
+            c.client_code,
+            w.week_number,
+            w.start_date as period_start_date,
+            w.end_date as period_end_date,
+            COALESCE(SUM(b.total_sent), 0) as contacted_7d,
+            COALESCE(SUM(b.replies_count), 0) as replies_7d,
+            COALESCE(SUM(b.positive_reply), 0) as positives_7d,
+            COALESCE(SUM(b.bounce_count), 0) as bounces_7d,
+            CASE
+                WHEN SUM(b.new_leads_reached) > 0 THEN
+                    ROUND(SUM(b.replies_count)::numeric / SUM(b.new_leads_reached), 4)
+                ELSE NULL
+            END as reply_rate_7d,
+            CASE
+                WHEN SUM(b.replies_count) > 0 THEN
+                    ROUND(SUM(b.positive_reply)::numeric / SUM(b.replies_count), 4)
+                ELSE NULL
+            END as positive_reply_rate_7d,
+            CASE
+                WHEN SUM(b.total_sent) > 0 THEN
+                    ROUND(SUM(b.bounce_count)::numeric / SUM(b.total_sent), 4)
+                ELSE NULL
+            END as bounce_pct_7d,
+            COALESCE(SUM(b.new_leads_reached), 0) as new_leads_reached_7d,
+            MAX(b.day) as most_recent_reporting_end_date
+        FROM clients_local c
+        INNER JOIN client_name_map_local m ON c.client_code = m.client_code
+        CROSS JOIN windows w
+        LEFT JOIN bucketed b
+            ON b.client_id = m.client_id
+            AND b.week_number = w.week_number
+        GROUP BY m.client_id, c.client_code, w.week_number, w.start_date, w.end_date
+    """
+
+    rowcount = local_db.execute_write(rollup_query, (
+        [w['week_number'] for w in windows],
+        [w['start_date'] for w in windows],
+        [w['end_date'] for w in windows]
+    ))
+    logger.info(f"Computed {rowcount} (client, window) rollup rows")
+
+
+def compute_7d_rollups(local_db: LocalDatabase):
+    """Compute rollups from Friday to yesterday (week 0 of compute_window_rollups)"""
+    logger.info("Computing Friday-to-Yesterday rollups...")
+
+    start_date, end_date = get_friday_to_yesterday_range(local_db)
+    # Calculate days in period for pro-rated target calculations
+    days_in_period = (end_date - start_date).days + 1
+
+    # Convert to ISO strings for SQL queries
+    start_date_iso = start_date.isoformat()
+    end_date_iso = end_date.isoformat()
+
+    logger.info(f"Date range: {start_date_iso} to {end_date_iso} ({days_in_period} days)")
+
+    # Build the new rollups in a shadow table, published atomically below
+    shadow = local_db.create_shadow_table('client_7d_rollup_v1_local')
+
+    rollup_query = f"""
+        INSERT INTO {shadow} (
+            client_id, client_code,
+            contacted_7d, replies_7d, positives_7d, bounces_7d,
+            reply_rate_7d, positive_reply_rate_7d, bounce_pct_7d,
+            new_leads_reached_7d,
+            most_recent_reporting_end_date
+        )
+        SELECT
+            client_id, client_code,
+            contacted_7d, replies_7d, positives_7d, bounces_7d,
+            reply_rate_7d, positive_reply_rate_7d, bounce_pct_7d,
+            new_leads_reached_7d,
+            most_recent_reporting_end_date
+        FROM client_window_rollup_stage
+        WHERE week_number = 0
+    """
+
+    rowcount = local_db.execute_write(rollup_query)
+    logger.info(f"Computed {rowcount} client rollups for date range {start_date_iso} to {end_date_iso}")
+
+    # Apply bookings staged by stage_window_bookings in one statement
+    rowcount = local_db.execute_write(f"""
+        UPDATE {shadow} r
+        SET qualified_7d = b.qualified_7d,
+            showed_7d = b.showed_7d,
+            total_booked_7d = b.total_booked_7d
+        FROM client_window_bookings_stage b
+        WHERE b.week_number = 0
+          AND b.client_code = r.client_code
+    """)
+    logger.info(f"Updated bookings data for {rowcount} clients")
+
+    local_db.publish_shadow_table('client_7d_rollup_v1_local')
+
+    # Return days_in_period for pro-rated target calculations
+    return days_in_period
+
+
+def refresh_historical_bookings(local_db: LocalDatabase, table: str, historical_weeks: List[Dict[str, Any]]):
+    """
+    Bring bookings counts in a historical table up to date for every kept
+    week, from client_window_bookings_stage. Bookings feedback keeps arriving
+    after a week closes, so this runs for settled weeks too; only rows whose
+    counts changed are written.
+    """
+    if not local_db.execute_read("SELECT EXISTS (SELECT 1 FROM client_window_bookings_stage)")[0][0]:
+        logger.warning(f"No bookings staged, leaving {table} bookings unchanged")
+        return
+
+    rowcount = local_db.execute_write(f"""
+        UPDATE {table} r
+        SET qualified_7d = s.qualified_7d,
+            showed_7d = s.showed_7d,
+            total_booked_7d = s.total_booked_7d
+        FROM (
+            SELECT
+                h.id,
+                COALESCE(b.qualified_7d, 0) as qualified_7d,
+                COALESCE(b.showed_7d, 0) as showed_7d,
+                COALESCE(b.total_booked_7d, 0) as total_booked_7d
+            FROM {table} h
+            LEFT JOIN client_window_bookings_stage b
+                ON b.period_start_date = h.period_start_date
+                AND b.client_code = h.client_code
+            WHERE h.period_start_date = ANY(%s)
+        ) s
+        WHERE r.id = s.id
+          AND (r.qualified_7d, r.showed_7d, r.total_booked_7d)
+              IS DISTINCT FROM (s.qualified_7d, s.showed_7d, s.total_booked_7d)
+    """, ([w['start_date'] for w in historical_weeks],))
+    logger.info(f"Updated bookings data for {rowcount} rows in {table}")
+
+
+def prune_historical_weeks(local_db: LocalDatabase, table: str, historical_weeks: List[Dict[str, Any]]):
+    """Delete weeks older than the configured history depth from a historical table"""
+    if not historical_weeks:
+        return
+
+    oldest_start = min(w['start_date'] for w in historical_weeks)
+    rowcount = local_db.execute_write(
+        f"DELETE FROM {table} WHERE period_start_date < %s",
+        (oldest_start,)
+    )
+    if rowcount:
+        logger.info(f"Pruned {rowcount} rows older than {oldest_start} from {table}")
+
+
+def compute_historical_rollups(
+    local_db: LocalDatabase,
+    dirty_weeks: List[Dict[str, Any]],
+    historical_weeks: List[Dict[str, Any]]
+):
+    """
+    Upsert rollups for newly completed or changed Friday-Thursday weeks.
+
+    client_7d_rollup_historical is append-only and keyed by period_start_date:
+    settled weeks are never recomputed, only their bookings are refreshed.
+    The dirty weeks must be among the windows passed to compute_window_rollups.
+    """
+    logger.info(f"Computing historical rollups for {len(dirty_weeks)} of {len(historical_weeks)} completed weeks...")
+
+    if not historical_weeks:
+        logger.warning("No historical weeks to compute")
+        return
+
+    if dirty_weeks:
+        dirty_starts = [w['start_date'] for w in dirty_weeks]
+
+        rollup_query = """
+            INSERT INTO client_7d_rollup_historical (
+                client_id, client_code,
+                period_start_date, period_end_date,
+                contacted_7d, replies_7d, positives_7d, bounces_7d,
+                reply_rate_7d, positive_reply_rate_7d, bounce_pct_7d,
+                new_leads_reached_7d,
+                most_recent_reporting_end_date
+            )
+            SELECT
+                client_id, client_code,
+                period_start_date, period_end_date,
+                contacted_7d, replies_7d, positives_7d, bounces_7d,
+                reply_rate_7d, positive_reply_rate_7d, bounce_pct_7d,
+                new_leads_reached_7d,
+                most_recent_reporting_end_date
+            FROM client_window_rollup_stage
+            WHERE period_start_date = ANY(%s)
+              AND week_number > 0
+            ON CONFLICT (client_id, period_start_date) DO UPDATE SET
+                client_code = EXCLUDED.client_code,
+                period_end_date = EXCLUDED.period_end_date,
+                contacted_7d = EXCLUDED.contacted_7d,
+                replies_7d = EXCLUDED.replies_7d,
+                positives_7d = EXCLUDED.positives_7d,
+                bounces_7d = EXCLUDED.bounces_7d,
+                reply_rate_7d = EXCLUDED.reply_rate_7d,
+                positive_reply_rate_7d = EXCLUDED.positive_reply_rate_7d,
+                bounce_pct_7d = EXCLUDED.bounce_pct_7d,
+                new_leads_reached_7d = EXCLUDED.new_leads_reached_7d,
+                most_recent_reporting_end_date = EXCLUDED.most_recent_reporting_end_date,
+                computed_at = NOW()
+        """
+
+        rowcount = local_db.execute_write(rollup_query, (dirty_starts,))
+        logger.info(f"Upserted {rowcount} historical rollup rows")
+
+        # Clients that dropped out of a recomputed week
+        local_db.execute_write("""
+            DELETE FROM client_7d_rollup_historical h
+            WHERE h.period_start_date = ANY(%s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM client_window_rollup_stage s
+                  WHERE s.client_id = h.client_id
+                    AND s.period_start_date = h.period_start_date
+              )
+        """, (dirty_starts,))
+
+    refresh_historical_bookings(local_db, 'client_7d_rollup_historical', historical_weeks)
+    prune_historical_weeks(local_db, 'client_7d_rollup_historical', historical_weeks)
+    logger.info(f"Historical rollups complete: {len(dirty_weeks)} weeks computed")
+
+
+def compute_historical_dashboard_dataset(
+    local_db: LocalDatabase,
+    dirty_weeks: List[Dict[str, Any]],
+    historical_weeks: List[Dict[str, Any]]
+):
+    """
+    Upsert dashboard rows (with RAG) for newly completed or changed weeks.
+
+    client_health_dashboard_historical is append-only and keyed by
+    period_start_date; week_number is derived by the
+    client_health_dashboard_historical_v view. The RAG CTE runs once over
+    every (client, dirty week) row.
+    """
+    logger.info("Computing historical dashboard dataset with RAG...")
+
+    if dirty_weeks:
+        dirty_starts = [w['start_date'] for w in dirty_weeks]
+        logger.info(f"Computing dashboard for {len(dirty_weeks)} historical weeks in one statement")
+        compute_historical_dashboard_weeks(local_db, dirty_starts)
+        record_historical_week_sources(local_db, dirty_weeks)
+    else:
+        logger.info("No new historical weeks to compute dashboard for")
+
+    refresh_historical_bookings(local_db, 'client_health_dashboard_historical', historical_weeks)
+    prune_historical_weeks(local_db, 'client_health_dashboard_historical', historical_weeks)
+    prune_historical_weeks(local_db, 'historical_week_sources', historical_weeks)
+    logger.info("Historical dashboard dataset computation complete")
+
+
+def compute_historical_dashboard_weeks(local_db: LocalDatabase, dirty_starts: List[date]):
+    """Run the historical RAG statement and rag_reason update for the given week starts"""
+    # Compute dashboard with proper RAG calculation
+    dashboard_insert = """
+        WITH week_days AS (
+            -- All-days and weekday (Mon-Fri) counts per week from the calendar prefix counters
+            SELECT
+                w.period_start_date,
+                ce.day_seq - cs.day_seq + 1 as all_days,
+                ce.weekday_seq - cs.weekday_seq + CASE WHEN cs.is_weekday THEN 1 ELSE 0 END as weekdays
+            FROM (
+                SELECT DISTINCT period_start_date, period_end_date
+                FROM client_7d_rollup_historical
+                WHERE period_start_date = ANY(%(weeks)s)
+            ) w
+            INNER JOIN calendar_local cs ON cs.day = w.period_start_date
+            INNER JOIN calendar_local ce ON ce.day = w.period_end_date
+        ),
+        client_sending_days AS (
+            -- Calculate sending days count for each (client, week)
+            SELECT
+                c.client_id,
+                r.period_start_date,
+                CASE
+                    WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN wd.all_days
+                    ELSE wd.weekdays
+                END as sending_days_count
+            FROM clients_local c
+            INNER JOIN client_7d_rollup_historical r ON c.client_id = r.client_id
+                AND r.period_start_date = ANY(%(weeks)s)
+            INNER JOIN week_days wd ON wd.period_start_date = r.period_start_date
+            WHERE EXISTS (
+                SELECT 1 FROM active_clients_v1 a WHERE a.client_id = c.client_id
+            )
+        ),
+        metric_rags AS (
+            SELECT
+                c.client_id,
+                c.client_code,
+                c.client_name,
+                c.client_company_name,
+                c.relationship_status,
+                c.assigned_account_manager_name,
+                c.assigned_inbox_manager_name,
+                c.assigned_sdr_name,
+                c.weekly_target_int,
+                c.weekly_target_missing,
+                c.closelix,
+                c.bonus_pool_monthly,
+                c.monthly_booking_goal,
+                r.period_start_date, r.period_end_date,
+                COALESCE(r.contacted_7d, 0) as contacted_7d,
+                COALESCE(r.replies_7d, 0) as replies_7d,
+                COALESCE(r.positives_7d, 0) as positives_7d,
+                COALESCE(r.bounces_7d, 0) as bounces_7d,
+                r.reply_rate_7d, r.positive_reply_rate_7d, r.bounce_pct_7d,
+                COALESCE(r.new_leads_reached_7d, 0) as new_leads_reached_7d,
+                COALESCE(r.qualified_7d, 0) as qualified_7d,
+                COALESCE(r.showed_7d, 0) as showed_7d,
+                COALESCE(r.total_booked_7d, 0) as total_booked_7d,
+                sd.sending_days_count,
+                c.weekend_sending_effective,
+                -- Calculate pro-rated target based on weekend sending settings
+                CASE
+                    WHEN c.weekly_target_int IS NOT NULL AND c.weekly_target_int > 0 THEN
+                        ROUND(
+                            c.weekly_target_int::numeric *
+                            CASE
+                                WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN
+                                    1.0 / 7.0
+                                ELSE
+                                    1.0 / 5.0
+                            END *
+                            sd.sending_days_count, 2
+                        )
+                    ELSE NULL
+                END as prorated_target,
+                -- Volume attainment using pro-rated target
+                CASE
+                    WHEN c.weekly_target_int IS NOT NULL AND c.weekly_target_int > 0 THEN
+                        ROUND(
+                            COALESCE(r.new_leads_reached_7d, 0)::numeric /
+                            (c.weekly_target_int::numeric *
+                             CASE
+                                 WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN 1.0/7.0
+                                 ELSE 1.0/5.0
+                             END *
+                             sd.sending_days_count), 4
+                        )
+                    ELSE NULL
+                END as volume_attainment,
+                CASE
+                    WHEN r.positives_7d > 0 THEN
+                        ROUND(COALESCE(r.contacted_7d, 0)::numeric / r.positives_7d, 2)
+                    ELSE NULL
+                END as pcpl_proxy_7d,
+                CASE
+                    WHEN r.reply_rate_7d < 0.02 OR r.bounce_pct_7d >= 0.05 THEN TRUE
+                    ELSE FALSE
+                END as deliverability_flag,
+                CASE
+                    WHEN c.weekly_target_int IS NOT NULL AND c.weekly_target_int > 0
+                        AND COALESCE(r.new_leads_reached_7d, 0)::numeric /
+                        (c.weekly_target_int::numeric *
+                         CASE
+                             WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN 1.0/7.0
+                             ELSE 1.0/5.0
+                         END *
+                         sd.sending_days_count) < 0.8 THEN TRUE
+                    ELSE FALSE
+                END as volume_flag,
+                CASE
+                    WHEN r.reply_rate_7d >= 0.02 AND r.positive_reply_rate_7d < 0.05 THEN TRUE
+                    ELSE FALSE
+                END as mmf_flag,
+                CASE
+                    WHEN r.contacted_7d IS NULL OR r.contacted_7d = 0 THEN TRUE
+                    ELSE FALSE
+                END as data_missing_flag,
+                CASE
+                    WHEN r.most_recent_reporting_end_date < r.period_end_date - 1 THEN TRUE
+                    ELSE FALSE
+                END as data_stale_flag,
+                r.most_recent_reporting_end_date,
+                -- Individual RAG calculations for each metric
+                -- Reply Rate RAG
+                CASE
+                    WHEN r.reply_rate_7d IS NULL THEN NULL
+                    WHEN r.reply_rate_7d < 0.015 THEN 'Red'
+                    WHEN r.reply_rate_7d < 0.02 THEN 'Amber'
+                    ELSE 'Green'
+                END as rr_rag,
+                -- Positive Reply Rate RAG
+                CASE
+                    WHEN r.replies_7d IS NULL OR r.replies_7d = 0 THEN NULL
+                    WHEN r.positives_7d = 0 THEN
+                        CASE WHEN r.replies_7d > 0 THEN 'Red' ELSE NULL END
+                    WHEN r.positives_7d IS NULL THEN NULL
+                    WHEN (r.positives_7d::numeric / r.replies_7d) < 0.05 THEN 'Red'
+                    WHEN (r.positives_7d::numeric / r.replies_7d) < 0.08 THEN 'Amber'
+                    ELSE 'Green'
+                END as prr_rag,
+                -- PCPL RAG
+                CASE
+                    WHEN r.positives_7d = 0 THEN 'Red'
+                    WHEN r.positives_7d IS NULL THEN NULL
+                    WHEN COALESCE(r.new_leads_reached_7d, 0)::numeric / r.positives_7d > 800 THEN 'Red'
+                    WHEN COALESCE(r.new_leads_reached_7d, 0)::numeric / r.positives_7d > 500 THEN 'Amber'
+                    ELSE 'Green'
+                END as pcpl_rag,
+                -- Bounce Rate RAG
+                CASE
+                    WHEN r.bounce_pct_7d IS NULL THEN NULL
+                    WHEN r.bounce_pct_7d >= 0.04 THEN 'Red'
+                    WHEN r.bounce_pct_7d >= 0.02 THEN 'Amber'
+                    ELSE 'Green'
+                END as br_rag,
+                -- Volume/Target RAG
+                CASE
+                    WHEN c.weekly_target_int IS NULL OR c.weekly_target_int = 0 THEN NULL
+                    WHEN COALESCE(r.new_leads_reached_7d, 0)::numeric /
+                    (c.weekly_target_int::numeric *
+                     CASE
+                         WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN 1.0/7.0
+                         ELSE 1.0/5.0
+                     END *
+                     sd.sending_days_count) < 0.5 THEN 'Red'
+                    WHEN COALESCE(r.new_leads_reached_7d, 0)::numeric /
+                    (c.weekly_target_int::numeric *
+                     CASE
+                         WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN 1.0/7.0
+                         ELSE 1.0/5.0
+                     END *
+                     sd.sending_days_count) < 0.8 THEN 'Amber'
+                    ELSE 'Green'
+                END as volume_rag
+            FROM clients_local c
+            INNER JOIN client_7d_rollup_historical r ON c.client_id = r.client_id
+                AND r.period_start_date = ANY(%(weeks)s)
+            INNER JOIN client_sending_days sd
+                ON sd.client_id = r.client_id
+                AND sd.period_start_date = r.period_start_date
+        ),
+        final_metrics AS (
+            SELECT
+                metric_rags.*,
+                -- Hybrid RAG Status with majority voting and critical overrides
+                CASE
+                    -- CRITICAL OVERRIDES: Any of these = Red regardless of votes
+                    WHEN metric_rags.contacted_7d = 0 THEN 'Red'
+                    WHEN metric_rags.reply_rate_7d < 0.015 OR metric_rags.bounce_pct_7d >= 0.04 THEN 'Red'
+                    WHEN metric_rags.weekly_target_int IS NOT NULL AND metric_rags.weekly_target_int > 0
+                        AND metric_rags.prorated_target IS NOT NULL
+                        AND (metric_rags.new_leads_reached_7d::numeric / metric_rags.prorated_target) < 0.5 THEN 'Red'
+
+                    -- Count votes from individual RAGs
+                    WHEN (
+                        (CASE WHEN metric_rags.rr_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Red' THEN 1 ELSE 0 END)
+                    ) >= 3 THEN 'Red'
+
+                    -- 2+ Red = Red
+                    WHEN (
+                        (CASE WHEN metric_rags.rr_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Red' THEN 1 ELSE 0 END)
+                    ) >= 2 AND (
+                        (CASE WHEN metric_rags.rr_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Amber' THEN 1 ELSE 0 END)
+                    ) >= 1 THEN 'Red'
 
-    start_date, end_date = get_friday_to_yesterday_range()
-    # Calculate days in period for pro-rated target calculations
-    days_in_period = (end_date - start_date).days + 1
+                    -- 3+ Amber = Amber
+                    WHEN (
+                        (CASE WHEN metric_rags.rr_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Amber' THEN 1 ELSE 0 END)
+                    ) >= 3 THEN 'Yellow'
 
-    # Convert to ISO strings for SQL queries
-    start_date_iso = start_date.isoformat()
-    end_date_iso = end_date.isoformat()
+                    -- 4+ Green = Green
+                    WHEN (
+                        (CASE WHEN metric_rags.rr_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Green' THEN 1 ELSE 0 END)
+                    ) >= 4 THEN 'Green'
 
-    logger.info(f"Date range: {start_date_iso} to {end_date_iso} ({days_in_period} days)")
+                    -- 3 Green + 2 Amber = Amber
+                    WHEN (
+                        (CASE WHEN metric_rags.rr_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Green' THEN 1 ELSE 0 END)
+                    ) = 3 AND (
+                        (CASE WHEN metric_rags.rr_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Amber' THEN 1 ELSE 0 END)
+                    ) = 2 THEN 'Yellow'
 
-    # Clear old rollups
-    local_db.execute_write("DELETE FROM client_7d_rollup_v1_local")
+                    -- 3 Green + (1 Red OR 1 Amber) = Amber
+                    WHEN (
+                        (CASE WHEN metric_rags.rr_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Green' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Green' THEN 1 ELSE 0 END)
+                    ) = 3 AND (
+                        (CASE WHEN metric_rags.rr_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Red' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.rr_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.prr_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.pcpl_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.br_rag = 'Amber' THEN 1 ELSE 0 END) +
+                        (CASE WHEN metric_rags.volume_rag = 'Amber' THEN 1 ELSE 0 END)
+                    ) >= 1 THEN 'Yellow'
 
-    # Compute rollups
-    rollup_query = """
-        INSERT INTO client_7d_rollup_v1_local (
-            client_id, client_code,
+                    -- Default conservative: Amber
+                    ELSE 'Yellow'
+                END as rag_status
+            FROM metric_rags
+        )
+        INSERT INTO client_health_dashboard_historical (
+            client_id, client_code, client_name, client_company_name,
+            relationship_status, assigned_account_manager_name,
+            assigned_inbox_manager_name, assigned_sdr_name,
+            weekly_target_int, weekly_target_missing, closelix,
+            bonus_pool_monthly, weekend_sending_effective, monthly_booking_goal,
+            period_start_date, period_end_date,
             contacted_7d, replies_7d, positives_7d, bounces_7d,
             reply_rate_7d, positive_reply_rate_7d, bounce_pct_7d,
             new_leads_reached_7d,
+            prorated_target,
+            volume_attainment, pcpl_proxy_7d,
+            not_contacted_leads,
+            qualified_7d, showed_7d, total_booked_7d,
+            deliverability_flag, volume_flag, mmf_flag,
+            data_missing_flag, data_stale_flag,
+            rag_status, rag_reason,
             most_recent_reporting_end_date
         )
         SELECT
-            m.client_id,
-            c.client_code,
-            COALESCE(SUM(cr.total_sent), 0) as contacted_7d,
-            COALESCE(SUM(cr.replies_count), 0) as replies_7d,
-            COALESCE(SUM(cr.positive_reply), 0) as positives_7d,
-            COALESCE(SUM(cr.bounce_count), 0) as bounces_7d,
-            CASE
-                WHEN SUM(cr.new_leads_reached) > 0 THEN
-                    ROUND(SUM(cr.replies_count)::numeric / SUM(cr.new_leads_reached), 4)
-                ELSE NULL
-            END as reply_rate_7d,
-            CASE
-                WHEN SUM(cr.replies_count) > 0 THEN
-                    ROUND(SUM(cr.positive_reply)::numeric / SUM(cr.replies_count), 4)
-                ELSE NULL
-            END as positive_reply_rate_7d,
-            CASE
-                WHEN SUM(cr.total_sent) > 0 THEN
-                    ROUND(SUM(cr.bounce_count)::numeric / SUM(cr.total_sent), 4)
-                ELSE NULL
-            END as bounce_pct_7d,
-            COALESCE(SUM(cr.new_leads_reached), 0) as new_leads_reached_7d,
-            MAX(cr.end_date) as most_recent_reporting_end_date
-        FROM clients_local c
-        INNER JOIN client_name_map_local m ON c.client_code = m.client_code
-        LEFT JOIN campaign_reporting_local cr
-            ON m.client_name_norm = cr.client_name_norm
-            AND cr.end_date >= %s
-            AND cr.end_date <= %s
-        GROUP BY m.client_id, c.client_code
+            m.client_id, m.client_code, m.client_name, m.client_company_name,
+            m.relationship_status, m.assigned_account_manager_name,
+            m.assigned_inbox_manager_name, m.assigned_sdr_name,
+            m.weekly_target_int, m.weekly_target_missing, m.closelix,
+            m.bonus_pool_monthly, m.weekend_sending_effective, m.monthly_booking_goal,
+            m.period_start_date, m.period_end_date,
+            m.contacted_7d, m.replies_7d, m.positives_7d, m.bounces_7d,
+            m.reply_rate_7d, m.positive_reply_rate_7d, m.bounce_pct_7d,
+            m.new_leads_reached_7d,
+            m.prorated_target,
+            m.volume_attainment, m.pcpl_proxy_7d,
+            COALESCE(c.not_contacted_leads, 0) as not_contacted_leads,
+            m.qualified_7d, m.showed_7d, m.total_booked_7d,
+            m.deliverability_flag, m.volume_flag, m.mmf_flag,
+            m.data_missing_flag, m.data_stale_flag,
+            m.rag_status, NULL as rag_reason,
+            m.most_recent_reporting_end_date
+        FROM final_metrics m
+        LEFT JOIN client_health_dashboard_v1_local c ON m.client_id = c.client_id
+        ON CONFLICT (client_id, period_start_date) DO UPDATE SET
+            client_code = EXCLUDED.client_code,
+            client_name = EXCLUDED.client_name,
+            client_company_name = EXCLUDED.client_company_name,
+            relationship_status = EXCLUDED.relationship_status,
+            assigned_account_manager_name = EXCLUDED.assigned_account_manager_name,
+            assigned_inbox_manager_name = EXCLUDED.assigned_inbox_manager_name,
+            assigned_sdr_name = EXCLUDED.assigned_sdr_name,
+            weekly_target_int = EXCLUDED.weekly_target_int,
+            weekly_target_missing = EXCLUDED.weekly_target_missing,
+            closelix = EXCLUDED.closelix,
+            bonus_pool_monthly = EXCLUDED.bonus_pool_monthly,
+            weekend_sending_effective = EXCLUDED.weekend_sending_effective,
+            monthly_booking_goal = EXCLUDED.monthly_booking_goal,
+            period_end_date = EXCLUDED.period_end_date,
+            contacted_7d = EXCLUDED.contacted_7d,
+            replies_7d = EXCLUDED.replies_7d,
+            positives_7d = EXCLUDED.positives_7d,
+            bounces_7d = EXCLUDED.bounces_7d,
+            reply_rate_7d = EXCLUDED.reply_rate_7d,
+            positive_reply_rate_7d = EXCLUDED.positive_reply_rate_7d,
+            bounce_pct_7d = EXCLUDED.bounce_pct_7d,
+            new_leads_reached_7d = EXCLUDED.new_leads_reached_7d,
+            prorated_target = EXCLUDED.prorated_target,
+            volume_attainment = EXCLUDED.volume_attainment,
+            pcpl_proxy_7d = EXCLUDED.pcpl_proxy_7d,
+            not_contacted_leads = EXCLUDED.not_contacted_leads,
+            qualified_7d = EXCLUDED.qualified_7d,
+            showed_7d = EXCLUDED.showed_7d,
+            total_booked_7d = EXCLUDED.total_booked_7d,
+            deliverability_flag = EXCLUDED.deliverability_flag,
+            volume_flag = EXCLUDED.volume_flag,
+            mmf_flag = EXCLUDED.mmf_flag,
+            data_missing_flag = EXCLUDED.data_missing_flag,
+            data_stale_flag = EXCLUDED.data_stale_flag,
+            rag_status = EXCLUDED.rag_status,
+            rag_reason = EXCLUDED.rag_reason,
+            most_recent_reporting_end_date = EXCLUDED.most_recent_reporting_end_date,
+            computed_at = NOW()
     """
 
-    rowcount = local_db.execute_write(rollup_query, (start_date_iso, end_date_iso))
-    logger.info(f"Computed {rowcount} client rollups for date range {start_date_iso} to {end_date_iso}")
-
-    # Fetch and update bookings data
-    bookings_data = fetch_bookings_data(start_date, end_date)
-
-    if bookings_data:
-        # Update rollups with bookings data
-        for client_code, counts in bookings_data.items():
-            update_query = """
-                UPDATE client_7d_rollup_v1_local
-                SET qualified_7d = %s,
-                    showed_7d = %s,
-                    total_booked_7d = %s
-                WHERE client_code = %s
-            """
-            local_db.execute_write(update_query, (
-                counts['qualified_7d'],
-                counts['showed_7d'],
-                counts['total_booked_7d'],
-                client_code
-            ))
-        logger.info(f"Updated bookings data for {len(bookings_data)} clients")
-    else:
-        logger.warning("No bookings data available, all clients will show 0 for bookings")
-
-    # Return days_in_period for pro-rated target calculations
-    return days_in_period
-
-
-def compute_historical_rollups(local_db: LocalDatabase):
-    """Compute and store rollups for last 4 completed Friday-Thursday weeks"""
-    logger.info("Computing historical rollups for last 4 completed weeks...")
-
-    # Get historical week definitions
-    historical_weeks = get_historical_weeks(num_weeks=4)
-
-    if not historical_weeks:
-        logger.warning("No historical weeks to compute")
-        return
-
-    # Clear all existing historical rollup data to ensure weeks roll forward correctly
-    logger.info("Clearing existing historical rollup data...")
-    local_db.execute_write("DELETE FROM client_7d_rollup_historical")
-    logger.info("Cleared all historical rollups")
+    rowcount = local_db.execute_write(dashboard_insert, {'weeks': dirty_starts})
+    logger.info(f"Upserted {rowcount} historical dashboard rows")
 
-    for week_info in historical_weeks:
-        week_num = week_info['week_number']
-        start_date = week_info['start_date']
-        end_date = week_info['end_date']
-
-        logger.info(f"Computing historical week {week_num}: {start_date} to {end_date}")
-
-        # Check if this week already exists
-        existing_check = local_db.execute_read("""
-            SELECT COUNT(*) FROM client_7d_rollup_historical
-            WHERE period_start_date = %s
-        """, (start_date.isoformat(),))
-
-        if existing_check[0][0] > 0:
-            logger.info(f"  Week {week_num} already exists, skipping...")
-            continue
-
-        # Compute rollups for this week
-        rollup_query = """
-            INSERT INTO client_7d_rollup_historical (
-                client_id, client_code,
-                period_start_date, period_end_date, week_number,
-                contacted_7d, replies_7d, positives_7d, bounces_7d,
-                reply_rate_7d, positive_reply_rate_7d, bounce_pct_7d,
-                new_leads_reached_7d,
-                most_recent_reporting_end_date
-            )
-            SELECT
-                m.client_id,
-                c.client_code,
-                %s as period_start_date,
-                %s as period_end_date,
-                %s as week_number,
-                COALESCE(SUM(cr.total_sent), 0) as contacted_7d,
-                COALESCE(SUM(cr.replies_count), 0) as replies_7d,
-                COALESCE(SUM(cr.positive_reply), 0) as positives_7d,
-                COALESCE(SUM(cr.bounce_count), 0) as bounces_7d,
-                CASE
-                    WHEN SUM(cr.new_leads_reached) > 0 THEN
-                        ROUND(SUM(cr.replies_count)::numeric / SUM(cr.new_leads_reached), 4)
-                    ELSE NULL
-                END as reply_rate_7d,
-                CASE
-                    WHEN SUM(cr.replies_count) > 0 THEN
-                        ROUND(SUM(cr.positive_reply)::numeric / SUM(cr.replies_count), 4)
-                    ELSE NULL
-                END as positive_reply_rate_7d,
-                CASE
-                    WHEN SUM(cr.total_sent) > 0 THEN
-                        ROUND(SUM(cr.bounce_count)::numeric / SUM(cr.total_sent), 4)
-                    ELSE NULL
-                END as bounce_pct_7d,
-                COALESCE(SUM(cr.new_leads_reached), 0) as new_leads_reached_7d,
-                MAX(cr.end_date) as most_recent_reporting_end_date
-            FROM clients_local c
-            INNER JOIN client_name_map_local m ON c.client_code = m.client_code
-            LEFT JOIN campaign_reporting_local cr
-                ON m.client_name_norm = cr.client_name_norm
-                AND cr.end_date >= %s
-                AND cr.end_date <= %s
-            GROUP BY m.client_id, c.client_code
-            ON CONFLICT (client_id, period_start_date) DO NOTHING
-        """
-
-        start_date_iso = start_date.isoformat()
-        end_date_iso = end_date.isoformat()
-
-        rowcount = local_db.execute_write(rollup_query, (
-            start_date_iso, end_date_iso, week_num,
-            start_date_iso, end_date_iso
-        ))
-
-        logger.info(f"  Inserted {rowcount} rollup rows for week {week_num}")
-
-        # Fetch and update bookings data for this historical week
-        bookings_data = fetch_bookings_data(start_date, end_date)
-
-        if bookings_data:
-            # Update historical rollups with bookings data
-            for client_code, counts in bookings_data.items():
-                update_query = """
-                    UPDATE client_7d_rollup_historical
-                    SET qualified_7d = %s,
-                        showed_7d = %s,
-                        total_booked_7d = %s
-                    WHERE client_code = %s
-                      AND period_start_date = %s
-                """
-                local_db.execute_write(update_query, (
-                    counts['qualified_7d'],
-                    counts['showed_7d'],
-                    counts['total_booked_7d'],
-                    client_code,
-                    start_date_iso
-                ))
-            logger.info(f"  Updated bookings data for {len(bookings_data)} clients in week {week_num}")
-
-
-    logger.info(f"Historical rollups complete: {len(historical_weeks)} weeks")
-
-
-def compute_historical_dashboard_dataset(local_db: LocalDatabase):
-    """Compute dashboard dataset (with RAG) for each historical week"""
-    logger.info("Computing historical dashboard dataset with RAG...")
-
-    # Clear old historical dashboard data to ensure weeks roll forward correctly
-    logger.info("Clearing existing historical dashboard data...")
-    local_db.execute_write("DELETE FROM client_health_dashboard_historical")
-    logger.info("Cleared all historical dashboard data")
-
-    # Get all weeks that have rollup data
-    weeks_to_compute = local_db.execute_read("""
-        SELECT DISTINCT week_number, period_start_date, period_end_date
-        FROM client_7d_rollup_historical
-        ORDER BY week_number
-    """)
-
-    if not weeks_to_compute:
-        logger.info("No new historical weeks to compute dashboard for")
-        return
-
-    for week_num, start_date, end_date in weeks_to_compute:
-        logger.info(f"Computing dashboard for historical week {week_num}: {start_date} to {end_date}")
-
-        # Calculate sending days for this historical week
-        # Count actual sending days based on weekend_sending_effective setting
-        sending_days_query = """
-            SELECT
-                c.client_id,
+    # Clients that dropped out of a recomputed week (no longer active or mapped)
+    local_db.execute_write("""
+        DELETE FROM client_health_dashboard_historical h
+        WHERE h.period_start_date = ANY(%s)
+          AND NOT EXISTS (
+              SELECT 1
+              FROM client_7d_rollup_historical r
+              INNER JOIN active_clients_v1 a ON a.client_id = r.client_id
+              WHERE r.client_id = h.client_id
+                AND r.period_start_date = h.period_start_date
+          )
+    """, (dirty_starts,))
+
+    logger.info("Computing RAG reasons for historical weeks...")
+    update_reasons_query = """
+        UPDATE client_health_dashboard_historical
+        SET rag_reason = CASE
+            WHEN data_missing_flag THEN
+                'Data missing: no contacted volume in this week'
+            WHEN replies_7d > 0 AND positives_7d = 0 THEN
+                'Critical: zero positive replies from ' || replies_7d || ' replies (positive quality issue)'
+            WHEN reply_rate_7d < 0.015 THEN
+                'Critical: reply rate is ' || ROUND((reply_rate_7d * 100)::numeric, 2) || '%% (below 1.5%%)'
+            WHEN bounce_pct_7d >= 0.04 THEN
+                'Critical: bounce rate is ' || ROUND((bounce_pct_7d * 100)::numeric, 2) || '%% (4%% or higher)'
+            WHEN weekly_target_int IS NOT NULL AND weekly_target_int > 0
+                AND volume_attainment < 0.5 THEN
+                'Critical: volume attainment is ' || ROUND((volume_attainment * 100)::numeric, 1) || '%% (below 50%%)'
+            WHEN reply_rate_7d IS NOT NULL AND reply_rate_7d < 0.02
+                AND replies_7d > 0 AND positives_7d > 0
+                AND (positives_7d::numeric / replies_7d) < 0.05 THEN
+                'Multiple issues: reply rate ' || ROUND((reply_rate_7d * 100)::numeric, 2) || '%%, positive rate ' || ROUND(((positives_7d::numeric / replies_7d) * 100)::numeric, 2) || '%%'
+            WHEN volume_flag AND deliverability_flag THEN
+                'Multiple issues: volume and deliverability concerns'
+            WHEN volume_flag THEN
+                'Volume below target: attainment is ' || ROUND((volume_attainment * 100)::numeric, 1) || '%%'
+            WHEN deliverability_flag THEN
                 CASE
-                    WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN
-                        -- Count all days in the period
-                        (SELECT COUNT(*) FROM generate_series(%s::date, %s::date, INTERVAL '1 day') AS t(day))
-                    ELSE
-                        -- Count only weekdays (Mon-Fri) in the period
-                        (SELECT COUNT(*) FROM generate_series(%s::date, %s::date, INTERVAL '1 day') AS t(day)
-                         WHERE EXTRACT(DOW FROM t.day)::int BETWEEN 1 AND 5)
-                END as sending_days_count
-            FROM clients_local c
-            INNER JOIN client_7d_rollup_historical r ON c.client_id = r.client_id AND r.week_number = %s
-            WHERE EXISTS (
-                SELECT 1 FROM active_clients_v1 a WHERE a.client_id = c.client_id
-            )
-        """
-
-        sending_days_results = local_db.execute_read(sending_days_query, (
-            start_date, end_date,
-            start_date, end_date,
-            week_num
-        ))
-
-        # Build a map of client_id -> sending_days_count
-        sending_days_map = {row[0]: row[1] for row in sending_days_results}
-
-        # Compute dashboard with proper RAG calculation
-        dashboard_insert = """
-            WITH client_sending_days AS (
-                -- Calculate sending days count for each client
-                SELECT
-                    c.client_id,
-                    CASE
-                        WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN
-                            (SELECT COUNT(*) FROM generate_series(%s::date, %s::date, INTERVAL '1 day') AS t(day))
-                        ELSE
-                            (SELECT COUNT(*) FROM generate_series(%s::date, %s::date, INTERVAL '1 day') AS t(day)
-                             WHERE EXTRACT(DOW FROM t.day)::int BETWEEN 1 AND 5)
-                    END as sending_days_count
-                FROM clients_local c
-                INNER JOIN client_7d_rollup_historical r ON c.client_id = r.client_id AND r.week_number = %s
-                WHERE EXISTS (
-                    SELECT 1 FROM active_clients_v1 a WHERE a.client_id = c.client_id
-                )
-            ),
-            metric_rags AS (
-                SELECT
-                    c.client_id,
-                    c.client_code,
-                    c.client_name,
-                    c.client_company_name,
-                    c.relationship_status,
-                    c.assigned_account_manager_name,
-                    c.assigned_inbox_manager_name,
-                    c.assigned_sdr_name,
-                    c.weekly_target_int,
-                    c.weekly_target_missing,
-                    c.closelix,
-                    c.bonus_pool_monthly,
-                    c.monthly_booking_goal,
-                    COALESCE(r.contacted_7d, 0) as contacted_7d,
-                    COALESCE(r.replies_7d, 0) as replies_7d,
-                    COALESCE(r.positives_7d, 0) as positives_7d,
-                    COALESCE(r.bounces_7d, 0) as bounces_7d,
-                    r.reply_rate_7d, r.positive_reply_rate_7d, r.bounce_pct_7d,
-                    COALESCE(r.new_leads_reached_7d, 0) as new_leads_reached_7d,
-                    COALESCE(r.qualified_7d, 0) as qualified_7d,
-                    COALESCE(r.showed_7d, 0) as showed_7d,
-                    COALESCE(r.total_booked_7d, 0) as total_booked_7d,
-                    sd.sending_days_count,
-                    c.weekend_sending_effective,
-                    -- Calculate pro-rated target based on weekend sending settings
-                    CASE
-                        WHEN c.weekly_target_int IS NOT NULL AND c.weekly_target_int > 0 THEN
-                            ROUND(
-                                c.weekly_target_int::numeric *
-                                CASE
-                                    WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN
-                                        1.0 / 7.0
-                                    ELSE
-                                        1.0 / 5.0
-                                END *
-                                sd.sending_days_count, 2
-                            )
-                        ELSE NULL
-                    END as prorated_target,
-                    -- Volume attainment using pro-rated target
-                    CASE
-                        WHEN c.weekly_target_int IS NOT NULL AND c.weekly_target_int > 0 THEN
-                            ROUND(
-                                COALESCE(r.new_leads_reached_7d, 0)::numeric /
-                                (c.weekly_target_int::numeric *
-                                 CASE
-                                     WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN 1.0/7.0
-                                     ELSE 1.0/5.0
-                                 END *
-                                 sd.sending_days_count), 4
-                            )
-                        ELSE NULL
-                    END as volume_attainment,
-                    CASE
-                        WHEN r.positives_7d > 0 THEN
-                            ROUND(COALESCE(r.contacted_7d, 0)::numeric / r.positives_7d, 2)
-                        ELSE NULL
-                    END as pcpl_proxy_7d,
-                    CASE
-                        WHEN r.reply_rate_7d < 0.02 OR r.bounce_pct_7d >= 0.05 THEN TRUE
-                        ELSE FALSE
-                    END as deliverability_flag,
-                    CASE
-                        WHEN c.weekly_target_int IS NOT NULL AND c.weekly_target_int > 0
-                            AND COALESCE(r.new_leads_reached_7d, 0)::numeric /
-                            (c.weekly_target_int::numeric *
-                             CASE
-                                 WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN 1.0/7.0
-                                 ELSE 1.0/5.0
-                             END *
-                             sd.sending_days_count) < 0.8 THEN TRUE
-                        ELSE FALSE
-                    END as volume_flag,
-                    CASE
-                        WHEN r.reply_rate_7d >= 0.02 AND r.positive_reply_rate_7d < 0.05 THEN TRUE
-                        ELSE FALSE
-                    END as mmf_flag,
-                    CASE
-                        WHEN r.contacted_7d IS NULL OR r.contacted_7d = 0 THEN TRUE
-                        ELSE FALSE
-                    END as data_missing_flag,
-                    CASE
-                        WHEN r.most_recent_reporting_end_date < %s::date - 1 THEN TRUE
-                        ELSE FALSE
-                    END as data_stale_flag,
-                    r.most_recent_reporting_end_date,
-                    -- Individual RAG calculations for each metric
-                    -- Reply Rate RAG
-                    CASE
-                        WHEN r.reply_rate_7d IS NULL THEN NULL
-                        WHEN r.reply_rate_7d < 0.015 THEN 'Red'
-                        WHEN r.reply_rate_7d < 0.02 THEN 'Amber'
-                        ELSE 'Green'
-                    END as rr_rag,
-                    -- Positive Reply Rate RAG
-                    CASE
-                        WHEN r.replies_7d IS NULL OR r.replies_7d = 0 THEN NULL
-                        WHEN r.positives_7d = 0 THEN
-                            CASE WHEN r.replies_7d > 0 THEN 'Red' ELSE NULL END
-                        WHEN r.positives_7d IS NULL THEN NULL
-                        WHEN (r.positives_7d::numeric / r.replies_7d) < 0.05 THEN 'Red'
-                        WHEN (r.positives_7d::numeric / r.replies_7d) < 0.08 THEN 'Amber'
-                        ELSE 'Green'
-                    END as prr_rag,
-                    -- PCPL RAG
-                    CASE
-                        WHEN r.positives_7d = 0 THEN 'Red'
-                        WHEN r.positives_7d IS NULL THEN NULL
-                        WHEN COALESCE(r.new_leads_reached_7d, 0)::numeric / r.positives_7d > 800 THEN 'Red'
-                        WHEN COALESCE(r.new_leads_reached_7d, 0)::numeric / r.positives_7d > 500 THEN 'Amber'
-                        ELSE 'Green'
-                    END as pcpl_rag,
-                    -- Bounce Rate RAG
-                    CASE
-                        WHEN r.bounce_pct_7d IS NULL THEN NULL
-                        WHEN r.bounce_pct_7d >= 0.04 THEN 'Red'
-                        WHEN r.bounce_pct_7d >= 0.02 THEN 'Amber'
-                        ELSE 'Green'
-                    END as br_rag,
-                    -- Volume/Target RAG
-                    CASE
-                        WHEN c.weekly_target_int IS NULL OR c.weekly_target_int = 0 THEN NULL
-                        WHEN COALESCE(r.new_leads_reached_7d, 0)::numeric /
-                        (c.weekly_target_int::numeric *
-                         CASE
-                             WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN 1.0/7.0
-                             ELSE 1.0/5.0
-                         END *
-                         sd.sending_days_count) < 0.5 THEN 'Red'
-                        WHEN COALESCE(r.new_leads_reached_7d, 0)::numeric /
-                        (c.weekly_target_int::numeric *
-                         CASE
-                             WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN 1.0/7.0
-                             ELSE 1.0/5.0
-                         END *
-                         sd.sending_days_count) < 0.8 THEN 'Amber'
-                        ELSE 'Green'
-                    END as volume_rag
-                FROM clients_local c
-                INNER JOIN client_sending_days sd ON c.client_id = sd.client_id
-                INNER JOIN client_7d_rollup_historical r ON c.client_id = r.client_id AND r.week_number = %s
-            ),
-            final_metrics AS (
-                SELECT
-                    metric_rags.*,
-                    -- Hybrid RAG Status with majority voting and critical overrides
-                    CASE
-                        -- CRITICAL OVERRIDES: Any of these = Red regardless of votes
-                        WHEN metric_rags.contacted_7d = 0 THEN 'Red'
-                        WHEN metric_rags.reply_rate_7d < 0.015 OR metric_rags.bounce_pct_7d >= 0.04 THEN 'Red'
-                        WHEN metric_rags.weekly_target_int IS NOT NULL AND metric_rags.weekly_target_int > 0
-                            AND metric_rags.prorated_target IS NOT NULL
-                            AND (metric_rags.new_leads_reached_7d::numeric / metric_rags.prorated_target) < 0.5 THEN 'Red'
-
-                        -- Count votes from individual RAGs
-                        WHEN (
-                            (CASE WHEN metric_rags.rr_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Red' THEN 1 ELSE 0 END)
-                        ) >= 3 THEN 'Red'
-
-                        -- 2+ Red = Red
-                        WHEN (
-                            (CASE WHEN metric_rags.rr_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Red' THEN 1 ELSE 0 END)
-                        ) >= 2 AND (
-                            (CASE WHEN metric_rags.rr_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Amber' THEN 1 ELSE 0 END)
-                        ) >= 1 THEN 'Red'
-
-                        -- 3+ Amber = Amber
-                        WHEN (
-                            (CASE WHEN metric_rags.rr_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Amber' THEN 1 ELSE 0 END)
-                        ) >= 3 THEN 'Yellow'
-
-                        -- 4+ Green = Green
-                        WHEN (
-                            (CASE WHEN metric_rags.rr_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Green' THEN 1 ELSE 0 END)
-                        ) >= 4 THEN 'Green'
-
-                        -- 3 Green + 2 Amber = Amber
-                        WHEN (
-                            (CASE WHEN metric_rags.rr_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Green' THEN 1 ELSE 0 END)
-                        ) = 3 AND (
-                            (CASE WHEN metric_rags.rr_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Amber' THEN 1 ELSE 0 END)
-                        ) = 2 THEN 'Yellow'
-
-                        -- 3 Green + (1 Red OR 1 Amber) = Amber
-                        WHEN (
-                            (CASE WHEN metric_rags.rr_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Green' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Green' THEN 1 ELSE 0 END)
-                        ) = 3 AND (
-                            (CASE WHEN metric_rags.rr_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Red' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.rr_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.prr_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.pcpl_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.br_rag = 'Amber' THEN 1 ELSE 0 END) +
-                            (CASE WHEN metric_rags.volume_rag = 'Amber' THEN 1 ELSE 0 END)
-                        ) >= 1 THEN 'Yellow'
-
-                        -- Default conservative: Amber
-                        ELSE 'Yellow'
-                    END as rag_status
-                FROM metric_rags
-            )
-            INSERT INTO client_health_dashboard_historical (
-                client_id, client_code, client_name, client_company_name,
-                relationship_status, assigned_account_manager_name,
-                assigned_inbox_manager_name, assigned_sdr_name,
-                weekly_target_int, weekly_target_missing, closelix,
-                bonus_pool_monthly, weekend_sending_effective, monthly_booking_goal,
-                period_start_date, period_end_date, week_number,
-                contacted_7d, replies_7d, positives_7d, bounces_7d,
-                reply_rate_7d, positive_reply_rate_7d, bounce_pct_7d,
-                new_leads_reached_7d,
-                prorated_target,
-                volume_attainment, pcpl_proxy_7d,
-                not_contacted_leads,
-                qualified_7d, showed_7d, total_booked_7d,
-                deliverability_flag, volume_flag, mmf_flag,
-                data_missing_flag, data_stale_flag,
-                rag_status, rag_reason,
-                most_recent_reporting_end_date
-            )
-            SELECT
-                m.client_id, m.client_code, m.client_name, m.client_company_name,
-                m.relationship_status, m.assigned_account_manager_name,
-                m.assigned_inbox_manager_name, m.assigned_sdr_name,
-                m.weekly_target_int, m.weekly_target_missing, m.closelix,
-                m.bonus_pool_monthly, m.weekend_sending_effective, m.monthly_booking_goal,
-                %s, %s, %s,
-                m.contacted_7d, m.replies_7d, m.positives_7d, m.bounces_7d,
-                m.reply_rate_7d, m.positive_reply_rate_7d, m.bounce_pct_7d,
-                m.new_leads_reached_7d,
-                m.prorated_target,
-                m.volume_attainment, m.pcpl_proxy_7d,
-                COALESCE(c.not_contacted_leads, 0) as not_contacted_leads,
-                m.qualified_7d, m.showed_7d, m.total_booked_7d,
-                m.deliverability_flag, m.volume_flag, m.mmf_flag,
-                m.data_missing_flag, m.data_stale_flag,
-                m.rag_status, NULL as rag_reason,
-                m.most_recent_reporting_end_date
-            FROM final_metrics m
-            LEFT JOIN client_health_dashboard_v1_local c ON m.client_id = c.client_id
-            ON CONFLICT (client_id, period_start_date) DO NOTHING
-        """
-
-        rowcount = local_db.execute_write(dashboard_insert, (
-            start_date, end_date,
-            start_date, end_date,
-            week_num,
-            end_date,
-            week_num,
-            start_date, end_date, week_num
-        ))
-
-        logger.info(f"  Inserted {rowcount} dashboard rows for week {week_num}")
-
-        # Update rag_reason for this week
-        logger.info(f"  Computing RAG reasons for week {week_num}...")
-        update_reasons_query = """
-            UPDATE client_health_dashboard_historical
-            SET rag_reason = CASE
-                WHEN data_missing_flag THEN
-                    'Data missing: no contacted volume in this week'
-                WHEN replies_7d > 0 AND positives_7d = 0 THEN
-                    'Critical: zero positive replies from ' || replies_7d || ' replies (positive quality issue)'
-                WHEN reply_rate_7d < 0.015 THEN
-                    'Critical: reply rate is ' || ROUND((reply_rate_7d * 100)::numeric, 2) || '%% (below 1.5%%)'
-                WHEN bounce_pct_7d >= 0.04 THEN
-                    'Critical: bounce rate is ' || ROUND((bounce_pct_7d * 100)::numeric, 2) || '%% (4%% or higher)'
-                WHEN weekly_target_int IS NOT NULL AND weekly_target_int > 0
-                    AND volume_attainment < 0.5 THEN
-                    'Critical: volume attainment is ' || ROUND((volume_attainment * 100)::numeric, 1) || '%% (below 50%%)'
-                WHEN reply_rate_7d IS NOT NULL AND reply_rate_7d < 0.02
-                    AND replies_7d > 0 AND positives_7d > 0
-                    AND (positives_7d::numeric / replies_7d) < 0.05 THEN
-                    'Multiple issues: reply rate ' || ROUND((reply_rate_7d * 100)::numeric, 2) || '%%, positive rate ' || ROUND(((positives_7d::numeric / replies_7d) * 100)::numeric, 2) || '%%'
-                WHEN volume_flag AND deliverability_flag THEN
-                    'Multiple issues: volume and deliverability concerns'
-                WHEN volume_flag THEN
-                    'Volume below target: attainment is ' || ROUND((volume_attainment * 100)::numeric, 1) || '%%'
-                WHEN deliverability_flag THEN
-                    CASE
-                        WHEN reply_rate_7d < 0.02 THEN
-                            'Deliverability risk: reply rate is ' || ROUND((reply_rate_7d * 100)::numeric, 2) || '%%'
-                        WHEN bounce_pct_7d >= 0.05 THEN
-                            'Deliverability risk: bounce rate is ' || ROUND((bounce_pct_7d * 100)::numeric, 2) || '%%'
-                        ELSE 'Deliverability risk: check reply and bounce rates'
-                    END
-                WHEN replies_7d > 0 AND positives_7d > 0
-                    AND (positives_7d::numeric / replies_7d) < 0.05 THEN
-                    'MMF risk: positive reply rate is ' || ROUND(((positives_7d::numeric / replies_7d) * 100)::numeric, 2) || '%%'
-                WHEN positives_7d > 0
-                    AND (new_leads_reached_7d::numeric / positives_7d) > 800 THEN
-                    'PCPL high: ' || ROUND((new_leads_reached_7d::numeric / positives_7d), 1) || ' leads per positive reply'
-                ELSE 'Performance within acceptable thresholds'
-            END
-            WHERE week_number = %s
-        """
-
-        local_db.execute_write(update_reasons_query, (week_num,))
-        logger.info(f"  Updated RAG reasons for week {week_num}")
+                    WHEN reply_rate_7d < 0.02 THEN
+                        'Deliverability risk: reply rate is ' || ROUND((reply_rate_7d * 100)::numeric, 2) || '%%'
+                    WHEN bounce_pct_7d >= 0.05 THEN
+                        'Deliverability risk: bounce rate is ' || ROUND((bounce_pct_7d * 100)::numeric, 2) || '%%'
+                    ELSE 'Deliverability risk: check reply and bounce rates'
+                END
+            WHEN replies_7d > 0 AND positives_7d > 0
+                AND (positives_7d::numeric / replies_7d) < 0.05 THEN
+                'MMF risk: positive reply rate is ' || ROUND(((positives_7d::numeric / replies_7d) * 100)::numeric, 2) || '%%'
+            WHEN positives_7d > 0
+                AND (new_leads_reached_7d::numeric / positives_7d) > 800 THEN
+                'PCPL high: ' || ROUND((new_leads_reached_7d::numeric / positives_7d), 1) || ' leads per positive reply'
+            ELSE 'Performance within acceptable thresholds'
+        END
+        WHERE period_start_date = ANY(%s)
+    """
 
-    logger.info("Historical dashboard dataset computation complete")
+    rowcount = local_db.execute_write(update_reasons_query, (dirty_starts,))
+    logger.info(f"Updated RAG reasons for {rowcount} historical rows")
 
 
 def compute_dashboard_dataset(local_db: LocalDatabase, days_in_period: int):
@@ -1294,41 +2077,39 @@ def compute_dashboard_dataset(local_db: LocalDatabase, days_in_period: int):
     logger.info("Computing dashboard dataset...")
 
     # Get the actual date range
-    start_date, end_date = get_friday_to_yesterday_range()
+    start_date, end_date = get_friday_to_yesterday_range(local_db)
     start_date_iso = start_date.isoformat()
     end_date_iso = end_date.isoformat()
 
     logger.info(f"Date range for dashboard: {start_date_iso} to {end_date_iso}")
 
-    # Step 1: Preserve not_contacted_leads to temporary table before deleting
-    logger.debug("Preserving not_contacted_leads to temporary table...")
-    local_db.execute_write("""
-        CREATE TEMP TABLE temp_preserved_not_contacted AS
-        SELECT client_id, not_contacted_leads
-        FROM client_health_dashboard_v1_local
-    """)
+    # Step 1: Build the new dataset in a shadow table; the live table stays
+    # readable (and keeps its not_contacted_leads) until the atomic publish
+    shadow = local_db.create_shadow_table('client_health_dashboard_v1_local')
 
-    # Step 2: Clear old dashboard data
-    local_db.execute_write("DELETE FROM client_health_dashboard_v1_local")
-
-    # Step 3: Compute dashboard dataset with hybrid RAG voting system
-    # Uses preserved not_contacted_leads from temporary table
-    dashboard_query = """
-        WITH client_sending_days AS (
+    # Step 2: Compute dashboard dataset with hybrid RAG voting system
+    # Carries not_contacted_leads over from the live table
+    dashboard_query = f"""
+        WITH period_days AS (
+            -- All-days and weekday (Mon-Fri) counts from the calendar prefix counters
+            SELECT
+                ce.day_seq - cs.day_seq + 1 as all_days,
+                ce.weekday_seq - cs.weekday_seq + CASE WHEN cs.is_weekday THEN 1 ELSE 0 END as weekdays
+            FROM calendar_local cs
+            INNER JOIN calendar_local ce ON ce.day = %s::date
+            WHERE cs.day = %s::date
+        ),
+        client_sending_days AS (
             -- Calculate sending days count for each client
             SELECT
                 c.client_id,
                 CASE
-                    WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN
-                        -- Count all days in the period
-                        (SELECT COUNT(*) FROM generate_series(%s::date, %s::date, INTERVAL '1 day') AS t(day))
-                    ELSE
-                        -- Count only weekdays (Mon-Fri) in the period
-                        (SELECT COUNT(*) FROM generate_series(%s::date, %s::date, INTERVAL '1 day') AS t(day)
-                         WHERE EXTRACT(DOW FROM t.day)::int BETWEEN 1 AND 5)
+                    WHEN COALESCE(c.weekend_sending_effective, FALSE) = TRUE THEN pd.all_days
+                    ELSE pd.weekdays
                 END as sending_days_count
             FROM active_clients_v1 c
-            GROUP BY c.client_id, c.weekend_sending_effective
+            CROSS JOIN period_days pd
+            GROUP BY c.client_id, c.weekend_sending_effective, pd.all_days, pd.weekdays
         ),
         metric_rags AS (
             SELECT
@@ -1571,7 +2352,7 @@ def compute_dashboard_dataset(local_db: LocalDatabase, days_in_period: int):
                 END as rag_status
             FROM metric_rags
         )
-        INSERT INTO client_health_dashboard_v1_local (
+        INSERT INTO {shadow} (
             client_id, client_code, client_name, client_company_name,
             relationship_status, assigned_account_manager_name,
             assigned_inbox_manager_name, assigned_sdr_name,
@@ -1611,22 +2392,18 @@ def compute_dashboard_dataset(local_db: LocalDatabase, days_in_period: int):
             m.monthly_booking_goal,
             m.qualified_7d, m.showed_7d, m.total_booked_7d
         FROM final_metrics m
-        LEFT JOIN temp_preserved_not_contacted t ON m.client_id = t.client_id
+        LEFT JOIN client_health_dashboard_v1_local t ON m.client_id = t.client_id
     """
 
     # Execute query with start_date and end_date parameters for sending_days_count calculation
     rowcount = local_db.execute_write(dashboard_query, (
-        start_date_iso, end_date_iso,  # sending_days_count for weekend_sending=TRUE (all days)
-        start_date_iso, end_date_iso,  # sending_days_count for weekend_sending=FALSE (weekdays only)
+        end_date_iso, start_date_iso,  # calendar_local prefix counters for the period
     ))
     logger.info(f"Computed {rowcount} dashboard rows with pro-rated targets (period: {start_date_iso} to {end_date_iso}, sending-days-aware calculation enabled)")
 
-    # Clean up temporary table
-    local_db.execute_write("DROP TABLE IF EXISTS temp_preserved_not_contacted")
-
-    # Update rag_reason based on hybrid voting system
-    update_reasons_query = """
-        UPDATE client_health_dashboard_v1_local
+    # Step 3: Update rag_reason based on hybrid voting system (still in the shadow)
+    update_reasons_query = f"""
+        UPDATE {shadow}
         SET rag_reason = CASE
             WHEN data_missing_flag THEN
                 'Data missing: no contacted volume in last 7 days'
@@ -1668,6 +2445,9 @@ def compute_dashboard_dataset(local_db: LocalDatabase, days_in_period: int):
     local_db.execute_write(update_reasons_query)
     logger.info("Updated RAG reasons")
 
+    # Step 4: Swap the complete snapshot in
+    local_db.publish_shadow_table('client_health_dashboard_v1_local')
+
 
 def track_unmatched_mappings(local_db: LocalDatabase):
     """Track unmatched clients and reporting rows for visibility"""
@@ -1748,14 +2528,28 @@ def main():
         local_db = LocalDatabase(os.getenv('LOCAL_DB_URL'))
         local_db.connect()
 
-        # Execute ingestion pipeline
-        ingest_clients(clients_db, local_db)
-        ingest_campaign_reporting(
-            reporting_db,
-            local_db,
-            days_back=int(os.getenv('INGEST_DAYS_BACK', 30))
-        )
-        build_client_mapping(local_db)
+        # Make sure the calendar covers today (and well beyond) before any date math
+        refresh_calendar(local_db)
+
+        # Execute ingestion pipeline. Each stage is one transaction, so a
+        # failure leaves the previous stage's tables untouched. Derived stages
+        # (rebuildable from source) commit with synchronous_commit off.
+        with local_db.transaction('client ingest'):
+            ingest_clients(clients_db, local_db, full_resync=args.full_resync)
+        with local_db.transaction('campaign reporting ingest'):
+            ingest_campaign_reporting(
+                reporting_db,
+                local_db,
+                days_back=int(os.getenv('INGEST_DAYS_BACK', 30)),
+                full_resync=args.full_resync
+            )
+        with local_db.transaction('client mapping and daily metrics', synchronous_commit=False):
+            build_client_mapping(local_db)
+            refresh_client_daily_metrics(
+                local_db,
+                days_back=int(os.getenv('INGEST_DAYS_BACK', 30)),
+                full_rebuild=args.full_resync
+            )
 
         # Fetch and update not contacted leads from SmartLead API
         # Run FIRST to ensure both current and historical dashboards have the data
@@ -1765,25 +2559,57 @@ def main():
             logger.info("Existing not_contacted_leads values will be preserved")
         else:
             logger.info("Starting SmartLead not contacted leads integration...")
-            not_contacted_map = fetch_not_contacted_leads_from_smartlead()
+            # Not in a transaction: per-campaign checkpoints must commit as they go
+            not_contacted_map = fetch_not_contacted_leads_from_smartlead(
+                local_db,
+                use_cache=not args.full_resync,
+                resume=args.resume
+            )
             if not_contacted_map:
-                update_not_contacted_leads(local_db, not_contacted_map)
+                with local_db.transaction('not contacted leads update'):
+                    update_not_contacted_leads(local_db, not_contacted_map)
             else:
                 logger.warning("No not_contacted data fetched from SmartLead, all clients will show 0")
 
-        days_in_period = compute_7d_rollups(local_db)
-        compute_dashboard_dataset(local_db, days_in_period)
-
-        # Compute historical rollups for last 4 completed weeks
-        compute_historical_rollups(local_db)
-        compute_historical_dashboard_dataset(local_db)
-
-        track_unmatched_mappings(local_db)
-
-        # Close connections
+        # Completed weeks kept in history; only new or changed ones are recomputed
+        historical_weeks = get_historical_weeks(local_db, num_weeks=HISTORICAL_WEEKS_DEPTH)
+        warn_uncovered_historical_weeks(local_db, historical_weeks)
+        if args.full_resync:
+            dirty_weeks = historical_weeks
+        else:
+            dirty_weeks = get_dirty_historical_weeks(local_db, historical_weeks)
+
+        # Aggregate the current window and the dirty weeks in one pass;
+        # bookings are staged for every kept week
+        with local_db.transaction('window rollups', synchronous_commit=False):
+            compute_window_rollups(local_db, get_rollup_windows(local_db, dirty_weeks))
+            stage_window_bookings(local_db, get_rollup_windows(local_db, historical_weeks))
+
+        # Shadow tables are published at the end of their own stage, so the
+        # rename locks are held only until that stage commits
+        with local_db.transaction('7-day rollups', synchronous_commit=False):
+            days_in_period = compute_7d_rollups(local_db)
+        with local_db.transaction('dashboard dataset', synchronous_commit=False):
+            compute_dashboard_dataset(local_db, days_in_period)
+
+        with local_db.transaction('historical rollups and dashboard', synchronous_commit=False):
+            compute_historical_rollups(local_db, dirty_weeks, historical_weeks)
+            compute_historical_dashboard_dataset(local_db, dirty_weeks, historical_weeks)
+
+            # Diagnostics only: a failed report rolls back to its savepoint
+            # and the historical weeks still commit
+            try:
+                with local_db.transaction('unmatched mappings report'):
+                    track_unmatched_mappings(local_db)
+            except Exception as e:
+                logger.warning(f"Unmatched mappings report failed, continuing: {e}")
+
+        # Return connections to their pools
         clients_db.close()
         reporting_db.close()
         local_db.close()
+        log_pool_stats()
+        log_query_stats()
 
         logger.info("=" * 60)
         if args.skip_smartlead:
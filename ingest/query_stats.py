@@ -0,0 +1,240 @@
+"""
+Statement timing and slow-query capture for the database layer
+
+Every pooled connection uses InstrumentedCursor, so each statement sent
+through ReadOnlyConnection or LocalDatabase is timed and counted under a
+short label. The label defaults to "<calling function>.<verb>" (e.g.
+compute_dashboard_dataset.insert) and can be set explicitly with
+query_label(). log_query_stats() logs the per-run ranking by total time.
+
+Statements slower than SLOW_QUERY_SECONDS are re-run once under
+EXPLAIN (ANALYZE, BUFFERS) and the plan is appended to SLOW_QUERY_LOG.
+Writes are explained inside a savepoint that is rolled back, so the
+re-run leaves no trace; statements that cannot be explained (DDL, COPY,
+multi-statement batches such as execute_pipelined pages) are only timed.
+"""
+import os
+import re
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+import psycopg2
+from psycopg2 import sql
+
+logger = logging.getLogger(__name__)
+
+# Statements at least this slow get an EXPLAIN (ANALYZE, BUFFERS) captured ('0' = off)
+SLOW_QUERY_SECONDS = float(os.getenv('SLOW_QUERY_SECONDS', '10') or 0)
+SLOW_QUERY_LOG = os.getenv(
+    'SLOW_QUERY_LOG',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'slow_queries.log')
+)
+
+# Rows in the per-run summary
+QUERY_STATS_TOP = int(os.getenv('QUERY_STATS_TOP', '25'))
+
+# Frames in these files are skipped when deriving a default label
+_DB_LAYER_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database.py'),
+}
+_SKIPPED_PACKAGES = (os.sep + 'psycopg2' + os.sep, os.sep + 'contextlib.py')
+
+_EXPLAINABLE = {'select', 'insert', 'update', 'delete', 'with', 'execute', 'values'}
+_WRITE_VERB = re.compile(r'\b(insert|update|delete)\b', re.IGNORECASE)
+_LEADING_COMMENTS = re.compile(r'^(\s+|--[^\n]*\n?|/\*.*?\*/)+', re.DOTALL)
+
+_label: ContextVar[Optional[str]] = ContextVar('query_label', default=None)
+
+
+@dataclass
+class QueryStats:
+    """Accumulated timings of one statement label"""
+    label: str
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    rows: int = 0
+    slow: int = 0
+
+
+_stats: Dict[str, QueryStats] = {}
+_stats_lock = threading.Lock()
+_slow_log_lock = threading.Lock()
+
+
+@contextmanager
+def query_label(label: str) -> Iterator[None]:
+    """Record every statement sent inside the block under label"""
+    token = _label.set(label)
+    try:
+        yield
+    finally:
+        _label.reset(token)
+
+
+def _statement_verb(query: str) -> str:
+    """First keyword of a statement (the main verb for a WITH ... INSERT/UPDATE/DELETE)"""
+    body = _LEADING_COMMENTS.sub('', query)
+    verb = body.split(None, 1)[0].lower() if body.strip() else 'empty'
+    if verb == 'with':
+        write = _WRITE_VERB.search(body)
+        if write:
+            return write.group(1).lower()
+    return verb.rstrip(';')
+
+
+def default_label(query: str) -> str:
+    """<first caller outside the database layer>.<statement verb>"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if os.path.abspath(filename) not in _DB_LAYER_FILES and not any(part in filename for part in _SKIPPED_PACKAGES):
+            break
+        frame = frame.f_back
+    caller = frame.f_code.co_name if frame is not None else 'unknown'
+    return f"{caller}.{_statement_verb(query)}"
+
+
+def statement_label(query: str) -> str:
+    """The label set by query_label(), else the default for this call site"""
+    return _label.get() or default_label(query)
+
+
+def record_query(label: str, seconds: float, rows: int, slow: bool = False):
+    """Add one statement execution to the run's totals"""
+    with _stats_lock:
+        stats = _stats.get(label)
+        if stats is None:
+            stats = _stats[label] = QueryStats(label)
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        stats.rows += max(rows, 0)
+        stats.slow += int(slow)
+
+
+def query_stats() -> list:
+    """Statement totals of this run, slowest (by total time) first"""
+    with _stats_lock:
+        return sorted(_stats.values(), key=lambda stats: stats.seconds, reverse=True)
+
+
+def log_query_stats(top: int = QUERY_STATS_TOP):
+    """Log the statements that took the most total time in this run"""
+    ranked = query_stats()
+    if not ranked:
+        return
+    total = sum(stats.seconds for stats in ranked)
+    logger.info(f"Query time by statement ({len(ranked)} labels, {total:.2f}s total):")
+    for stats in ranked[:top]:
+        share = stats.seconds / total * 100 if total else 0.0
+        logger.info(
+            f"  {stats.seconds:8.2f}s {share:5.1f}%  {stats.calls:6d} calls  max {stats.max_seconds:7.2f}s  "
+            f"{stats.rows:9d} rows  {stats.label}" + (f"  ({stats.slow} slow)" if stats.slow else "")
+        )
+    if any(stats.slow for stats in ranked):
+        logger.info(f"Slow query plans written to {SLOW_QUERY_LOG}")
+
+
+def _as_text(cursor, query) -> str:
+    if isinstance(query, sql.Composable):
+        return query.as_string(cursor.connection)
+    if isinstance(query, bytes):
+        return query.decode()
+    return query
+
+
+def _explain(cursor, label: str, query: str, seconds: float, rows: int):
+    """Capture EXPLAIN (ANALYZE, BUFFERS) of a slow statement to SLOW_QUERY_LOG"""
+    conn = cursor.connection
+    verb = _statement_verb(query)
+    if verb not in _EXPLAINABLE:
+        return
+    from database import _single_statement_problem  # database imports this module
+    if _single_statement_problem(query):
+        # EXPLAIN covers only the first statement of a batch (execute_pipelined
+        # pages), and the rest would really run again
+        return
+    is_write = verb != 'select' or _WRITE_VERB.search(query) is not None
+    if conn.autocommit and is_write:
+        # No transaction to roll the re-run back in (read-only sources only send SELECTs)
+        return
+
+    savepoint = not conn.autocommit
+    try:
+        with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+            if savepoint:
+                cur.execute("SAVEPOINT slow_query_explain")
+            try:
+                cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query.strip().rstrip(';')}")
+                plan = '\n'.join(row[0] for row in cur.fetchall())
+            finally:
+                if savepoint:
+                    cur.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                    cur.execute("RELEASE SAVEPOINT slow_query_explain")
+    except psycopg2.Error as e:
+        logger.warning(f"Could not explain slow query {label}: {e}")
+        return
+
+    entry = (
+        f"=== {datetime.now().isoformat(timespec='seconds')}  {label}  "
+        f"db={conn.info.dbname}  {seconds:.2f}s  {rows} rows\n"
+        f"{query.strip()}\n\n{plan}\n\n"
+    )
+    try:
+        with _slow_log_lock:
+            os.makedirs(os.path.dirname(SLOW_QUERY_LOG), exist_ok=True)
+            with open(SLOW_QUERY_LOG, 'a') as f:
+                f.write(entry)
+    except OSError as e:
+        logger.warning(f"Could not write slow query log {SLOW_QUERY_LOG}: {e}")
+        return
+    logger.warning(f"Slow query {label} took {seconds:.2f}s, plan written to {SLOW_QUERY_LOG}")
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Cursor that times each statement and records it under its label"""
+
+    def execute(self, query, vars=None):
+        if self.name is not None:
+            # Server-side cursors are timed across their fetches by the caller
+            return super().execute(query, vars)
+        text = _as_text(self, query)
+        label = statement_label(text)
+        start = time.monotonic()
+        try:
+            result = super().execute(query, vars)
+        except BaseException:
+            record_query(label, time.monotonic() - start, 0)
+            raise
+
+        seconds = time.monotonic() - start
+        slow = bool(SLOW_QUERY_SECONDS) and seconds >= SLOW_QUERY_SECONDS
+        record_query(label, seconds, self.rowcount, slow)
+        if slow:
+            bound = self.mogrify(text, vars).decode() if vars is not None else text
+            _explain(self, label, bound, seconds, self.rowcount)
+        return result
+
+    def executemany(self, query, vars_list):
+        label = statement_label(_as_text(self, query))
+        start = time.monotonic()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            record_query(label, time.monotonic() - start, self.rowcount)
+
+    def copy_expert(self, query, file, size=8192):
+        label = statement_label(_as_text(self, query))
+        start = time.monotonic()
+        try:
+            return super().copy_expert(query, file, size)
+        finally:
+            record_query(label, time.monotonic() - start, self.rowcount)
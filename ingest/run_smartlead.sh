@@ -9,6 +9,9 @@
 # - Detects if previous day's run failed
 # - Automatic backfill for missed days
 # - Sends notifications on failures (optional)
+# - Per-campaign counts are checkpointed in smartlead_campaign_counts; backfills
+#   and retries after a failed run pass --resume, so campaigns already counted
+#   in the current run window are not recounted
 #
 # Cron: 0 3 * * * /home/ubuntu/client-health-dashboard/ingest/run_smartlead.sh
 #
@@ -20,8 +23,8 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_DIR="/home/ubuntu/client-health-dashboard"
 VENV_PYTHON="${PROJECT_DIR}/venv/bin/python"
 MAIN_SCRIPT="${PROJECT_DIR}/ingest/ingest_main.py"
-STATE_FILE="/tmp/smartlead_not_contacted_state.json"
 LOG_DIR="${PROJECT_DIR}/logs"
+STATE_FILE="${LOG_DIR}/smartlead_not_contacted_state.json"
 LOG_FILE="${LOG_DIR}/smartlead_not_contacted.log"
 
 # SmartLead script location (for backfill)
@@ -97,6 +100,12 @@ check_log_exists() {
 run_smartlead_fetch() {
     local target_date="$1"
     local is_backfill="$2"
+    local resume="$3"
+    local extra_args=()
+
+    if [ "${is_backfill}" = "true" ] || [ "${resume}" = "true" ]; then
+        extra_args+=(--resume)
+    fi
 
     log "========================================"
     if [ "${is_backfill}" = "true" ]; then
@@ -109,7 +118,8 @@ run_smartlead_fetch() {
     # Run the main ingest script (which includes SmartLead fetch)
     # Using --skip-smartlead would skip the SmartLead fetch, but we WANT it
     # So we run without --skip-smartlead
-    if "${VENV_PYTHON}" "${MAIN_SCRIPT}" 2>&1 | tee -a "${LOG_FILE}"; then
+    # Backfills resume from the checkpoint, recounting only what is missing
+    if "${VENV_PYTHON}" "${MAIN_SCRIPT}" "${extra_args[@]}" 2>&1 | tee -a "${LOG_FILE}"; then
         log "SUCCESS: SmartLead fetch completed for ${target_date}"
         return 0
     else
@@ -148,7 +158,7 @@ check_and_backfill() {
             local backfill_date=$(date -d "${today} - ${i} days" '+%Y-%m-%d')
             log "Backfilling date: ${backfill_date}"
 
-            if run_smartlead_fetch "${backfill_date}" "true"; then
+            if run_smartlead_fetch "${backfill_date}" "true" "true"; then
                 log "Backfill successful for ${backfill_date}"
             else
                 log "WARNING: Backfill failed for ${backfill_date}, continuing to next..."
@@ -193,16 +203,18 @@ today=$(get_today)
 yesterday=$(get_yesterday)
 
 # Check if previous run failed
+RESUME="false"
 if [ "${LAST_RUN_STATUS}" = "failed" ]; then
     log "WARNING: Previous run failed, will attempt backfill"
     check_and_backfill "${LAST_SUCCESS_DATE}"
+    RESUME="true"
 fi
 
 # Run today's fetch
 log "Running today's SmartLead fetch (target: ${yesterday} data)"
 
 EXIT_CODE=0
-if run_smartlead_fetch "${yesterday}" "false"; then
+if run_smartlead_fetch "${yesterday}" "false" "${RESUME}"; then
     log "Today's scheduled run completed successfully"
     LAST_SUCCESS_DATE="${today}"
     LAST_RUN_STATUS="success"
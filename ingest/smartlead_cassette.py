@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+SmartLead API cassettes: record live responses once, replay them offline
+
+A cassette is a gzip-compressed JSON-lines file with one recorded response
+per line, indexed on load by method, URL path and query parameters
+(api_key excluded). Replay serves responses from that index with simulated
+latency, injected 5xx errors, 429 throttling and an optional in-flight
+limit, so concurrency, pagination and memory behaviour can be benchmarked
+deterministically without touching the live API.
+
+Enable with environment variables:
+    SMARTLEAD_CASSETTE=/path/to/smartlead.jsonl.gz
+    SMARTLEAD_CASSETTE_MODE=record|replay (default replay)
+
+Replay simulation (all optional):
+    SMARTLEAD_REPLAY_LATENCY        - median latency in seconds (default 0)
+    SMARTLEAD_REPLAY_LATENCY_SIGMA  - lognormal spread of the latency (default 0.5)
+    SMARTLEAD_REPLAY_ERROR_RATE     - fraction of requests answered 503 (default 0)
+    SMARTLEAD_REPLAY_429_RATE       - fraction of requests answered 429 (default 0)
+    SMARTLEAD_REPLAY_RETRY_AFTER    - Retry-After sent with injected 429s (default 1)
+    SMARTLEAD_REPLAY_MAX_INFLIGHT   - answer 429 above this many concurrent requests (0 = no limit)
+    SMARTLEAD_REPLAY_SEED           - random seed for latency and injected errors (default 0)
+
+Only final responses are recorded: 429/5xx answers are not, since replay
+injects those at the configured rates.
+
+Usage:
+    SMARTLEAD_CASSETTE=smartlead.jsonl.gz SMARTLEAD_CASSETTE_MODE=record python consolidate_leads_by_client.py
+    SMARTLEAD_CASSETTE=smartlead.jsonl.gz SMARTLEAD_REPLAY_LATENCY=0.2 python consolidate_leads_by_client.py
+"""
+
+import os
+import gzip
+import json
+import math
+import time
+import zlib
+import atexit
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+
+CASSETTE_PATH = os.environ.get('SMARTLEAD_CASSETTE', '')
+CASSETTE_MODE = os.environ.get('SMARTLEAD_CASSETTE_MODE', 'replay')
+
+# Responses replay injects itself rather than recording
+SIMULATED_STATUSES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class ReplayProfile:
+    """How replayed responses are delayed and disturbed"""
+    latency: float = 0.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    rate_429: float = 0.0
+    retry_after: str = '1'
+    max_inflight: int = 0
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "ReplayProfile":
+        return cls(
+            latency=float(os.environ.get('SMARTLEAD_REPLAY_LATENCY', '0')),
+            latency_sigma=float(os.environ.get('SMARTLEAD_REPLAY_LATENCY_SIGMA', '0.5')),
+            error_rate=float(os.environ.get('SMARTLEAD_REPLAY_ERROR_RATE', '0')),
+            rate_429=float(os.environ.get('SMARTLEAD_REPLAY_429_RATE', '0')),
+            retry_after=os.environ.get('SMARTLEAD_REPLAY_RETRY_AFTER', '1'),
+            max_inflight=int(os.environ.get('SMARTLEAD_REPLAY_MAX_INFLIGHT', '0')),
+            seed=int(os.environ.get('SMARTLEAD_REPLAY_SEED', '0')),
+        )
+
+
+@dataclass
+class ReplayOutcome:
+    """What one replayed request does: wait delay seconds, then answer"""
+    delay: float
+    status: int
+    body: bytes
+    headers: Dict[str, str]
+
+
+def request_key(method: str, url: str, params: Optional[Dict] = None) -> str:
+    """
+    Cassette index key: method, URL path and sorted query parameters
+
+    The host is left out, so a cassette recorded against one base URL
+    replays against another. api_key is never part of the key (or the file).
+    """
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != 'api_key']
+    query += [(k, str(v)) for k, v in (params or {}).items() if k != 'api_key']
+    return f"{method.upper()} {parts.path}?{urlencode(sorted(query))}"
+
+
+class Cassette:
+    """
+    Recorded SmartLead responses, thread-safe for both engines
+
+    In record mode responses are appended to the file as they arrive. In
+    replay mode the file is loaded into an index of zlib-compressed bodies;
+    a key recorded more than once replays its responses in order, repeating
+    the last one.
+    """
+
+    def __init__(self, path: str, mode: str = 'replay', profile: Optional[ReplayProfile] = None):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.profile = profile or ReplayProfile()
+        self._lock = threading.Lock()
+        self._random = random.Random(self.profile.seed)
+        self._index: Dict[str, List[Tuple[int, bytes]]] = {}
+        self._served: Dict[str, int] = {}
+        self._inflight = 0
+        self._file = None
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self.injected = 0
+
+        if mode == 'record':
+            self._file = gzip.open(path, 'at', encoding='utf-8')
+        else:
+            self._load()
+
+    def _load(self) -> None:
+        entries = 0
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    entry = json.loads(line)
+                    body = zlib.compress(entry['body'].encode('utf-8'))
+                    self._index.setdefault(entry['key'], []).append((entry['status'], body))
+                    entries += 1
+        except (EOFError, gzip.BadGzipFile, json.JSONDecodeError):
+            # A recording cut short keeps every complete line before the break
+            print(f"⚠ Cassette {self.path} is truncated, replaying the {entries} complete entries")
+
+        print(f"✓ Replaying {entries} recorded responses ({len(self._index)} requests) from {self.path}")
+
+    def record(self, key: str, status: int, body: bytes) -> None:
+        """Append a live response (throttles and 5xx are skipped)"""
+        if status in SIMULATED_STATUSES:
+            return
+        line = json.dumps({'key': key, 'status': status, 'body': body.decode('utf-8', 'replace')})
+        with self._lock:
+            self._file.write(line + '\n')
+            self.recorded += 1
+
+    def begin(self, key: str) -> ReplayOutcome:
+        """
+        Start replaying a request: pick its latency and response
+
+        Must be paired with end() once the simulated request finishes.
+        """
+        profile = self.profile
+        with self._lock:
+            self._inflight += 1
+            roll = self._random.random()
+            delay = profile.latency * math.exp(self._random.gauss(0, profile.latency_sigma)) if profile.latency else 0.0
+
+            throttled = bool(profile.max_inflight) and self._inflight > profile.max_inflight
+            if throttled or roll < profile.rate_429:
+                self.injected += 1
+                return ReplayOutcome(delay, 429, b'{"error": "Rate limit exceeded"}', {'Retry-After': profile.retry_after})
+            if roll < profile.rate_429 + profile.error_rate:
+                self.injected += 1
+                return ReplayOutcome(delay, 503, b'{"error": "Service unavailable"}', {})
+
+            responses = self._index.get(key)
+            if not responses:
+                self.misses += 1
+                return ReplayOutcome(delay, 404, b'{"error": "Not recorded in cassette"}', {})
+
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            self.replayed += 1
+            status, body = responses[min(served, len(responses) - 1)]
+            return ReplayOutcome(delay, status, zlib.decompress(body), {})
+
+    def end(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    def summary(self) -> str:
+        if self.mode == 'record':
+            return f"cassette {self.path}: recorded {self.recorded} responses"
+        return (f"cassette {self.path}: replayed {self.replayed}, injected {self.injected} "
+                f"errors/throttles, {self.misses} not recorded")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The process-wide cassette configured by SMARTLEAD_CASSETTE, or None"""
+    global _cassette
+    if not CASSETTE_PATH:
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(CASSETTE_PATH, CASSETTE_MODE, ReplayProfile.from_env())
+            atexit.register(_cassette.close)
+        return _cassette
+
+
+def _timeout_seconds(timeout) -> Optional[float]:
+    """requests timeouts may be (connect, read) tuples"""
+    if isinstance(timeout, tuple):
+        return sum(t for t in timeout if t is not None) or None
+    return timeout
+
+
+# ============================================================================
+# REQUESTS TRANSPORT (thread engine)
+# ============================================================================
+
+class CassetteAdapter(HTTPAdapter):
+    """HTTPAdapter that records live responses or serves them from a cassette"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = request_key(request.method, request.url)
+
+        if self.cassette.mode == 'record':
+            response = super().send(request, stream=False, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+            self.cassette.record(key, response.status_code, response.content)
+            return response
+
+        outcome = self.cassette.begin(key)
+        try:
+            seconds = _timeout_seconds(timeout)
+            if seconds is not None and outcome.delay > seconds:
+                time.sleep(seconds)
+                raise requests.exceptions.ReadTimeout(f"Replayed request timed out after {seconds}s", request=request)
+            time.sleep(outcome.delay)
+        finally:
+            self.cassette.end()
+
+        response = requests.Response()
+        response.status_code = outcome.status
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json', **outcome.headers})
+        response._content = outcome.body
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+# ============================================================================
+# AIOHTTP TRANSPORT (async engine)
+# ============================================================================
+
+class CassetteResponse:
+    """The subset of aiohttp.ClientResponse make_api_request_async uses"""
+
+    def __init__(self, method: str, url: str, status: int, body: bytes, headers: Dict[str, str]):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def json(self, content_type=None):
+        return json.loads(self._body)
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            url = URL(self.url)
+            request_info = aiohttp.RequestInfo(url, self.method, {}, url)
+            raise aiohttp.ClientResponseError(request_info, (), status=self.status, message=f"HTTP {self.status}")
+
+    async def __aenter__(self) -> "CassetteResponse":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+class CassetteAsyncSession:
+    """
+    Stands in for the shared aiohttp.ClientSession: records through the
+    wrapped session, or replays without any network access
+    """
+
+    def __init__(self, cassette: Cassette, session: Optional["aiohttp.ClientSession"] = None):
+        self.cassette = cassette
+        self.session = session
+
+    def request(self, method: str, url: str, params: Optional[Dict] = None, timeout=None):
+        return _AsyncRequest(self, method, url, params, timeout)
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+    async def __aenter__(self) -> "CassetteAsyncSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+class _AsyncRequest:
+    """Async context manager returned by CassetteAsyncSession.request"""
+
+    def __init__(self, owner: CassetteAsyncSession, method: str, url: str, params: Optional[Dict], timeout):
+        self.owner = owner
+        self.method = method
+        self.url = url
+        self.params = params
+        self.timeout = timeout
+
+    async def __aenter__(self) -> CassetteResponse:
+        cassette = self.owner.cassette
+        key = request_key(self.method, self.url, self.params)
+
+        if cassette.mode == 'record':
+            async with self.owner.session.request(
+                self.method, self.url, params=self.params, timeout=self.timeout
+            ) as response:
+                body = await response.read()
+                cassette.record(key, response.status, body)
+                return CassetteResponse(self.method, self.url, response.status, body, dict(response.headers))
+
+        outcome = cassette.begin(key)
+        try:
+            seconds = getattr(self.timeout, 'total', None)
+            if seconds is not None and outcome.delay > seconds:
+                await asyncio.sleep(seconds)
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(outcome.delay)
+        finally:
+            cassette.end()
+
+        return CassetteResponse(self.method, self.url, outcome.status, outcome.body, outcome.headers)
+
+    async def __aexit__(self, *exc) -> None:
+        return None
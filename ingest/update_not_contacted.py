@@ -14,10 +14,11 @@ def main():
 
     print('Connecting to local database...')
     local_db = LocalDatabase(conn_url)
+    local_db.connect()
 
     try:
         print('Fetching not contacted leads from SmartLead API...')
-        not_contacted_map = fetch_not_contacted_leads_from_smartlead()
+        not_contacted_map = fetch_not_contacted_leads_from_smartlead(local_db)
         print(f'Fetched data for {len(not_contacted_map)} clients')
 
         print('Updating dashboard with not_contacted_leads...')
@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 """Quick sync: Just clients + dashboard computation"""
+import os
 import sys
-sys.path.insert(0, '/home/ubuntu/client-health-dashboard')
 
-from ingest.ingest_main import (
-    get_read_only_connection,
-    LocalDatabase,
+# Add ingest directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ingest'))
+
+from database import ReadOnlyConnection, LocalDatabase, log_pool_stats
+from query_stats import log_query_stats
+from ingest_main import (
     ingest_clients,
+    get_rollup_windows,
+    compute_window_rollups,
+    stage_window_bookings,
     compute_7d_rollups,
     compute_dashboard_dataset
 )
@@ -14,25 +20,32 @@ from ingest.ingest_main import (
 def main():
     print("Starting quick sync...")
 
-    # Initialize connections
-    clients_db = get_read_only_connection('clients')
-    reporting_db = get_read_only_connection('reporting')
-    local_db = LocalDatabase()
+    # Initialize connections (pooled, shared with any helper that needs them)
+    clients_db = ReadOnlyConnection(os.getenv('CLIENTS_DB_URL'), "Clients DB")
+    clients_db.connect()
+    local_db = LocalDatabase(os.getenv('LOCAL_DB_URL'))
+    local_db.connect()
 
     try:
         # 1. Sync clients (includes monthly_booking_goal)
         print("\n1. Syncing clients from Supabase...")
-        ingest_clients(clients_db, local_db)
+        with local_db.transaction('client ingest'):
+            ingest_clients(clients_db, local_db)
         print("✓ Clients synced")
 
         # 2. Compute 7-day rollups
         print("\n2. Computing 7-day rollups...")
-        days_in_period = compute_7d_rollups(local_db)
+        current_window = get_rollup_windows(local_db, [])
+        with local_db.transaction('7-day rollups', synchronous_commit=False):
+            compute_window_rollups(local_db, current_window)
+            stage_window_bookings(local_db, current_window)
+            days_in_period = compute_7d_rollups(local_db)
         print("✓ Rollups computed")
 
         # 3. Compute dashboard dataset
         print("\n3. Computing dashboard dataset...")
-        compute_dashboard_dataset(local_db, days_in_period)
+        with local_db.transaction('dashboard dataset', synchronous_commit=False):
+            compute_dashboard_dataset(local_db, days_in_period)
         print("✓ Dashboard computed")
 
         print("\n✅ Quick sync completed successfully!")
@@ -40,8 +53,9 @@ def main():
 
     finally:
         clients_db.close()
-        reporting_db.close()
         local_db.close()
+        log_pool_stats()
+        log_query_stats()
 
 if __name__ == "__main__":
     main()
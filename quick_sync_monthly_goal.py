@@ -1,66 +1,47 @@
 #!/usr/bin/env python3
 """Quick sync monthly_booking_goal only"""
-import psycopg2
-from psycopg2.extras import RealDictCursor
 import os
+import sys
 
-# Connection parameters
-SUPABASE_HOST = os.getenv('SUPABASE_DB_HOST')
-LOCAL_DB = "client_health_dashboard_v1"
-READ_ONLY_PASSWORD = os.getenv('READ_ONLY_DB_PASSWORD')
+# Add ingest directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ingest'))
+
+from database import ReadOnlyConnection, LocalDatabase, log_pool_stats
+from query_stats import log_query_stats
 
 def main():
     print("Quick sync: Fetching monthly_booking_goal from Supabase...")
 
-    # Connect to Supabase (READ-ONLY)
-    supabase_conn = psycopg2.connect(
-        host=SUPABASE_HOST,
-        port=5432,
-        database='postgres',
-        user='postgres',
-        password=READ_ONLY_PASSWORD,
-        cursor_factory=RealDictCursor
-    )
-
-    # Connect to local database
-    local_conn = psycopg2.connect(
-        host='/var/run/postgresql',
-        database=LOCAL_DB,
-        user='ubuntu'
-    )
+    # Initialize connections (Supabase is READ-ONLY)
+    clients_db = ReadOnlyConnection(os.getenv('CLIENTS_DB_URL'), "Clients DB")
+    clients_db.connect()
+    local_db = LocalDatabase(os.getenv('LOCAL_DB_URL'))
+    local_db.connect()
 
     try:
         # Fetch monthly_booking_goal from Supabase
-        supabase_cur = supabase_conn.cursor()
-        supabase_cur.execute("""
+        rows = clients_db.execute_read("""
             SELECT client_id, monthly_booking_goal
             FROM public.clients
             WHERE monthly_booking_goal IS NOT NULL
         """)
-
-        rows = supabase_cur.fetchall()
         print(f"Fetched {len(rows)} clients with monthly_booking_goal")
 
-        # Update local database
-        local_cur = local_conn.cursor()
-
-        for row in rows:
-            local_cur.execute("""
+        # Update local database: one prepared UPDATE, sent in pipelined pages
+        with local_db.transaction('monthly booking goal sync'):
+            local_db.execute_pipelined("""
                 UPDATE clients_local
                 SET monthly_booking_goal = %s
                 WHERE client_id = %s
-            """, (row['monthly_booking_goal'], row['client_id']))
-
-        local_conn.commit()
+            """, [(goal, client_id) for client_id, goal in rows])
         print(f"✓ Updated {len(rows)} clients with monthly_booking_goal")
 
         # Verify
-        local_cur.execute("""
+        result = local_db.execute_read("""
             SELECT COUNT(*) as total,
                    COUNT(monthly_booking_goal) as with_goal
             FROM clients_local
-        """)
-        result = local_cur.fetchone()
+        """)[0]
         print(f"\nVerification:")
         print(f"  Total clients: {result[0]}")
         print(f"  With monthly_booking_goal: {result[1]}")
@@ -69,8 +50,10 @@ def main():
         print("Now restart PM2 to apply changes...")
 
     finally:
-        supabase_conn.close()
-        local_conn.close()
+        clients_db.close()
+        local_db.close()
+        log_pool_stats()
+        log_query_stats()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Slow-query EXPLAIN must skip execute_pipelined batches
+
+A page sent by LocalDatabase.execute_pipelined is one multi-statement
+request of EXECUTEs. Re-running it under EXPLAIN would only explain the
+first statement and run every other write again, so _explain has to
+leave it alone. Runs against fake connections (no database needed).
+
+Usage:
+    python test_query_stats.py
+"""
+import os
+import sys
+from psycopg2 import sql
+from psycopg2.extensions import adapt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ingest'))
+import database  # noqa: E402
+import query_stats  # noqa: E402
+
+
+class FakeCursor:
+    """Records what is sent; binds parameters the way psycopg2 quotes them"""
+
+    def __init__(self, conn):
+        self.connection = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, query, params):
+        return (query % tuple(adapt(value).getquoted().decode() for value in params)).encode()
+
+    def execute(self, query, params=None):
+        self.connection.sent.append(query)
+
+
+class FakeConnection:
+    autocommit = False
+
+    def __init__(self):
+        self.sent = []
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+
+def pipelined_page() -> str:
+    """The text of one execute_pipelined page"""
+    db = database.LocalDatabase('fake')
+    db._conn = FakeConnection()
+    db._prepared = lambda cur, query: sql.SQL('EXECUTE "stmt_0123456789abcdef" (%s, %s)')
+    db.execute_pipelined(
+        "UPDATE clients_local SET monthly_booking_goal = %s WHERE client_id = %s",
+        [(10, 'a;b'), (20, "c'd"), (30, 'e(f')],
+    )
+    assert len(db._conn.sent) == 1, db._conn.sent
+    return db._conn.sent[0].decode()
+
+
+def test_pipelined_page_is_not_explained():
+    page = pipelined_page()
+    assert database._single_statement_problem(page) == "multiple statements", page
+
+    conn = FakeConnection()
+    query_stats._explain(FakeCursor(conn), 'test.execute', page, 12.0, -1)
+    assert conn.sent == [], f"_explain re-ran a pipelined page: {conn.sent}"
+
+
+def test_single_execute_is_still_explainable():
+    # Quoted ';' and '(' inside bound values do not count as statement separators
+    query = "EXECUTE \"stmt_0123456789abcdef\" (10, 'a;b(')"
+    assert database._single_statement_problem(query) is None
+
+
+if __name__ == '__main__':
+    try:
+        test_pipelined_page_is_not_explained()
+        test_single_execute_is_still_explainable()
+    except AssertionError as e:
+        print(f"✗ FAILED: {e}")
+        sys.exit(1)
+    print("✓ Slow-query EXPLAIN skips pipelined batches")
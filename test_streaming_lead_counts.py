@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Memory test for streaming SmartLead lead counting
+
+Serves a synthetic 1M-lead campaign from a local mock SmartLead API (in a
+separate process) and counts it through the paginated fan-out path with
+tracemalloc running. Fails if peak traced memory exceeds the ceiling -
+materialising the campaign would take several hundred MB.
+
+Usage:
+    python test_streaming_lead_counts.py
+    MOCK_TOTAL_LEADS=200000 python test_streaming_lead_counts.py
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import tracemalloc
+import multiprocessing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+TOTAL_LEADS = int(os.environ.get('MOCK_TOTAL_LEADS', '1000000'))
+MEMORY_CEILING_MB = float(os.environ.get('MEMORY_CEILING_MB', '25'))
+MOCK_PORT = int(os.environ.get('MOCK_PORT', '8799'))
+CAMPAIGN_ID = 1
+
+STATUSES = ['STARTED', 'INPROGRESS', 'COMPLETED', 'PAUSED', 'STOPPED', 'BLOCKED']
+
+# Point the client at the mock before it reads its configuration
+os.environ['SMARTLEAD_BASE_URL'] = f"http://127.0.0.1:{MOCK_PORT}/api/v1"
+os.environ['SMARTLEAD_API_KEY'] = 'mock'
+os.environ.setdefault('SMARTLEAD_RATE_LIMIT', '100000')
+os.environ.setdefault('SMARTLEAD_RATE_BURST', '1000')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ingest'))
+import consolidate_leads_by_client as smartlead  # noqa: E402
+
+
+def expected_counts():
+    """Status i % 6 for lead i"""
+    base, extra = divmod(TOTAL_LEADS, len(STATUSES))
+    return {status.lower(): base + (1 if i < extra else 0) for i, status in enumerate(STATUSES)}
+
+
+class MockSmartLeadHandler(BaseHTTPRequestHandler):
+    """Generates /campaigns/{id}/leads pages on the fly (never holds the campaign)"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        offset = int(query.get('offset', ['0'])[0])
+        limit = int(query.get('limit', ['100'])[0])
+
+        leads = [
+            {
+                'campaign_lead_map_id': i,
+                'status': STATUSES[i % len(STATUSES)],
+                'created_at': '2026-01-01T00:00:00.000Z',
+                'lead': {
+                    'id': i,
+                    'first_name': f'First{i}',
+                    'last_name': f'Last{i}',
+                    'email': f'lead{i}@example.com',
+                    'company_name': f'Company {i % 997}',
+                    'custom_fields': {'title': 'Head of Growth', 'linkedin': f'https://linkedin.com/in/lead{i}'},
+                },
+            }
+            for i in range(offset, min(offset + limit, TOTAL_LEADS))
+        ]
+        body = json.dumps({'total_leads': str(TOTAL_LEADS), 'offset': offset, 'limit': limit, 'data': leads}).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_mock_server():
+    ThreadingHTTPServer(('127.0.0.1', MOCK_PORT), MockSmartLeadHandler).serve_forever()
+
+
+def measure(label, count):
+    """Run a counting function under tracemalloc and check counts and peak memory"""
+    tracemalloc.start()
+    start = time.time()
+    counts = count()
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak_mb = peak / (1024 * 1024)
+    print(f"  {label}: {counts.total_leads:,} leads in {elapsed:.1f}s, peak traced memory {peak_mb:.1f} MB")
+
+    assert counts.total_leads == TOTAL_LEADS, f"{label}: counted {counts.total_leads}, expected {TOTAL_LEADS}"
+    for field, value in expected_counts().items():
+        assert getattr(counts, field) == value, f"{label}: {field}={getattr(counts, field)}, expected {value}"
+    assert peak_mb < MEMORY_CEILING_MB, f"{label}: peak {peak_mb:.1f} MB exceeds {MEMORY_CEILING_MB} MB ceiling"
+
+
+async def count_async():
+    async with smartlead.create_async_session() as session:
+        return await smartlead.count_leads_by_status_paginated_async(session, CAMPAIGN_ID)
+
+
+def test_streaming_memory_ceiling():
+    server = multiprocessing.Process(target=run_mock_server, daemon=True)
+    server.start()
+    time.sleep(1)
+
+    try:
+        print(f"Counting a {TOTAL_LEADS:,}-lead campaign (ceiling {MEMORY_CEILING_MB:g} MB)...")
+
+        session = smartlead.create_session()
+        try:
+            measure("thread engine", lambda: smartlead.count_leads_by_status_paginated(session, CAMPAIGN_ID))
+        finally:
+            session.close()
+
+        if smartlead.aiohttp is not None:
+            measure("async engine", lambda: asyncio.run(count_async()))
+        else:
+            print("  async engine: skipped (aiohttp not installed)")
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == '__main__':
+    try:
+        test_streaming_memory_ceiling()
+    except AssertionError as e:
+        print(f"✗ FAILED: {e}")
+        sys.exit(1)
+    print("✓ Streaming lead counts stay under the memory ceiling")
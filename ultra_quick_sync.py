@@ -3,31 +3,12 @@
 import os
 import sys
 
-# Set up Django-like environment for the ingest script
-os.chdir('/home/ubuntu/client-health-dashboard')
+# Add ingest directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ingest'))
 
-# Import after changing directory
-from ingest.database import ReadOnlyConnection, LocalDatabase
-from ingest.ingest_main import ingest_clients, compute_7d_rollups, compute_dashboard_dataset
-
-def get_read_only_connection(db_name):
-    """Get read-only connection to Supabase database"""
-    if db_name == 'clients':
-        return ReadOnlyConnection(
-            host=os.getenv('SUPABASE_DB_HOST'),
-            port=5432,
-            database='postgres',
-            user='postgres',
-            password=os.getenv('READ_ONLY_DB_PASSWORD')
-        )
-    elif db_name == 'reporting':
-        return ReadOnlyConnection(
-            host=os.getenv('SUPABASE_DB_HOST'),
-            port=5432,
-            database='postgres',
-            user='postgres',
-            password=os.getenv('READ_ONLY_DB_PASSWORD')
-        )
+from database import ReadOnlyConnection, LocalDatabase, log_pool_stats
+from query_stats import log_query_stats
+from ingest_main import ingest_clients, get_rollup_windows, compute_window_rollups, stage_window_bookings, compute_7d_rollups, compute_dashboard_dataset
 
 def main():
     print("=" * 60)
@@ -38,25 +19,33 @@ def main():
 
     # Initialize connections
     print("1. Connecting to databases...")
-    clients_db = get_read_only_connection('clients')
-    local_db = LocalDatabase()
+    clients_db = ReadOnlyConnection(os.getenv('CLIENTS_DB_URL'), "Clients DB")
+    clients_db.connect()
+    local_db = LocalDatabase(os.getenv('LOCAL_DB_URL'))
+    local_db.connect()
     print("   ✓ Connected")
     print()
 
     try:
         # 1. Sync clients only
         print("2. Syncing clients from Supabase (includes monthly_booking_goal)...")
-        ingest_clients(clients_db, local_db)
+        with local_db.transaction('client ingest'):
+            ingest_clients(clients_db, local_db)
         print()
 
         # 2. Compute rollups
         print("3. Computing 7-day rollups...")
-        days_in_period = compute_7d_rollups(local_db)
+        current_window = get_rollup_windows(local_db, [])
+        with local_db.transaction('7-day rollups', synchronous_commit=False):
+            compute_window_rollups(local_db, current_window)
+            stage_window_bookings(local_db, current_window)
+            days_in_period = compute_7d_rollups(local_db)
         print()
 
         # 3. Compute dashboard
         print("4. Computing dashboard dataset...")
-        compute_dashboard_dataset(local_db, days_in_period)
+        with local_db.transaction('dashboard dataset', synchronous_commit=False):
+            compute_dashboard_dataset(local_db, days_in_period)
         print()
 
         print("=" * 60)
@@ -69,6 +58,8 @@ def main():
     finally:
         clients_db.close()
         local_db.close()
+        log_pool_stats()
+        log_query_stats()
 
 if __name__ == "__main__":
     main()
@@ -31,7 +31,7 @@ def main():
         # Fetch not contacted leads from SmartLead API
         print("\n2. Fetching not contacted leads from SmartLead API...")
         print("   (This may take 10-15 minutes for 450 campaigns...)")
-        not_contacted_map = fetch_not_contacted_leads_from_smartlead()
+        not_contacted_map = fetch_not_contacted_leads_from_smartlead(local_db)
 
         if not not_contacted_map:
             print("   ✗ No data returned from SmartLead API")